@@ -5,17 +5,48 @@ from datetime import datetime
 from werkzeug.utils import secure_filename
 
 from flask import Blueprint, request, jsonify, current_app, send_file
+from werkzeug.datastructures import MultiDict
 from werkzeug.exceptions import BadRequest, NotFound
 
-from app.db.database import db
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.db.database import db, read_replica
 from app.db.models.file import File
 from app.db.models.tag import Tag
-from app.services.file_service import save_file, delete_file, get_file_type
-from app.services.tag_service import generate_tags_for_file, find_or_create_tag
+from app.db.models.file_content import FileContent
+from app.services.file_service import delete_file, classify_upload, parse_file_filters, apply_file_filters
+from app.services.storage_service import save_file
+from app.services.tag_service import (
+    generate_tags_for_file, resolve_tags, attach_tags, detach_tags, bulk_attach_tags, bulk_detach_tags,
+    normalize_tag_name,
+)
+from app.services.media_service import MEDIA_CATEGORIES, read_media_metadata
+from app.services.spreadsheet_service import read_spreadsheet_schema
+from app.services.archive_service import read_archive_manifest
+from app.services.classification_service import get_extension_map
+from app.services.extraction_service import is_extractable, extract_file_text
+from app.services.task_service import submit_task
+from app.services.admission_service import admission_control
+from app.services.facet_service import get_facets
+from app.services.version_service import TAGS_SCOPE, files_scope, touch_files
+from app.services.response_cache_service import conditional, request_versions
 
 files_bp = Blueprint("files", __name__, url_prefix="/files")
 
+def get_request_filters():
+    """Lê os filtros de listagem da requisição, rejeitando filtros inválidos"""
+    try:
+        return parse_file_filters(request.args)
+    except ValueError as e:
+        raise BadRequest(str(e))
+
+def listing_scopes(**kwargs):
+    """Escopos de versão de uma listagem: os arquivos (do projeto filtrado) e os nomes das tags"""
+    return [files_scope(get_request_filters().get("project_id")), TAGS_SCOPE]
+
 @files_bp.route("/upload", methods=["POST"])
+@admission_control("upload", "MAX_CONCURRENT_UPLOADS_PER_WORKER")
 def upload_file():
     """ Endpoint para upload de arquivo."""
     # Verificar se o arquivo foi enviado
@@ -33,6 +64,15 @@ def upload_file():
         metadata = json.loads(metadata_str)
     except json.JSONDecodeError:
         metadata = {}
+    if not isinstance(metadata, dict):
+        metadata = {}
+
+    # Projeto e usuário são referências obrigatórias do sistema que chama a API
+    try:
+        project_id = int(metadata["projects_id"])
+        uploader_id = int(metadata["uploader_id"])
+    except (KeyError, TypeError, ValueError):
+        raise BadRequest("Informe projects_id e uploader_id nos metadados.")
 
     # Obter informações básicas do arquivo
     original_filename = secure_filename(file.filename)
@@ -42,88 +82,172 @@ def upload_file():
     ext = os.path.splitext(original_filename)[1]
     stored_filename = f"{uuid.uuid4().hex}{ext}"
 
-    # Determinar o tipo de arquivo 
-    file_type = get_file_type(original_filename, content_type)
+    # Determinar o tipo de arquivo pelo início do conteúdo e pela extensão
+    classification = classify_upload(file, original_filename, content_type)
+    file_type = classification["category"]
+    if content_type == "application/octet-stream":
+        content_type = classification["mime_type"]
 
-    # Salva arquivo no sistema de arquivos
-    file_path = save_file(file, stored_filename)
+    # Salva arquivo no sistema de arquivos (pasta por data)
+    file_path, stored_filename = save_file(file, stored_filename)
     file_size = os.path.getsize(file_path)
 
+    # Dimensões, duração e tags de mídia lidas só dos cabeçalhos
+    if file_type in MEDIA_CATEGORIES and current_app.config.get("MEDIA_METADATA_ENABLED", True):
+        media = read_media_metadata(file_path, current_app.config["MEDIA_HEADER_MAX_BYTES"])
+        if media:
+            metadata = {**metadata, "media": media}
+
+    # Abas, colunas e tipos de planilhas, lidos só do início de cada aba
+    if file_type == "spreadsheets" and current_app.config.get("SPREADSHEET_SCHEMA_ENABLED", True):
+        schema = read_spreadsheet_schema(
+            file_path,
+            original_filename,
+            current_app.config["SPREADSHEET_SAMPLE_ROWS"],
+            current_app.config["SPREADSHEET_SAMPLE_MAX_BYTES"],
+        )
+        if schema:
+            metadata = {**metadata, "spreadsheet": schema}
+
+    # Manifesto de arquivos compactados, lido só do índice (sem extrair nada)
+    if file_type == "archives" and current_app.config.get("ARCHIVE_MANIFEST_ENABLED", True):
+        manifest = read_archive_manifest(
+            file_path,
+            original_filename,
+            get_extension_map(),
+            max_entries=current_app.config["ARCHIVE_MAX_ENTRIES"],
+            bomb_ratio=current_app.config["ARCHIVE_BOMB_RATIO"],
+            bomb_min_bytes=current_app.config["ARCHIVE_BOMB_MIN_BYTES"],
+        )
+        if manifest:
+            metadata = {**metadata, "archive": manifest}
+            if manifest["suspicious"]:
+                current_app.logger.warning(
+                    f"Arquivo compactado suspeito ({', '.join(manifest['bomb_reasons'])}): {original_filename}"
+                )
+
     # Criar o objeto File (registro do arquivo) no banco de dados
     new_file = File(
+        filename=stored_filename,
         original_filename=original_filename,
-        stored_filename=stored_filename,
         file_path=file_path,
         file_type=file_type,
         file_size=file_size,
         content_type=content_type,
         metadata=metadata,
-        external_id=metadata.get("external_id"),
-        project_id=metadata.get("projects_id"),
-        uploader_id=metadata.get("uploader_id"),
+        project_id=project_id,
+        uploader_id=uploader_id,
     )
 
+    # Gerar tags automaticamente se habilitado. Os extratores rodam antes de
+    # gravar o arquivo, para não manter uma transação aberta durante o Vision
+    tags = generate_tags_for_file(new_file) if current_app.config["AUTO_TAG_ENABLED"] else []
+
     db.session.add(new_file)
-    db.session.commit()
+    db.session.flush()
+    touch_files(project_id)
 
-    # Gerar tagas automaticamente se habilitado
-    if current_app.config["AUTO_TAG_ENABLED"]:
-        tags = generate_tags_for_file(new_file)
-
-        # Associar tags ao arquivo
-        for tag_name in tags:
-            tag = find_or_create_tag(tag_name, auto_generated=True)
-            if tag not in new_file.tags:
-                new_file.tags.append(tag)
-                tag.usage_count += 1
-        
-        db.session.commit()
+    # Resolver todas as tags de uma vez e associá-las ao arquivo, no mesmo
+    # commit do registro
+    tag_ids = resolve_tags(tags, auto_generated=True)
+    attach_tags(new_file.id, tag_ids.values())
 
-    # Retornar os dados do arquivo 
-    return jsonify({
+    # Resposta montada antes do commit, que expira o objeto (evita recarregá-lo)
+    result = {
         "id": new_file.id,
-        "original_filename": new_file.original_filename,
-        "stored_filename": new_file.stored_filename,
-        "file_path": new_file.file_path,
-        "file_type": new_file.file_type,
-        "file_size": new_file.file_size,
-        "content_type": new_file.content_type,
-        "metadata": new_file.metadata,
-        "tags": [tag.name for tag in new_file.tags],
+        "original_filename": original_filename,
+        "filename": stored_filename,
+        "file_path": file_path,
+        "file_type": file_type,
+        "file_size": file_size,
+        "content_type": content_type,
+        "classification": classification,
+        "metadata": metadata,
+        "tags": list(tag_ids),
         "created_at": new_file.created_at.isoformat(),
-    })
+    }
+    db.session.commit()
+
+    # Extrair o texto de documentos em segundo plano, sem bloquear a requisição
+    if current_app.config["TEXT_EXTRACTION_ENABLED"] and is_extractable(original_filename):
+        submit_task(extract_file_text, result["id"])
+
+    # Retornar os dados do arquivo 
+    return jsonify(result)
 
 @files_bp.route("/", methods=["GET"])
+@read_replica
+@conditional(listing_scopes)
 def list_files():
     """ Listar arquivos com opção de filtrar por tags"""
-    # Obter parâmetros de consulta
-    project_id = request.args.get("project_id", type=int)
-    uploader_id = request.args.get("uploader_id", type=int)
-    file_type = request.args.get("file_type")
-    tags = request.args.getlist("tags")
-
-    # Construir a consulta
-    query = File.query
-
-    if project_id:
-        query = query.filter(File.project_id == project_id)
-    
-    if uploader_id:
-        query = query.filter(File.uploader_id == uploader_id)
+    # Obter parâmetros de consulta e construir a consulta
+    filters = get_request_filters()
+    query = apply_file_filters(File.query, filters)
+    query = query.order_by(File.created_at.desc())
+
+    # Carregar as tags de todos os arquivos numa consulta só (evita N+1)
+    files = query.options(selectinload(File.tags)).all()
+
+    return jsonify([file.to_dict() for file in files])
+
+@files_bp.route("/facets", methods=["GET"])
+@conditional(listing_scopes)
+def file_facets():
+    """Contar arquivos por tipo, tag, uploader e projeto para um filtro"""
+    filters = get_request_filters()
+    top_tags = min(request.args.get("top_tags", 10, type=int), 100)
+
+    # Mesmas versões do ETag: os contadores não são lidos de novo
+    return jsonify(get_facets(filters, top_tags, request_versions()))
+
+@files_bp.route("/tags/bulk", methods=["POST"])
+@admission_control("tagging", "MAX_CONCURRENT_TAGGING_PER_WORKER")
+def bulk_tag_files():
+    """Adicionar ou remover tags de vários arquivos (por IDs ou por filtro)"""
+    data = request.get_json()
+    if not data or not isinstance(data.get("tags"), list) or not data["tags"]:
+        raise BadRequest("Nenhuma tag fornecida.")
 
-    if file_type:
-        query = query.filter(File.file_type == file_type)
+    action = data.get("action", "add")
+    if action not in ("add", "remove"):
+        raise BadRequest("Ação inválida. Use 'add' ou 'remove'.")
+
+    # Arquivos alvo: lista de IDs ou os mesmos filtros da listagem
+    if "file_ids" in data:
+        file_ids = data["file_ids"]
+        if not isinstance(file_ids, list) or not all(isinstance(i, int) for i in file_ids):
+            raise BadRequest("file_ids deve ser uma lista de IDs.")
+        targets = select(File.id).where(File.id.in_(file_ids))
+    elif isinstance(data.get("filter"), dict) and data["filter"]:
+        args = MultiDict([
+            (key, str(value))
+            for key, values in data["filter"].items()
+            for value in (values if isinstance(values, list) else [values])
+        ])
+        try:
+            filters = parse_file_filters(args)
+        except ValueError as e:
+            raise BadRequest(str(e))
+        targets = apply_file_filters(select(File.id), filters)
+    else:
+        raise BadRequest("Informe file_ids ou filter.")
 
-    if tags:
-        for tag_name in tags:
-            tag = Tag.query.filter_by(name=tag_name).first()
-            if tag:
-                query = query.filter(File.tags.contains(tag))
+    if action == "add":
+        tag_ids = resolve_tags(data["tags"])
+        counts = bulk_attach_tags(targets, tag_ids.values())
+    else:
+        names = [normalize_tag_name(name) for name in data["tags"] if isinstance(name, str)]
+        tag_ids = dict(db.session.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names))).all())
+        counts = bulk_detach_tags(targets, tag_ids.values())
 
-    # Executar a consulta e obter os resultados
-    files = query.all()
+    db.session.commit()
 
-    return jsonify([file.todict() for file in files])
+    return jsonify({
+        "message": "Tags atualizadas com sucesso.",
+        "action": action,
+        "tags": {name: counts.get(tag_id, 0) for name, tag_id in tag_ids.items()},
+        "associations": sum(counts.values()),
+    })
 
 @files_bp.route("/<int:file_id>/tags", methods=["POST"])
 def add_tags_to_files(file_id):
@@ -139,25 +263,25 @@ def add_tags_to_files(file_id):
     if not isinstance(tags_to_add, list):
         raise BadRequest("As tags devem ser uma lista.")
     
-    # Adicionar cada tag ao arquivo
-    added_tags = []
-    for tag_name in tags_to_add:
-        tag = find_or_create_tag(tag_name)
-        if tag not in file.tags:
-            file.tags.append(tag)
-            tag.usage_count += 1
-            added_tags.append(tag.name)
-
+    # Resolver as tags de uma vez e adicionar as que ainda não estão no arquivo
+    tag_ids = resolve_tags(tags_to_add)
+    added_ids = set(attach_tags(file.id, tag_ids.values()))
+    added_tags = [name for name, tag_id in tag_ids.items() if tag_id in added_ids]
+    if added_ids:
+        touch_files(file.project_id)
+
+    # Lidas antes do commit, que expira o arquivo e suas tags
+    all_tags = [tag.name for tag in file.tags]
     db.session.commit()
 
     return jsonify({
         "message": "Tags adicionadas com sucesso.",
-        "file_id": file.id,
+        "file_id": file_id,
         "added_tags": added_tags,
-        "all_tags": [tag.name for tag in file.tags]
+        "all_tags": all_tags
     })
 
-@files_bp.route("/<int:file_id>/tags/tag_name>", methods=["DELETE"])
+@files_bp.route("/<int:file_id>/tags/<tag_name>", methods=["DELETE"])
 def remove_tag_from_file(file_id, tag_name):
     """Remover uma tag de um arquivo"""
     file = File.query.get_or_404(file_id)
@@ -168,16 +292,20 @@ def remove_tag_from_file(file_id, tag_name):
         raise NotFound("Tag não encontrada")
     
     # Remover a tag do arquivo
-    if tag in file.tags:
-        file.tags.remove(tag)
-        tag.usage_count -= 1
+    removed = detach_tags(file.id, [tag.id])
+    if removed:
+        touch_files(file.project_id)
+
+    # Lidas antes do commit, que expira o arquivo e suas tags
+    remaining_tags = [tag.name for tag in file.tags]
+    if removed:
         db.session.commit()
 
     return jsonify({
         "message": "Tag removida com sucesso.",
-        "file_id": file.id,
+        "file_id": file_id,
         "removed_tag": tag_name,
-        "remaining_tags": [tag.name for tag in file.tags]
+        "remaining_tags": remaining_tags
     })
 
 @files_bp.route("/<int:file_id>", methods=["DELETE"])
@@ -189,11 +317,12 @@ def delete_file_endpoint(file_id):
     success = delete_file(file.file_path)
 
     if success:
-        # Adicionar os contadores de uso das tags
-        for tag in file.tags:
-            tag.usage_count -= 1
+        # Remover as associações e atualizar os contadores de uso das tags
+        detach_tags(file.id)
+        touch_files(file.project_id)
 
-        # Excluir o registro do banco de dados
+        # Excluir o texto extraído e o registro do banco de dados
+        FileContent.query.filter_by(file_id=file.id).delete()
         db.session.delete(file)
         db.session.commit()
 
@@ -1,11 +1,26 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from werkzeug.exceptions import BadRequest, NotFound
 
-from app.db.database import db
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.db.database import db, read_replica
+from app.db.models.file import File, file_tags
 from app.db.models.tag import Tag
+from app.services.autocomplete_service import autocomplete_tags
+from app.services.tag_service import forget_tag, normalize_tag_name, remove_tag, merge_tags
+from app.services.cooccurrence_service import related_tags
+from app.services.version_service import bump_versions, FILES_SCOPE, TAGS_SCOPE, TAG_STATS_SCOPE
+from app.services.response_cache_service import conditional
 tags_bp = Blueprint("tags", __name__, url_prefix="/tags")
 
+def tag_scopes(**kwargs):
+    """Escopos de versão das respostas com dados das tags"""
+    return [TAGS_SCOPE, TAG_STATS_SCOPE]
+
 @tags_bp.route("/", methods=["GET"])
+@read_replica
+@conditional(tag_scopes, cache=True)
 def list_tags():
     """Listar todas as tags com opção de filtro"""
     # Obter parâmetros de consulta 
@@ -30,14 +45,40 @@ def list_tags():
     # Retornar os dados das tags
     return jsonify([tag.to_dict() for tag in tags])
 
+@tags_bp.route("/autocomplete", methods=["GET"])
+def autocomplete():
+    """Sugerir as tags mais usadas que começam com um prefixo"""
+    prefix = request.args.get("prefix", "")
+    max_results = current_app.config["TAG_AUTOCOMPLETE_MAX_RESULTS"]
+    limit = min(request.args.get("limit", 10, type=int), max_results)
+
+    if not prefix.strip():
+        return jsonify([])
+
+    return jsonify(autocomplete_tags(prefix, limit))
+
 @tags_bp.route("/<int:tag_id>", methods=["GET"])
+@read_replica
+@conditional(tag_scopes, cache=True)
 def get_tag(tag_id):
     """Obter detalhes de uma tag específica"""
     tag = Tag.query.get_or_404(tag_id)
     return jsonify(tag.to_dict())
 
+@tags_bp.route("/<int:tag_id>/related", methods=["GET"])
+def get_related_tags(tag_id):
+    """Obter as tags que mais aparecem junto com uma tag"""
+    tag = Tag.query.get_or_404(tag_id)
+    limit = min(request.args.get("limit", 10, type=int), 100)
+    metric = request.args.get("metric", "jaccard")
+
+    if metric not in ("jaccard", "lift"):
+        raise BadRequest("Métrica inválida. Use 'jaccard' ou 'lift'.")
+
+    return jsonify(related_tags(tag, limit, metric))
+
 @tags_bp.route("/", methods=["POST"])
-def create_tag(tag_id):
+def create_tag():
     """Criar uma nova tag"""
     data = request.get_json()
 
@@ -54,6 +95,7 @@ def create_tag(tag_id):
     ) 
 
     db.session.add(new_tag)
+    bump_versions(TAG_STATS_SCOPE)
     db.session.commit()
 
     return jsonify(new_tag.to_dict()), 201
@@ -69,10 +111,18 @@ def update_tag(tag_id):
     
     # Atualizar os campos da tag
     if "name" in data: 
-        # Verificar se o novo nome já está em uso
-        if data["name"] != tag.name and Tag.query.filter_by(name=data["name"]).first():
-            raise BadRequest("Uma Tag com esse nome já existe")
-        tag.name = data["name"]
+        new_name = normalize_tag_name(data["name"])
+        existing = Tag.query.filter_by(name=new_name).first()
+        if existing and existing.id != tag.id:
+            # Renomear para uma tag existente só é permitido como fusão
+            if not data.get("merge"):
+                raise BadRequest("Uma Tag com esse nome já existe")
+            moved = merge_tags(tag, existing)
+            db.session.commit()
+            return jsonify({**existing.to_dict(), "merged_tag_id": tag_id, "moved_files": moved})
+        forget_tag(tag.name)
+        bump_versions(TAGS_SCOPE)
+        tag.name = new_name
 
     if " description" in data:
         tag.description = data["description"]
@@ -80,6 +130,7 @@ def update_tag(tag_id):
     if "auto_generated" in data:
         tag.auto_generated = data["auto_generated"]
 
+    bump_versions(TAG_STATS_SCOPE)
     db.session.commit()
 
     return jsonify(tag.to_dict())
@@ -89,12 +140,8 @@ def delete_tag(tag_id):
     """Excluir uma tag """
     tag = Tag.query.get_or_404(tag_id)
 
-    # Remover a tag de todos os arquivos
-    for file in tag.files:
-        file.tags.remove(tag)
-
-    # Excluir a tag
-    db.session.delete(tag)
+    # Excluir a tag e suas associações sem carregar os arquivos
+    remove_tag(tag)
     db.session.commit()
 
     return jsonify({
@@ -102,12 +149,43 @@ def delete_tag(tag_id):
         "tag_id": tag_id
     })
 
+@tags_bp.route("/<int:tag_id>/merge", methods=["POST"])
+def merge_tag(tag_id):
+    """Fundir uma tag em outra, movendo suas associações"""
+    source = Tag.query.get_or_404(tag_id)
+    data = request.get_json()
+    if not data or not isinstance(data.get("target_id"), int):
+        raise BadRequest("Informe o target_id da tag de destino.")
+
+    target = Tag.query.get_or_404(data["target_id"])
+    if target.id == source.id:
+        raise BadRequest("Uma tag não pode ser fundida nela mesma.")
+
+    moved = merge_tags(source, target)
+    db.session.commit()
+
+    return jsonify({
+        "message": "Tags fundidas com sucesso.",
+        "merged_tag_id": tag_id,
+        "target": target.to_dict(),
+        "moved_files": moved,
+    })
+
 @tags_bp.route("/files/<int:tag_id>", methods=["GET"])
+@read_replica
+@conditional(lambda tag_id: [FILES_SCOPE, TAGS_SCOPE])
 def get_files_by_tag(tag_id):
     """Obter todos os arquivos associados a uma tag"""
-    tag = Tag.query.get_or_404(tag_id)
-
-    # Obter todos os arquivos associados à tag
-    files = tag.files.all()
+    # Obter todos os arquivos associados à tag, com as tags de cada um
+    # carregadas numa consulta só (evita N+1)
+    files = (
+        File.query.filter(File.id.in_(select(file_tags.c.file_id).where(file_tags.c.tag_id == tag_id)))
+        .options(selectinload(File.tags))
+        .all()
+    )
+
+    # A tag só precisa ser buscada para diferenciar "sem arquivos" de "não existe"
+    if not files and db.session.get(Tag, tag_id) is None:
+        raise NotFound("Tag não encontrada")
 
     return jsonify([file.to_dict() for file in files])
\ No newline at end of file
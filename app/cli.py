@@ -0,0 +1,110 @@
+import os
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+
+tags_cli = AppGroup("tags", help="Manutenção das tags")
+
+
+@click.command("create-schema")
+@with_appcontext
+def create_schema_command():
+    """Cria as tabelas ausentes e os índices de metadados (METADATA_INDEXED_KEYS)"""
+    from app.db.database import create_schema
+
+    create_schema(current_app)
+    click.echo("Esquema e índices de metadados garantidos.")
+
+
+@tags_cli.command("reconcile-usage")
+def reconcile_usage():
+    """Recalcula a contagem de uso das tags a partir das associações"""
+    from app.services.usage_service import reconcile_usage_counts
+
+    fixed = reconcile_usage_counts()
+    click.echo(f"{fixed} tag(s) com contagem de uso corrigida.")
+
+
+@tags_cli.command("rebuild-cooccurrences")
+def rebuild_tag_cooccurrences():
+    """Reconstrói a matriz de co-ocorrência de tags a partir das associações"""
+    from app.services.cooccurrence_service import rebuild_cooccurrences
+
+    pairs = rebuild_cooccurrences()
+    click.echo(f"{pairs} par(es) de tags gravado(s).")
+
+
+@tags_cli.command("retag")
+@click.option("--filter", "filters", multiple=True, metavar="CHAVE=VALOR",
+              help="Filtro de arquivos, como na listagem (ex.: file_type=images, meta.client=Acme)")
+@click.option("--batch-size", default=500, show_default=True, help="Arquivos por lote")
+@click.option("--workers", default=os.cpu_count() or 1, show_default=True,
+              help="Processos para gerar as tags (0 = no próprio processo)")
+@click.option("--checkpoint", default="retag-checkpoint.json", show_default=True,
+              help="Arquivo com o ponto de retomada")
+@click.option("--restart", is_flag=True, help="Ignorar o ponto de retomada e começar do início")
+@click.option("--dry-run", is_flag=True, help="Mostrar as diferenças sem gravar nada")
+def retag(filters, batch_size, workers, checkpoint, restart, dry_run):
+    """Gera novamente as tags automáticas dos arquivos existentes"""
+    from werkzeug.datastructures import MultiDict
+    from app.services.cooccurrence_service import rebuild_cooccurrences
+    from app.services.file_service import parse_file_filters
+    from app.services.retag_service import load_checkpoint, retag_files, save_checkpoint
+
+    pairs = []
+    for item in filters:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise click.BadParameter(f"Use CHAVE=VALOR: {item}", param_hint="--filter")
+        pairs.append((key.strip(), value.strip()))
+    try:
+        parsed = parse_file_filters(MultiDict(pairs)) if pairs else None
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--filter")
+
+    # O ponto de retomada só vale para os mesmos filtros; a simulação não o usa
+    after_id = 0
+    # Totais desde o início da execução interrompida (somados aos desta)
+    previous = {}
+    state = None if restart or dry_run else load_checkpoint(checkpoint)
+    if state and state.get("filters") == sorted(filters):
+        after_id = state["last_id"]
+        previous = state.get("totals") or {}
+        click.echo(f"Retomando após o arquivo {after_id}.")
+
+    def cumulative(totals):
+        return {key: previous.get(key, 0) + value for key, value in totals.items()}
+
+    def on_batch(last_id, diffs, totals):
+        if dry_run:
+            for diff in diffs:
+                changes = [f"+{name}" for name in diff["added"]] + [f"-{name}" for name in diff["removed"]]
+                click.echo(f"{diff['file_id']}: {' '.join(changes)}")
+        else:
+            save_checkpoint(checkpoint, {
+                "filters": sorted(filters), "last_id": last_id, "totals": cumulative(totals),
+            })
+
+    totals = retag_files(parsed, after_id, batch_size, workers, dry_run, on_batch)
+
+    if not dry_run:
+        # Concluído: a próxima execução começa do início
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        if cumulative(totals)["changed"]:
+            # A co-ocorrência é recalculada uma vez, em vez de arquivo a arquivo,
+            # incluindo as alterações gravadas antes de uma interrupção
+            rebuild_cooccurrences()
+
+    verb = "seriam" if dry_run else "foram"
+    click.echo(
+        f"{totals['processed']} arquivo(s) processado(s); {totals['changed']} {verb} alterado(s) "
+        f"(+{totals['added']} / -{totals['removed']} tag(s))."
+    )
+
+
+def register_commands(app):
+    """Registra os comandos de linha de comando da aplicação"""
+    app.cli.add_command(tags_cli)
+    app.cli.add_command(create_schema_command)
@@ -9,6 +9,21 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL", "sqlite:///app.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Perfil do engine: pool no Postgres, PRAGMAs (WAL, busy_timeout, mmap) no SQLite
+    DATABASE_POOL_SIZE = int(os.environ.get("DATABASE_POOL_SIZE", 10))
+    DATABASE_MAX_OVERFLOW = int(os.environ.get("DATABASE_MAX_OVERFLOW", 20))
+    DATABASE_POOL_TIMEOUT = 30
+    DATABASE_POOL_RECYCLE = 1800
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+
+    # Criar tabelas e índices de metadados ao iniciar a aplicação. Desligado
+    # por padrão: o esquema vem de "flask db upgrade" e "flask create-schema"
+    DATABASE_AUTO_CREATE = os.environ.get("DATABASE_AUTO_CREATE", "0") == "1"
+
+    # Réplica de leitura opcional para as rotas de listagem
+    DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+
     #  Configurações de upload de arquivos
     MAX_CONTENT_LENGTH = 100 * 1024 * 1024  
     UPLOAD_FOLDER = os.environ.get("STORAGE_PATH", os.path.join(os.getcwd(), "storage"))
@@ -29,9 +44,117 @@ class Config:
             "data": [".db", ".sqlite", ".sql", ".json", ".xml", ".yaml", ".yml", ".parquet", ".feather", ".hdf5", ".h5"]
         }
     
+    # Identificação do conteúdo no upload: além da tabela de assinaturas,
+    # consultar a libmagic quando nenhuma assinatura conhecida bater
+    FILE_SNIFF_LIBMAGIC = os.environ.get("FILE_SNIFF_LIBMAGIC", "0") == "1"
+
+    # Metadados de mídia (dimensões, duração, EXIF/ID3) lidos apenas dos
+    # cabeçalhos, sem decodificar o conteúdo
+    MEDIA_METADATA_ENABLED = True
+    MEDIA_HEADER_MAX_BYTES = int(os.environ.get("MEDIA_HEADER_MAX_BYTES", 1024 * 1024))
+    MEDIA_LONGFORM_SECONDS = 600
+
+    # Esquema de planilhas (CSV/TSV/XLSX): cabeçalho e amostra de linhas lidos
+    # em streaming, com limite de bytes para arquivos muito grandes
+    SPREADSHEET_SCHEMA_ENABLED = True
+    SPREADSHEET_SAMPLE_ROWS = 200
+    SPREADSHEET_SAMPLE_MAX_BYTES = int(os.environ.get("SPREADSHEET_SAMPLE_MAX_BYTES", 2 * 1024 * 1024))
+    SPREADSHEET_COLUMN_TAGS = 5
+
+    # Manifesto de arquivos compactados (ZIP, tar, 7z, ISO), lido só do índice.
+    # Razão de compressão acima de ARCHIVE_BOMB_RATIO com mais de
+    # ARCHIVE_BOMB_MIN_BYTES descompactados marca o arquivo como suspeito
+    ARCHIVE_MANIFEST_ENABLED = True
+    ARCHIVE_MAX_ENTRIES = int(os.environ.get("ARCHIVE_MAX_ENTRIES", 100_000))
+    ARCHIVE_BOMB_RATIO = int(os.environ.get("ARCHIVE_BOMB_RATIO", 100))
+    ARCHIVE_BOMB_MIN_BYTES = 1024 * 1024 * 1024
+
     # Configurações de tag
     AUTO_TAG_ENABLED = True
     MAX_TAGS_PER_FILE = 10
+
+    # Extratores de tags: executados em paralelo, cada um com seu limite de
+    # tempo em segundos (o do registro do extrator ou TAGGER_DEFAULT_TIMEOUT;
+    # TAGGER_TIMEOUTS = {"nome": segundos} sobrepõe ambos)
+    TAGGER_WORKERS = int(os.environ.get("TAGGER_WORKERS", 8))
+    TAGGER_DEFAULT_TIMEOUT = 2.0
+    TAGGER_TIMEOUTS = {}
+
+    # Cache nome -> ID de tags (por processo). Renomeações e exclusões feitas
+    # em outros processos são percebidas em até TAG_CACHE_VERSION_CHECK_SECONDS
+    TAG_CACHE_SIZE = 10000
+    TAG_CACHE_TTL_SECONDS = 300
+    TAG_CACHE_VERSION_CHECK_SECONDS = float(os.environ.get("TAG_CACHE_VERSION_CHECK_SECONDS", 5))
+
+    # Contagem de uso de tags: gravação tardia opcional para tags muito movimentadas
+    TAG_USAGE_WRITE_BEHIND = os.environ.get("TAG_USAGE_WRITE_BEHIND", "0") == "1"
+    TAG_USAGE_FLUSH_SECONDS = 5
+
+    # Co-ocorrência de tags (sugestões de tags relacionadas)
+    TAG_COOCCURRENCE_ENABLED = True
+    TAG_RELATED_CANDIDATE_FACTOR = 5
+
+    # Autocomplete de tags (índice de prefixos em memória)
+    TAG_AUTOCOMPLETE_MAX_RESULTS = 20
+    TAG_AUTOCOMPLETE_REFRESH_SECONDS = int(os.environ.get("TAG_AUTOCOMPLETE_REFRESH_SECONDS", 300))
     
-    # Limite de requisições por minuto (para evitar abusos)
-    RATE_LIMIT = 60
\ No newline at end of file
+    # Extração de texto de documentos (executada em segundo plano)
+    TEXT_EXTRACTION_ENABLED = True
+    TEXT_EXTRACTION_EXTENSIONS = [".pdf", ".docx", ".odt", ".txt", ".md", ".rtf", ".epub"]
+    TEXT_EXTRACTION_MAX_BYTES = int(os.environ.get("TEXT_EXTRACTION_MAX_BYTES", 2 * 1024 * 1024))
+    TEXT_EXTRACTION_MAX_SECONDS = float(os.environ.get("TEXT_EXTRACTION_MAX_SECONDS", 30))
+    TEXT_KEYWORD_TAGS = 5
+
+    # Tarefas em segundo plano
+    BACKGROUND_WORKERS = int(os.environ.get("BACKGROUND_WORKERS", 4))
+    BACKGROUND_TASKS_EAGER = False
+
+    # Chaves de metadados consultadas com frequência, que ganham índices de
+    # expressão (ex.: "client,invoice_month,amount:number")
+    METADATA_INDEXED_KEYS = os.environ.get("METADATA_INDEXED_KEYS", "")
+
+    # Cache de contagens de facetas (invalidado pelos contadores de versão)
+    FACET_CACHE_SIZE = 1024
+    FACET_CACHE_TTL_SECONDS = 300
+
+    # As listagens e as rotas de tags respondem com ETag fraco (304 se o
+    # cliente já tem a versão atual). As respostas de list_tags e get_tag
+    # também ficam em cache em memória, por URL e versão
+    RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "1") == "1"
+    RESPONSE_CACHE_SIZE = 512
+    RESPONSE_CACHE_TTL_SECONDS = 60
+
+    # Métricas no formato do Prometheus em /metrics. Com vários processos
+    # (gunicorn), defina PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py já define)
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+
+    # Perfil de requisições sob demanda: com o cabeçalho X-Profile igual a
+    # PROFILING_TOKEN ou em uma fração PROFILING_SAMPLE_RATE das requisições.
+    # PROFILING_MODE: "sampling" (pilhas para flamegraph) ou "cprofile"
+    PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "0") == "1"
+    PROFILING_TOKEN = os.environ.get("PROFILING_TOKEN")
+    PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0))
+    PROFILING_MODE = os.environ.get("PROFILING_MODE", "sampling")
+    PROFILING_INTERVAL_SECONDS = 0.005
+    PROFILING_DIR = os.environ.get("PROFILING_DIR", os.path.join(os.getcwd(), "profiles"))
+
+    # Limite de requisições por minuto (para evitar abusos), por cliente e por
+    # projeto, em uploads e tags em massa. O estado fica no banco e vale para
+    # todos os workers; RATE_LIMIT_BURST requisições seguidas são permitidas
+    RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "1") == "1"
+    RATE_LIMIT = int(os.environ.get("RATE_LIMIT", 60))
+    RATE_LIMIT_BURST = int(os.environ.get("RATE_LIMIT_BURST", 10))
+    # Intervalo, por processo, da exclusão dos baldes ociosos (já cheios)
+    RATE_LIMIT_PRUNE_SECONDS = 300
+
+    # Execuções simultâneas por worker (processo): acima disso a requisição é
+    # recusada na hora (503 + Retry-After) em vez de esperar e estourar o tempo
+    # limite. O máximo da instância é o número de workers vezes esse valor
+    MAX_CONCURRENT_UPLOADS_PER_WORKER = int(os.environ.get("MAX_CONCURRENT_UPLOADS_PER_WORKER", 2))
+    MAX_CONCURRENT_TAGGING_PER_WORKER = int(os.environ.get("MAX_CONCURRENT_TAGGING_PER_WORKER", 1))
+    ADMISSION_RETRY_AFTER_SECONDS = 5
+
+    # Proxies reversos confiáveis na frente da aplicação. Com um valor maior
+    # que zero, o endereço do cliente (usado nos limites por cliente), o
+    # esquema e o host vêm dos cabeçalhos X-Forwarded-* que eles acrescentam
+    PROXY_COUNT = int(os.environ.get("PROXY_COUNT", 0))
\ No newline at end of file
@@ -0,0 +1,64 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+from app.core.metrics import record_cache
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Cache em memória com tamanho máximo (descarta os itens menos usados)
+    e tempo de expiração opcional. Seguro para uso entre threads. Caches com
+    nome contabilizam acertos e falhas na métrica cache_requests_total.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retorna o valor de uma chave, ou `default` se ausente ou expirada.
+        """
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING and item[1] is not None and item[1] < time.monotonic():
+                del self._data[key]
+                item = _MISSING
+            if item is not _MISSING:
+                self._data.move_to_end(key)
+        if self.name:
+            record_cache(self.name, item is not _MISSING)
+        return default if item is _MISSING else item[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Armazena um valor, descartando o item menos usado se o cache estiver cheio.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove uma chave do cache, retornando seu valor.
+        """
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+            return default if item is _MISSING else item[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,164 @@
+import os
+import time
+
+from flask import Response, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess, REGISTRY
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Tamanhos de requisição/resposta: de 100 B a 100 MB (limite de upload)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP", ["method", "route", "status"]
+)
+HTTP_REQUEST_SIZE = Histogram(
+    "http_request_size_bytes", "Tamanho do corpo das requisições", ["route"], buckets=SIZE_BUCKETS
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Tamanho do corpo das respostas", ["route"], buckets=SIZE_BUCKETS
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requisições em andamento", multiprocess_mode="livesum"
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Duração das consultas SQL", ["operation"]
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "Consultas SQL por requisição", ["route"], buckets=QUERY_COUNT_BUCKETS
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Tempo em consultas SQL por requisição", ["route"]
+)
+
+STORAGE_BYTES = Counter(
+    "storage_bytes_total", "Bytes lidos e gravados no armazenamento de arquivos", ["operation"]
+)
+
+VISION_REQUEST_DURATION = Histogram(
+    "vision_request_duration_seconds", "Latência das chamadas ao Google Cloud Vision"
+)
+VISION_ERRORS = Counter("vision_errors_total", "Chamadas ao Google Cloud Vision com erro")
+TAGGER_FAILURES = Counter(
+    "tagger_failures_total", "Extratores de tags com erro ou tempo esgotado", ["tagger", "reason"]
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Consultas aos caches em memória", ["cache", "result"]
+)
+
+BACKGROUND_TASKS_QUEUED = Gauge(
+    "background_tasks_queued", "Tarefas em segundo plano aguardando execução", multiprocess_mode="livesum"
+)
+BACKGROUND_TASKS_RUNNING = Gauge(
+    "background_tasks_running", "Tarefas em segundo plano em execução", multiprocess_mode="livesum"
+)
+
+SQL_OPERATIONS = {"select", "insert", "update", "delete"}
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Conta uma consulta a um cache nomeado (acerto ou falha)"""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_storage(operation: str, size: int) -> None:
+    """Conta bytes lidos ("read") ou gravados ("write") no armazenamento"""
+    if size:
+        STORAGE_BYTES.labels(operation).inc(size)
+
+
+def _route() -> str:
+    # O padrão da rota (e não a URL) mantém a cardinalidade das séries baixa
+    return request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    operation = statement.lstrip()[:6].lower()
+    DB_QUERY_DURATION.labels(operation if operation in SQL_OPERATIONS else "other").observe(elapsed)
+
+    # Totais da requisição atual (tarefas em segundo plano não entram)
+    if has_request_context() and "metrics_started" in g:
+        g.db_queries = g.get("db_queries", 0) + 1
+        g.db_time = g.get("db_time", 0.0) + elapsed
+
+
+def _before_request():
+    g.metrics_started = time.perf_counter()
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+
+
+def _after_request(response):
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return response
+    HTTP_REQUESTS_IN_FLIGHT.dec()
+
+    route = _route()
+    HTTP_REQUEST_DURATION.labels(request.method, route, str(response.status_code)).observe(
+        time.perf_counter() - started
+    )
+    HTTP_REQUEST_SIZE.labels(route).observe(request.content_length or 0)
+    if response.content_length is not None:
+        HTTP_RESPONSE_SIZE.labels(route).observe(response.content_length)
+    DB_QUERIES_PER_REQUEST.labels(route).observe(g.pop("db_queries", 0))
+    DB_TIME_PER_REQUEST.labels(route).observe(g.pop("db_time", 0.0))
+    return response
+
+
+def _teardown_request(exc):
+    # Requisições interrompidas antes de after_request também saem da contagem
+    if g.pop("metrics_started", None) is not None:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    Registro a expor em /metrics. Com PROMETHEUS_MULTIPROC_DIR definido
+    (workers do gunicorn), agrega os valores gravados por todos os processos.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def mark_process_dead(pid: int) -> None:
+    """Descarta os medidores (gauges) de um worker encerrado"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+def init_metrics(app) -> None:
+    """
+    Registra a coleta de métricas (latência e tamanho por rota, consultas
+    SQL por requisição) e o endpoint /metrics no formato do Prometheus.
+    """
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(generate_latest(metrics_registry()), mimetype=CONTENT_TYPE_LATEST)
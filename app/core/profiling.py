@@ -0,0 +1,213 @@
+import os
+import sys
+import hmac
+import json
+import time
+import uuid
+import random
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Cabeçalho que ativa o perfil de uma requisição (valor: PROFILING_TOKEN)
+PROFILE_HEADER = "X-Profile"
+# Cabeçalho da resposta com o ID dos arquivos gerados
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Máximo de instruções SQL guardadas por requisição
+MAX_STATEMENTS = 1000
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    # ";" separa os quadros no formato "folded" e não pode aparecer nos nomes
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class StackSampler(threading.Thread):
+    """
+    Amostrador de pilha de uma thread: a cada intervalo registra a pilha
+    atual dela. O custo recai só nesta thread auxiliar, e o resultado
+    ("folded stacks") vai direto para flamegraph.pl ou speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfile:
+    """Perfil de uma requisição: amostras de pilha (ou cProfile) e SQL emitido"""
+
+    def __init__(self, mode: str, interval: float, reason: str):
+        self.id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.mode = mode
+        self.reason = reason
+        self.statements: List[Dict[str, Any]] = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        if mode == "cprofile":
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.profiler = StackSampler(threading.get_ident(), interval)
+            self.profiler.start()
+
+    def stop(self) -> None:
+        self.elapsed = time.perf_counter() - self.started
+        if self.mode == "cprofile":
+            self.profiler.disable()
+        else:
+            self.profiler.stop()
+
+    def write(self, directory: str, info: Dict[str, Any]) -> List[str]:
+        """
+        Grava o perfil no diretório: <id>.folded (amostragem) ou <id>.prof
+        (cProfile, para snakeviz/flameprof), e <id>.json com os dados da
+        requisição e as instruções SQL com seus tempos.
+        """
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.id)
+        paths = []
+        if self.mode == "cprofile":
+            self.profiler.dump_stats(f"{base}.prof")
+            paths.append(f"{base}.prof")
+        else:
+            with open(f"{base}.folded", "w", encoding="utf-8") as f:
+                f.write(self.profiler.folded())
+            paths.append(f"{base}.folded")
+
+        summary = {
+            **info,
+            "id": self.id,
+            "mode": self.mode,
+            "reason": self.reason,
+            "duration_ms": round(self.elapsed * 1000, 3),
+            "sql_count": len(self.statements),
+            "sql_ms": round(sum(item["duration_ms"] for item in self.statements), 3),
+            "sql": self.statements,
+        }
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        paths.append(f"{base}.json")
+        return paths
+
+
+def _current_profile() -> Optional[RequestProfile]:
+    return g.get("profile") if has_request_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_profile() is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_profile_started", None)
+    profile = _current_profile()
+    if started is None or profile is None or len(profile.statements) >= MAX_STATEMENTS:
+        return
+    # Só o texto da instrução: os parâmetros podem conter dados dos usuários
+    profile.statements.append({
+        "statement": statement,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        "executemany": executemany,
+    })
+
+
+def _profile_reason(config) -> Optional[str]:
+    token = config.get("PROFILING_TOKEN")
+    header = request.headers.get(PROFILE_HEADER)
+    if token and header and hmac.compare_digest(header, token):
+        return "header"
+    rate = config.get("PROFILING_SAMPLE_RATE", 0.0)
+    if rate and random.random() < rate:
+        return "sample"
+    return None
+
+
+def init_profiling(app) -> None:
+    """
+    Ativa o perfil sob demanda de requisições: com PROFILING_TOKEN no
+    cabeçalho X-Profile ou em uma fração PROFILING_SAMPLE_RATE das
+    requisições. Desativado (PROFILING_ENABLED), nenhum gancho é registrado.
+    """
+    if not app.config.get("PROFILING_ENABLED"):
+        return
+
+    config = app.config
+    directory = config.get("PROFILING_DIR") or os.path.join(os.getcwd(), "profiles")
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    def finish(response=None):
+        profile = g.pop("profile", None)
+        if profile is None:
+            return
+        profile.stop()
+        info = {
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+            "route": request.url_rule.rule if request.url_rule is not None else None,
+            "status": response.status_code if response is not None else None,
+        }
+        try:
+            profile.write(directory, info)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o perfil {profile.id}: {str(e)}")
+            return
+        if response is not None:
+            response.headers[PROFILE_ID_HEADER] = profile.id
+        logger.info(f"Perfil da requisição {info['method']} {info['path']} gravado: {profile.id}")
+
+    @app.before_request
+    def start_profile():
+        reason = _profile_reason(config)
+        if reason:
+            g.profile = RequestProfile(
+                config.get("PROFILING_MODE", "sampling"),
+                config.get("PROFILING_INTERVAL_SECONDS", 0.005),
+                reason,
+            )
+
+    @app.after_request
+    def stop_profile(response):
+        finish(response)
+        return response
+
+    @app.teardown_request
+    def discard_profile(exc):
+        # Requisições que terminaram em exceção antes de after_request
+        finish()
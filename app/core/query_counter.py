@@ -0,0 +1,74 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """
+    Instruções SQL emitidas (e o tempo gasto nelas) enquanto ativo. Usado nos
+    testes de orçamento de consultas para pegar padrões N+1 antes da produção.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements: List[Dict[str, Any]] = []
+        # Só conta a thread que abriu o contador (tarefas em segundo plano não entram)
+        self._thread_id = threading.get_ident()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def duration(self) -> float:
+        """Tempo total no banco, em segundos"""
+        return sum(statement["duration"] for statement in self.statements)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None and threading.get_ident() == self._thread_id:
+            context._query_counter_started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_counter_started", None)
+        if started is None:
+            return
+        self.statements.append({
+            "sql": " ".join(statement.split()),
+            "duration": time.perf_counter() - started,
+            "executemany": executemany,
+        })
+
+    def start(self) -> None:
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+
+    def stop(self) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+
+    def report(self) -> str:
+        """Resumo legível das instruções, para mensagens de falha"""
+        lines = [f"{self.count} instruções SQL em {self.duration * 1000:.1f} ms:"]
+        for index, statement in enumerate(self.statements, start=1):
+            lines.append(f"  {index}. [{statement['duration'] * 1000:.1f} ms] {statement['sql'][:300]}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def count_queries(engine) -> Iterator[QueryCounter]:
+    """
+    Conta as instruções SQL executadas no engine dentro do bloco:
+
+        with count_queries(db.engine) as queries:
+            client.get("/api/files/")
+        assert queries.count <= 3, queries.report()
+    """
+    counter = QueryCounter(engine)
+    counter.start()
+    try:
+        yield counter
+    finally:
+        counter.stop()
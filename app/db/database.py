@@ -1,5 +1,13 @@
+import os
+from functools import wraps
+from typing import Any, Dict, Optional
+
+from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import MetaData
+from flask_sqlalchemy.session import Session
+from sqlalchemy import MetaData, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql.dml import UpdateBase
 
 convention = {
     "ix": 'ix_%(column_0_label)s',
@@ -9,17 +17,190 @@ convention = {
     "pk": "pk_%(table_name)s"
 }
 
+# Chave do bind da réplica de leitura (SQLALCHEMY_BINDS)
+REPLICA_BIND = "replica"
+
+
+class RoutingSession(Session):
+    """
+    Sessão que envia as leituras para a réplica quando a requisição foi
+    marcada com @read_replica. Escritas e flushes vão sempre para o primário.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and self.info.get(REPLICA_BIND)
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+        ):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
 metadata = MetaData(naming_convention=convention)
-db = SQLAlchemy(metadata=metadata)
+db = SQLAlchemy(metadata=metadata, session_options={"class_": RoutingSession})
+migrate = Migrate()
+Base = db.Model
+
+def upsert_insert(table):
+    """
+    Retorna um INSERT do dialeto do banco com suporte a ON CONFLICT,
+    ou None se o banco não suportar.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(table)
+
+def insert_ignore(table):
+    """
+    Retorna um INSERT que ignora linhas em conflito com chaves únicas
+    (ON CONFLICT DO NOTHING), ou None se o banco não suportar.
+    """
+    stmt = upsert_insert(table)
+    return stmt.on_conflict_do_nothing() if stmt is not None else None
+
+def read_replica(view):
+    """
+    Decorador de rotas somente leitura: as consultas da requisição usam a
+    réplica (DATABASE_REPLICA_URL), se configurada.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        db.session.info[REPLICA_BIND] = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            db.session.info.pop(REPLICA_BIND, None)
+    return wrapper
+
+def engine_profile(url: str, config) -> Dict[str, Any]:
+    """
+    Retorna as opções de engine ajustadas ao banco.
+
+    Args:
+        url: URL do banco de dados
+        config: Configuração da aplicação
+
+    Returns:
+        Opções para create_engine
+    """
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        # O timeout do driver também vale enquanto a conexão é aberta
+        return {"connect_args": {"timeout": config.get("SQLITE_BUSY_TIMEOUT_MS", 5000) / 1000}}
+    if backend == "postgresql":
+        return {
+            "pool_size": config.get("DATABASE_POOL_SIZE", 10),
+            "max_overflow": config.get("DATABASE_MAX_OVERFLOW", 20),
+            "pool_timeout": config.get("DATABASE_POOL_TIMEOUT", 30),
+            "pool_recycle": config.get("DATABASE_POOL_RECYCLE", 1800),
+            "pool_pre_ping": True,
+        }
+    return {"pool_pre_ping": True}
+
+def sqlite_pragmas(config, database: Optional[str]) -> Dict[str, Any]:
+    """
+    Retorna os PRAGMAs aplicados a cada conexão SQLite: WAL permite leituras
+    concorrentes com uma escrita, e busy_timeout faz as escritas esperarem
+    o lock em vez de falharem com "database is locked".
+    """
+    pragmas = {
+        "synchronous": "NORMAL",
+        "busy_timeout": config.get("SQLITE_BUSY_TIMEOUT_MS", 5000),
+        "mmap_size": config.get("SQLITE_MMAP_SIZE", 0),
+    }
+    # Bancos em memória não suportam WAL
+    if database and database != ":memory:" and not database.startswith("file::memory:"):
+        pragmas = {"journal_mode": "WAL", **pragmas}
+    return pragmas
+
+def configure_sqlite_engine(engine, config) -> None:
+    """Aplica os PRAGMAs de sqlite_pragmas a cada nova conexão do engine"""
+    if engine.dialect.name != "sqlite" or getattr(engine, "_pragmas_configured", False):
+        return
+    pragmas = sqlite_pragmas(config, engine.url.database)
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    engine._pragmas_configured = True
+
+def configure_engines(app) -> None:
+    """
+    Completa SQLALCHEMY_ENGINE_OPTIONS com o perfil do banco e registra a
+    réplica de leitura em SQLALCHEMY_BINDS. Opções definidas explicitamente
+    na configuração têm precedência.
+    """
+    config = app.config
+    url = config["SQLALCHEMY_DATABASE_URI"]
+    config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **engine_profile(url, config), **config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    }
+
+    replica_url = config.get("DATABASE_REPLICA_URL")
+    if replica_url:
+        binds = dict(config.get("SQLALCHEMY_BINDS") or {})
+        binds.setdefault(REPLICA_BIND, {"url": replica_url, **engine_profile(replica_url, config)})
+        config["SQLALCHEMY_BINDS"] = binds
+
+def dispose_engines(app) -> None:
+    """
+    Descarta as conexões herdadas do processo pai. Deve ser chamado em cada
+    processo filho após um fork (ex.: post_fork do gunicorn com preload):
+    close=False abandona as conexões sem fechá-las, pois o pai ainda as usa.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
 
 def init_db(app):
     """Inicializa o banco de dados com a aplicação Flask"""
+    configure_engines(app)
     db.init_app(app)
 
+    # Migrações do esquema (flask db upgrade)
+    migrate.init_app(app, db, directory=os.path.join(os.path.dirname(app.root_path), "migrations"))
+
     with app.app_context():
+        for engine in db.engines.values():
+            configure_sqlite_engine(engine, app.config)
+
         # Importe todos os modelos aqui para garantir que eles sejam registrados com o SQLAlchemy
         from app.db.models.file import File
         from app.db.models.tag import Tag
+        from app.db.models.file_content import FileContent
+        from app.db.models.tag_cooccurrence import TagCooccurrence
+        from app.db.models.change_counter import ChangeCounter
+        from app.db.models.rate_limit_bucket import RateLimitBucket
+
+    # O esquema vem das migrações (flask db upgrade); criá-lo aqui faria cada
+    # processo que importa a aplicação abrir conexões e emitir DDL
+    if app.config.get("DATABASE_AUTO_CREATE"):
+        create_schema(app)
+
+def create_schema(app):
+    """
+    Cria as tabelas ausentes (db.create_all) e os índices de expressão das
+    chaves de metadados declaradas em METADATA_INDEXED_KEYS. Idempotente.
+    """
+    with app.app_context():
+        # Só no primário: a réplica de leitura recebe o esquema por replicação
+        db.create_all(bind_key=None)
 
-        # Crie todas as tabelas no banco de dados
-        db.create_all()
\ No newline at end of file
+        # Índices de expressão para as chaves de metadados mais consultadas
+        from app.services.metadata_service import ensure_metadata_indexes, parse_indexed_keys
+        indexed_keys = parse_indexed_keys(app.config.get("METADATA_INDEXED_KEYS", ""))
+        with db.engine.begin() as connection:
+            ensure_metadata_indexes(connection, indexed_keys)
\ No newline at end of file
@@ -0,0 +1,14 @@
+from app.db.database import db
+
+
+class ChangeCounter(db.Model):
+    """Contador de versão por escopo ("files", "files:project:<id>", "tags"...),
+    incrementado a cada commit que altera dados do escopo. Serve para
+    invalidar caches de forma barata entre processos."""
+    __tablename__ = "change_counters"
+
+    scope = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ChangeCounter {self.scope}={self.version}>"
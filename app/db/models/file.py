@@ -1,11 +1,35 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, BigInteger
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, BigInteger, Table, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, backref
 from sqlalchemy.sql import func
 
 from app.db.database import Base
 
+# Associação entre arquivos e tags
+file_tags = Table(
+    "file_tags",
+    Base.metadata,
+    Column("file_id", Integer, ForeignKey("files.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    # A chave primária cobre arquivo -> tags; este índice cobre tag -> arquivos
+    Index("ix_file_tags_tag_id_file_id", "tag_id", "file_id"),
+)
+
 class File(Base):
     __tablename__ = "files"
+    __table_args__ = (
+        # Índices dos filtros da listagem, terminando na coluna de ordenação
+        Index("ix_files_created_at", "created_at"),
+        Index("ix_files_project_id_created_at", "project_id", "created_at"),
+        Index("ix_files_project_id_file_type_created_at", "project_id", "file_type", "created_at"),
+        Index("ix_files_uploader_id_created_at", "uploader_id", "created_at"),
+        Index("ix_files_file_type_created_at", "file_type", "created_at"),
+        # Índice GIN para consultas de contenção (@>) nos metadados (apenas Postgres)
+        Index(
+            "ix_files_metadata_gin", "metadata",
+            postgresql_using="gin", postgresql_ops={"metadata": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
@@ -14,12 +38,40 @@ class File(Base):
     file_type = Column(String, nullable=False)
     file_size = Column(BigInteger, nullable=False)
     content_type = Column(String, nullable=False)
-    metadata = Column(Text)  # JSON string with metadata
-    uploader_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    # Metadados livres do arquivo. O nome "metadata" é reservado pelo SQLAlchemy,
+    # por isso o atributo se chama file_metadata (a coluna continua "metadata")
+    file_metadata = Column("metadata", JSON().with_variant(JSONB(), "postgresql"))
+    # Usuários e projetos pertencem ao sistema que chama a API: os IDs são
+    # referências externas, sem chave estrangeira (não há tabelas users/projects)
+    uploader_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    uploader = relationship("User", back_populates="files")
-    project = relationship("Project", back_populates="files")
\ No newline at end of file
+    tags = relationship("Tag", secondary=file_tags, backref=backref("files", lazy="dynamic"))
+
+    def __init__(self, **kwargs):
+        # Aceitar "metadata" como nome do argumento, como na API
+        if "metadata" in kwargs:
+            kwargs["file_metadata"] = kwargs.pop("metadata")
+        super().__init__(**kwargs)
+
+    def to_dict(self):
+        # As tags devem vir carregadas junto (selectinload) nas listagens,
+        # senão cada arquivo faz uma consulta a mais
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "original_filename": self.original_filename,
+            "file_path": self.file_path,
+            "file_type": self.file_type,
+            "file_size": self.file_size,
+            "content_type": self.content_type,
+            "metadata": self.file_metadata,
+            "uploader_id": self.uploader_id,
+            "project_id": self.project_id,
+            "tags": [tag.name for tag in self.tags],
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
\ No newline at end of file
@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+from app.db.database import db
+
+
+class FileContent(db.Model):
+    """Texto extraído do conteúdo de um arquivo, mantido fora da tabela files
+    para que as listagens não carreguem textos grandes."""
+    __tablename__ = "file_contents"
+
+    file_id = db.Column(db.Integer, db.ForeignKey("files.id", ondelete="CASCADE"), primary_key=True)
+    text = db.Column(db.Text, nullable=True)
+
+    # Palavras-chave mais frequentes do texto, usadas para gerar tags
+    keywords = db.Column(db.JSON, nullable=True)
+
+    # Informações sobre a extração
+    pages = db.Column(db.Integer, default=0)
+    truncated = db.Column(db.Boolean, default=False)
+    timed_out = db.Column(db.Boolean, default=False)
+    error = db.Column(db.String(255), nullable=True)
+
+    extracted_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<FileContent {self.file_id}>"
+
+    def to_dict(self):
+        return {
+            "file_id": self.file_id,
+            "keywords": self.keywords or [],
+            "pages": self.pages,
+            "truncated": self.truncated,
+            "timed_out": self.timed_out,
+            "error": self.error,
+            "extracted_at": self.extracted_at.isoformat() if self.extracted_at else None,
+        }
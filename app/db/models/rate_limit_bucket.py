@@ -0,0 +1,15 @@
+from app.db.database import db
+
+
+class RateLimitBucket(db.Model):
+    """Balde de limite de requisições por chave ("upload:client:<ip>",
+    "upload:project:<id>"...). Guarda só o instante teórico de chegada da
+    próxima requisição (GCRA), atualizado de forma atômica por todos os
+    processos."""
+    __tablename__ = "rate_limit_buckets"
+
+    key = db.Column(db.String(200), primary_key=True)
+    tat = db.Column(db.Float, nullable=False)
+
+    def __repr__(self):
+        return f"<RateLimitBucket {self.key}={self.tat}>"
@@ -1,8 +1,15 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from app.db.database import db 
 
+def utcnow():
+    return datetime.now(timezone.utc)
+
 class Tag(db.Model):
     __tablename__ = "tags"
+    __table_args__ = (
+        # Ordenação de list_tags e do autocomplete ("mais usadas primeiro")
+        db.Index("ix_tags_usage_count", "usage_count"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True)
@@ -15,8 +22,8 @@ class Tag(db.Model):
     usage_count = db.Column(db.Integer, default=0)
 
     # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.now(datetime.timezone.utc))
-    updated_at = db.Column(db.DateTime, default=datetime.now(datetime.timezone.utc), onupdate=datetime.now(datetime.timezone.utc))
+    created_at = db.Column(db.DateTime, default=utcnow)
+    updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow)
 
     def __repr__(self):
         return f"<Tag {self.name}>"
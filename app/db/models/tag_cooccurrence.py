@@ -0,0 +1,18 @@
+from app.db.database import db
+
+
+class TagCooccurrence(db.Model):
+    """Número de arquivos em que duas tags aparecem juntas. Cada par é
+    guardado nos dois sentidos para que os relacionados de uma tag sejam
+    lidos por uma única faixa do índice."""
+    __tablename__ = "tag_cooccurrences"
+    __table_args__ = (
+        db.Index("ix_tag_cooccurrences_tag_id_count", "tag_id", "count"),
+    )
+
+    tag_id = db.Column(db.Integer, db.ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    other_tag_id = db.Column(db.Integer, db.ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TagCooccurrence {self.tag_id}-{self.other_tag_id}: {self.count}>"
@@ -1,24 +1,55 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 
 from app.config import Config
 from app.api.routes import register_routes
-from app.db.database import init_db, db
+from app.db.database import create_schema, init_db, db
+from app.cli import register_commands
+from app.core.metrics import init_metrics
+from app.core.profiling import init_profiling
+from app.services.autocomplete_service import init_tag_index
+from app.services.usage_service import init_usage_counters
+from app.services.version_service import init_change_counters
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # Endereço, esquema e host do cliente atrás de proxies reversos confiáveis
+    proxies = app.config.get("PROXY_COUNT", 0)
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+
     # Inicializar CORS
     CORS(app, resources={r"/api/*": {"origins": "*"}})
 
     # Inicializar base de dados
     init_db(app)
 
+    # Manter o índice de autocomplete de tags atualizado
+    init_tag_index(app)
+
+    # Gravar as contagens de uso das tags com incrementos atômicos
+    init_usage_counters(app)
+
+    # Incrementar os contadores de versão usados para invalidar caches (depois
+    # dos contadores de uso, que também marcam versões ao gravar no commit)
+    init_change_counters(app)
+
+    # Métricas do Prometheus (/metrics)
+    init_metrics(app)
+
+    # Perfil de requisições sob demanda (cabeçalho X-Profile ou amostragem)
+    init_profiling(app)
+
     # Registrar rotas da API
     register_routes(app)
 
+    # Registrar comandos de linha de comando
+    register_commands(app)
+
     # Rotas de verificação de saúde
     @app.route("/heath")
     def heath_check():
@@ -26,11 +57,13 @@ def create_app(config_class=Config):
     
     return app
 
-app = create_app()
-
 if __name__ == "__main__":
+    app = create_app()
+    create_schema(app)
+
     # Criar diretório de armazenamento se não existir
     storage_path = os.environ.get("STORAGE_PATH", os.path.join(os.getcwd(), "storage"))
     os.makedirs(storage_path, exist_ok=True)
 
-    app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
+    # Servidor de desenvolvimento; em produção use o gunicorn (ver gunicorn.conf.py)
+    app.run(host="0.0.0.0", port=5000, debug=os.environ.get("FLASK_DEBUG") == "1")
\ No newline at end of file
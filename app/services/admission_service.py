@@ -0,0 +1,253 @@
+import json
+import math
+import os
+import time
+import logging
+from functools import wraps
+from threading import BoundedSemaphore, Lock
+from typing import Dict, List, Optional
+
+from flask import current_app, request
+from sqlalchemy import case, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from werkzeug.exceptions import ServiceUnavailable, TooManyRequests
+
+from app.db.database import db, insert_ignore
+from app.db.models.rate_limit_bucket import RateLimitBucket
+
+logger = logging.getLogger(__name__)
+
+# Vagas de execução simultânea por escopo ("upload", "tagging"), por processo
+_slots: Dict[str, BoundedSemaphore] = {}
+_slots_lock = Lock()
+
+# Última limpeza dos baldes ociosos neste processo (time.monotonic)
+_last_prune = 0.0
+
+
+def _reset_slots() -> None:
+    # Um processo filho (worker do gunicorn) começa sem requisições em andamento
+    global _slots, _slots_lock
+    _slots = {}
+    _slots_lock = Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_slots)
+
+
+def try_acquire_slot(scope: str, limit: int) -> Optional[BoundedSemaphore]:
+    """
+    Reserva uma vaga de execução do escopo sem esperar.
+
+    Args:
+        scope: Nome do escopo
+        limit: Máximo de execuções simultâneas no processo (0 = sem limite)
+
+    Returns:
+        O semáforo a liberar ao final, ou None se todas as vagas estão ocupadas
+    """
+    if limit <= 0:
+        slot = BoundedSemaphore(1)
+        slot.acquire()
+        return slot
+    with _slots_lock:
+        slot = _slots.get(scope)
+        if slot is None:
+            slot = _slots[scope] = BoundedSemaphore(limit)
+    return slot if slot.acquire(blocking=False) else None
+
+
+def _take(connection, key: str, per_minute: int, burst: int, now: float) -> float:
+    """Consome uma ficha do balde da chave na transação da conexão"""
+    interval = 60.0 / per_minute
+    window = max(burst, 1) * interval
+    table = RateLimitBucket.__table__
+    base = case((table.c.tat > now, table.c.tat), else_=now)
+
+    result = connection.execute(
+        table.update()
+        .where(table.c.key == key, base + interval <= now + window)
+        .values(tat=base + interval)
+    )
+    if result.rowcount:
+        return 0.0
+
+    # Primeira requisição da chave (ou balde vazio)
+    row = {"key": key, "tat": now + interval}
+    stmt = insert_ignore(table)
+    if stmt is not None:
+        if connection.execute(stmt, row).rowcount:
+            return 0.0
+    else:
+        try:
+            with connection.begin_nested():
+                connection.execute(table.insert(), row)
+            return 0.0
+        except IntegrityError:
+            pass
+
+    tat = connection.execute(select(table.c.tat).where(table.c.key == key)).scalar()
+    return max(tat - now - window + interval, interval / 1000) if tat is not None else 0.0
+
+
+def take_tokens(keys: List[str], per_minute: int, burst: int, now: Optional[float] = None) -> float:
+    """
+    Consome uma ficha do balde de cada chave, ou de nenhuma.
+
+    O balde de fichas é guardado na forma GCRA: em vez de fichas e instante
+    da última recarga, só o instante teórico de chegada (tat) da próxima
+    requisição. Com isso a verificação e o consumo cabem em um único UPDATE
+    condicional, atômico entre processos e instâncias que usam o mesmo banco.
+    Todas as chaves são consumidas na mesma transação, desfeita se alguma
+    recusar: uma requisição recusada pelo projeto não gasta a ficha do cliente.
+
+    Args:
+        keys: Chaves dos baldes (ex.: "upload:client:10.0.0.1")
+        per_minute: Fichas repostas por minuto
+        burst: Capacidade do balde (requisições seguidas permitidas)
+        now: Instante atual (padrão: time.time())
+
+    Returns:
+        0 se a requisição foi admitida; senão, segundos até haver uma ficha
+        em todos os baldes
+    """
+    now = time.time() if now is None else now
+    with db.engine.connect() as connection:
+        with connection.begin() as transaction:
+            wait = 0.0
+            for key in keys:
+                wait = max(wait, _take(connection, key, per_minute, burst, now))
+            if wait:
+                transaction.rollback()
+    return wait
+
+
+def take_token(key: str, per_minute: int, burst: int, now: Optional[float] = None) -> float:
+    """
+    Consome uma ficha do balde da chave (ver take_tokens).
+    """
+    return take_tokens([key], per_minute, burst, now)
+
+
+def bucket_wait(key: str, per_minute: int, burst: int, now: Optional[float] = None) -> float:
+    """
+    Segundos até haver uma ficha no balde da chave, sem consumi-la.
+    """
+    now = time.time() if now is None else now
+    interval = 60.0 / per_minute
+    window = max(burst, 1) * interval
+    table = RateLimitBucket.__table__
+    with db.engine.connect() as connection:
+        tat = connection.execute(select(table.c.tat).where(table.c.key == key)).scalar()
+    return max(tat - now - window + interval, 0.0) if tat is not None else 0.0
+
+
+def prune_buckets(now: Optional[float] = None) -> int:
+    """
+    Exclui os baldes cheios (tat no passado): equivalem a uma chave que
+    nunca fez requisições, e sem isso cada endereço de origem deixaria uma
+    linha para sempre.
+
+    Returns:
+        Número de baldes excluídos
+    """
+    now = time.time() if now is None else now
+    table = RateLimitBucket.__table__
+    with db.engine.begin() as connection:
+        return connection.execute(table.delete().where(table.c.tat < now)).rowcount
+
+
+def _prune_if_due() -> None:
+    global _last_prune
+    interval = current_app.config.get("RATE_LIMIT_PRUNE_SECONDS", 300)
+    if time.monotonic() - _last_prune < interval:
+        return
+    _last_prune = time.monotonic()
+    prune_buckets()
+
+
+def _form_project_id() -> Optional[int]:
+    """Projeto dos metadados do formulário de upload (mesma chave da rota)"""
+    if request.mimetype not in ("multipart/form-data", "application/x-www-form-urlencoded"):
+        return None
+    try:
+        metadata = json.loads(request.form.get("metadata", "{}"))
+        return int(metadata["projects_id"])
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def check_rate_limit(scope: str) -> float:
+    """
+    Aplica RATE_LIMIT (por minuto) e RATE_LIMIT_BURST ao cliente (endereço
+    de origem, que atrás de proxies depende de PROXY_COUNT) e ao projeto da
+    requisição.
+
+    O projeto vem de ?project_id= ou, nos uploads, dos metadados do
+    formulário. Neste caso o corpo precisa ser lido: antes disso o balde do
+    cliente é consultado, para recusar sem receber o upload quem já está
+    acima do limite.
+
+    Returns:
+        0 se admitida; senão, segundos a esperar (maior entre as chaves)
+    """
+    config = current_app.config
+    per_minute, burst = config["RATE_LIMIT"], config["RATE_LIMIT_BURST"]
+    client_key = f"{scope}:client:{request.remote_addr or 'unknown'}"
+    try:
+        _prune_if_due()
+        project_id = request.args.get("project_id", type=int)
+        if project_id is None:
+            wait = bucket_wait(client_key, per_minute, burst)
+            if wait:
+                return wait
+            project_id = _form_project_id()
+
+        keys = [client_key]
+        if project_id is not None:
+            keys.append(f"{scope}:project:{project_id}")
+        return take_tokens(keys, per_minute, burst)
+    except SQLAlchemyError as e:
+        # Sem o estado compartilhado, admitir: o limite de vagas continua valendo
+        logger.warning(f"Limite de requisições indisponível: {str(e)}")
+        return 0.0
+
+
+def admission_control(scope: str, max_in_flight: str):
+    """
+    Decorador de rotas caras (uploads, tags em massa): recusa a requisição
+    logo no início, antes de ler o corpo, quando o processo já tem
+    execuções demais do escopo em andamento (503) ou quando o cliente ou
+    projeto excedeu o limite de requisições (429). Ambas as respostas
+    trazem Retry-After.
+
+    As vagas são contadas em cada processo, não no banco: o máximo da
+    instância é o número de workers vezes o valor configurado.
+
+    Args:
+        scope: Escopo das vagas e dos baldes de limite
+        max_in_flight: Chave de configuração com o máximo de execuções simultâneas por worker
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            config = current_app.config
+            slot = try_acquire_slot(scope, config.get(max_in_flight, 0))
+            if slot is None:
+                raise ServiceUnavailable(
+                    "Servidor ocupado. Tente novamente em instantes.",
+                    retry_after=config.get("ADMISSION_RETRY_AFTER_SECONDS", 5),
+                )
+            try:
+                if config.get("RATE_LIMIT_ENABLED"):
+                    wait = check_rate_limit(scope)
+                    if wait:
+                        raise TooManyRequests(
+                            "Limite de requisições excedido.", retry_after=math.ceil(wait)
+                        )
+                return view(*args, **kwargs)
+            finally:
+                slot.release()
+        return wrapper
+    return decorator
@@ -0,0 +1,668 @@
+import os
+import lzma
+import struct
+import logging
+import tarfile
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.services.storage_service import open_file
+
+logger = logging.getLogger(__name__)
+
+# Limites padrão da leitura do índice de um arquivo compactado
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_MAX_INDEX_BYTES = 16 * 1024 * 1024
+
+# Em tar compactados (.tar.gz, .tar.xz...) os cabeçalhos só são alcançados
+# descompactando o fluxo: a leitura para após este volume descompactado
+DEFAULT_MAX_STREAM_BYTES = 64 * 1024 * 1024
+
+# Bomba de descompressão: razão tamanho descompactado / tamanho do arquivo
+# acima do limite, desde que o total descompactado também seja grande
+DEFAULT_BOMB_RATIO = 100
+DEFAULT_BOMB_MIN_BYTES = 1024 * 1024 * 1024
+
+# Número de tipos internos mantidos no manifesto
+TOP_TYPES = 5
+
+# Fração mínima das entradas para que um tipo interno vire tag
+TAG_MIN_SHARE = 0.25
+
+UNKNOWN_TYPE = "outros"
+
+
+def _entry(name: str, size: Optional[int], is_dir: bool = False, encrypted: bool = False):
+    return name, size, is_dir, encrypted
+
+
+# ZIP: apenas o diretório central, a partir do registro de fim (EOCD)
+
+ZIP_EOCD = struct.Struct("<4s4H2LH")
+ZIP64_LOCATOR = struct.Struct("<4sLQL")
+ZIP64_EOCD = struct.Struct("<4sQ2H2L4Q")
+ZIP_CENTRAL = struct.Struct("<4s4B4HL2L5H2L")
+ZIP_MAX_COMMENT = 65535
+
+
+def _zip_directory(f, size: int) -> Tuple[int, int, int]:
+    """
+    Localiza o diretório central: retorna (posição, tamanho, entradas declaradas).
+    """
+    tail_size = min(size, ZIP_EOCD.size + ZIP_MAX_COMMENT)
+    f.seek(size - tail_size)
+    tail = f.read(tail_size)
+    index = tail.rfind(b"PK\x05\x06")
+    if index < 0 or len(tail) - index < ZIP_EOCD.size:
+        raise ValueError("Registro de fim do ZIP não encontrado")
+    eocd_pos = size - tail_size + index
+    _, _, _, _, entries, cd_size, cd_offset, _ = ZIP_EOCD.unpack_from(tail, index)
+
+    # ZIP64: o localizador fica logo antes do EOCD
+    if index >= ZIP64_LOCATOR.size and tail[index - ZIP64_LOCATOR.size:index - ZIP64_LOCATOR.size + 4] == b"PK\x06\x07":
+        _, _, eocd64_offset, _ = ZIP64_LOCATOR.unpack_from(tail, index - ZIP64_LOCATOR.size)
+        f.seek(eocd64_offset)
+        record = f.read(ZIP64_EOCD.size)
+        if len(record) == ZIP64_EOCD.size and record[:4] == b"PK\x06\x06":
+            values = ZIP64_EOCD.unpack(record)
+            entries, cd_size, cd_offset = values[7], values[8], values[9]
+            eocd_pos = eocd64_offset
+
+    # Dados antes do ZIP (ex.: executáveis autoextraíveis) deslocam os offsets
+    start = max(eocd_pos - cd_size - cd_offset, 0)
+    return cd_offset + start, cd_size, entries
+
+
+def _zip64_sizes(extra: bytes, sizes: List[int]) -> List[int]:
+    """Substitui os campos 0xFFFFFFFF pelos valores do campo extra ZIP64"""
+    offset = 0
+    while offset + 4 <= len(extra):
+        header_id, length = struct.unpack_from("<HH", extra, offset)
+        if header_id == 0x0001:
+            values = extra[offset + 4:offset + 4 + length]
+            position = 0
+            for index, value in enumerate(sizes):
+                if value == 0xFFFFFFFF and position + 8 <= len(values):
+                    sizes[index] = struct.unpack_from("<Q", values, position)[0]
+                    position += 8
+            break
+        offset += 4 + length
+    return sizes
+
+
+def iter_zip_entries(path: str, max_entries: int, max_index_bytes: int,
+                     state: Dict[str, Any]) -> Iterator[Tuple[str, Optional[int], bool, bool]]:
+    """
+    Percorre o diretório central de um ZIP sem ler o conteúdo: algumas
+    leituras no fim do arquivo e uma leitura sequencial do índice.
+    """
+    size = os.path.getsize(path)
+    with open_file(path) as f:
+        position, cd_size, declared = _zip_directory(f, size)
+        state["declared_entries"] = declared
+        f.seek(position)
+        remaining = min(cd_size, max_index_bytes)
+        offsets = set()
+
+        for _ in range(min(declared, max_entries)):
+            if remaining < ZIP_CENTRAL.size:
+                break
+            record = f.read(ZIP_CENTRAL.size)
+            if len(record) < ZIP_CENTRAL.size or record[:4] != b"PK\x01\x02":
+                break
+            fields = ZIP_CENTRAL.unpack(record)
+            flags, name_length, extra_length, comment_length = fields[5], fields[12], fields[13], fields[14]
+            name = f.read(name_length)
+            extra = f.read(extra_length)
+            f.seek(comment_length, os.SEEK_CUR)
+            remaining -= ZIP_CENTRAL.size + name_length + extra_length + comment_length
+
+            file_size, _, header_offset = _zip64_sizes(extra, [fields[11], fields[10], fields[18]])
+            # Entradas que apontam para o mesmo conteúdo são típicas de bombas
+            if header_offset in offsets:
+                state["overlapping"] = True
+            offsets.add(header_offset)
+
+            name = name.decode("utf-8" if flags & 0x800 else "cp437", errors="replace")
+            yield _entry(name, file_size, name.endswith("/"), bool(flags & 0x1))
+
+
+# TAR: cabeçalhos lidos em sequência, pulando o conteúdo de cada membro
+
+COMPRESSED_TAR_MAGIC = (b"\x1f\x8b", b"BZh", b"\xfd7zXZ\x00")
+
+
+def iter_tar_entries(path: str, max_entries: int, max_stream_bytes: int,
+                     state: Dict[str, Any]) -> Iterator[Tuple[str, Optional[int], bool, bool]]:
+    """
+    Percorre os cabeçalhos de um tar. Em tar sem compressão o conteúdo é
+    pulado com seek; nos compactados a leitura para em max_stream_bytes.
+    """
+    with open_file(path) as f:
+        compressed = f.read(6).startswith(COMPRESSED_TAR_MAGIC)
+
+    with open_file(path) as f, tarfile.open(fileobj=f, mode="r:*") as tar:
+        count = 0
+        while count < max_entries:
+            if compressed and tar.offset > max_stream_bytes:
+                state["truncated"] = True
+                return
+            member = tar.next()
+            if member is None:
+                return
+            # Apenas os cabeçalhos ficam em memória
+            tar.members = []
+            count += 1
+            yield _entry(member.name, member.size if member.isfile() else 0, member.isdir())
+        state["truncated"] = True
+
+
+def gzip_member(path: str, filename: str) -> Optional[Tuple[str, Optional[int], bool, bool]]:
+    """
+    Descreve um .gz de arquivo único pelo cabeçalho (nome original) e pelo
+    trailer (tamanho descompactado módulo 2^32), sem descompactar.
+    """
+    size = os.path.getsize(path)
+    with open_file(path) as f:
+        header = f.read(10)
+        if len(header) < 10 or header[:2] != b"\x1f\x8b":
+            return None
+        name = None
+        flags = header[3]
+        if flags & 0x04:
+            extra_length = struct.unpack("<H", f.read(2))[0]
+            f.seek(extra_length, os.SEEK_CUR)
+        if flags & 0x08:
+            raw = bytearray()
+            while len(raw) < 1024:
+                char = f.read(1)
+                if not char or char == b"\x00":
+                    break
+                raw += char
+            name = raw.decode("latin-1")
+        f.seek(size - 4)
+        original_size = struct.unpack("<I", f.read(4))[0]
+    if not name:
+        name = os.path.splitext(os.path.basename(filename))[0]
+    return _entry(name, original_size)
+
+
+# 7z: cabeçalho de assinatura + cabeçalho no fim (possivelmente compactado)
+
+SEVENZIP_SIGNATURE = b"7z\xbc\xaf\x27\x1c"
+SEVENZIP_SIGNATURE_HEADER = 32
+
+K_END, K_HEADER, K_ARCHIVE_PROPERTIES, K_ADDITIONAL_STREAMS = 0x00, 0x01, 0x02, 0x03
+K_MAIN_STREAMS, K_FILES_INFO, K_PACK_INFO, K_UNPACK_INFO = 0x04, 0x05, 0x06, 0x07
+K_SUBSTREAMS_INFO, K_SIZE, K_CRC, K_FOLDER, K_CODERS_UNPACK_SIZE = 0x08, 0x09, 0x0A, 0x0B, 0x0C
+K_NUM_UNPACK_STREAM, K_EMPTY_STREAM, K_NAME, K_ENCODED_HEADER = 0x0D, 0x0E, 0x11, 0x17
+
+SEVENZIP_LZMA = b"\x03\x01\x01"
+SEVENZIP_LZMA2 = b"\x21"
+SEVENZIP_AES = b"\x06\xf1\x07\x01"
+
+
+class _SevenZipReader:
+    """Leitor dos campos do cabeçalho 7z (números de tamanho variável)"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def byte(self) -> int:
+        if self.pos >= len(self.data):
+            raise ValueError("Cabeçalho 7z truncado")
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def bytes(self, length: int) -> bytes:
+        if self.pos + length > len(self.data):
+            raise ValueError("Cabeçalho 7z truncado")
+        value = self.data[self.pos:self.pos + length]
+        self.pos += length
+        return value
+
+    def number(self) -> int:
+        first = self.byte()
+        mask = 0x80
+        value = 0
+        for index in range(8):
+            if not first & mask:
+                return value | ((first & (mask - 1)) << (8 * index))
+            value |= self.byte() << (8 * index)
+            mask >>= 1
+        return value
+
+    def bits(self, count: int) -> List[bool]:
+        values = []
+        current = mask = 0
+        for _ in range(count):
+            if mask == 0:
+                current, mask = self.byte(), 0x80
+            values.append(bool(current & mask))
+            mask >>= 1
+        return values
+
+    def digests(self, count: int) -> List[bool]:
+        defined = [True] * count if self.byte() else self.bits(count)
+        self.bytes(4 * sum(defined))
+        return defined
+
+
+def _7z_folder(reader: _SevenZipReader) -> Dict[str, Any]:
+    coders = []
+    total_out = total_in = 0
+    for _ in range(reader.number()):
+        flags = reader.byte()
+        coder_id = reader.bytes(flags & 0x0F)
+        streams_in, streams_out = (reader.number(), reader.number()) if flags & 0x10 else (1, 1)
+        properties = reader.bytes(reader.number()) if flags & 0x20 else b""
+        coders.append((coder_id, properties))
+        total_in += streams_in
+        total_out += streams_out
+    bound_out = set()
+    for _ in range(total_out - 1):
+        reader.number()
+        bound_out.add(reader.number())
+    packed = total_in - (total_out - 1)
+    if packed > 1:
+        for _ in range(packed):
+            reader.number()
+    # A saída final da pasta é o único fluxo de saída não ligado a outro coder
+    final_out = next((index for index in range(total_out) if index not in bound_out), 0)
+    return {"coders": coders, "outputs": total_out, "final_out": final_out}
+
+
+def _7z_streams(reader: _SevenZipReader) -> Dict[str, Any]:
+    """Lê um StreamsInfo: posições compactadas, pastas e subfluxos"""
+    info: Dict[str, Any] = {"pack_pos": 0, "pack_sizes": [], "folders": [], "substreams": []}
+    while True:
+        kind = reader.number()
+        if kind == K_END:
+            break
+        if kind == K_PACK_INFO:
+            info["pack_pos"] = reader.number()
+            count = reader.number()
+            while True:
+                field = reader.number()
+                if field == K_END:
+                    break
+                if field == K_SIZE:
+                    info["pack_sizes"] = [reader.number() for _ in range(count)]
+                elif field == K_CRC:
+                    reader.digests(count)
+        elif kind == K_UNPACK_INFO:
+            if reader.number() != K_FOLDER:
+                raise ValueError("Cabeçalho 7z inesperado")
+            count = reader.number()
+            if reader.byte():
+                raise ValueError("Pastas externas não suportadas")
+            folders = [_7z_folder(reader) for _ in range(count)]
+            if reader.number() != K_CODERS_UNPACK_SIZE:
+                raise ValueError("Cabeçalho 7z inesperado")
+            for folder in folders:
+                folder["sizes"] = [reader.number() for _ in range(folder["outputs"])]
+                folder["size"] = folder["sizes"][folder["final_out"]]
+                folder["crc"] = False
+            while True:
+                field = reader.number()
+                if field == K_END:
+                    break
+                if field == K_CRC:
+                    for folder, defined in zip(folders, reader.digests(count)):
+                        folder["crc"] = defined
+            info["folders"] = folders
+        elif kind == K_SUBSTREAMS_INFO:
+            folders = info["folders"]
+            counts = [1] * len(folders)
+            sizes: List[int] = []
+            field = reader.number()
+            if field == K_NUM_UNPACK_STREAM:
+                counts = [reader.number() for _ in folders]
+                field = reader.number()
+            if field == K_SIZE:
+                for folder, count in zip(folders, counts):
+                    if count == 0:
+                        continue
+                    partial = [reader.number() for _ in range(count - 1)]
+                    sizes += partial + [folder["size"] - sum(partial)]
+                field = reader.number()
+            else:
+                for folder, count in zip(folders, counts):
+                    if count == 1:
+                        sizes.append(folder["size"])
+            while field != K_END:
+                if field == K_CRC:
+                    missing = sum(
+                        count for folder, count in zip(folders, counts)
+                        if count != 1 or not folder["crc"]
+                    )
+                    reader.digests(missing)
+                field = reader.number()
+            info["substreams"] = sizes
+        else:
+            raise ValueError("Cabeçalho 7z inesperado")
+
+    if not info["substreams"]:
+        info["substreams"] = [folder["size"] for folder in info["folders"]]
+    return info
+
+
+def _7z_decode(f, streams: Dict[str, Any], max_index_bytes: int) -> bytes:
+    """Descompacta o cabeçalho codificado (LZMA ou LZMA2)"""
+    folder = streams["folders"][0]
+    if len(folder["coders"]) != 1:
+        raise ValueError("Cabeçalho 7z com vários coders não suportado")
+    coder_id, properties = folder["coders"][0]
+    if coder_id == SEVENZIP_LZMA and len(properties) >= 5:
+        lc_lp_pb = properties[0]
+        filters = [{
+            "id": lzma.FILTER_LZMA1,
+            "dict_size": struct.unpack("<I", properties[1:5])[0],
+            "lc": lc_lp_pb % 9, "lp": (lc_lp_pb // 9) % 5, "pb": lc_lp_pb // 45,
+        }]
+    elif coder_id == SEVENZIP_LZMA2 and properties:
+        bits = properties[0]
+        dict_size = 0xFFFFFFFF if bits == 40 else (2 | (bits & 1)) << (bits // 2 + 11)
+        filters = [{"id": lzma.FILTER_LZMA2, "dict_size": dict_size}]
+    elif coder_id == SEVENZIP_AES:
+        raise PermissionError("Cabeçalho 7z criptografado")
+    else:
+        raise ValueError("Codificação do cabeçalho 7z não suportada")
+
+    packed_size = streams["pack_sizes"][0]
+    if packed_size > max_index_bytes or folder["size"] > max_index_bytes:
+        raise ValueError("Cabeçalho 7z maior que o limite")
+    f.seek(SEVENZIP_SIGNATURE_HEADER + streams["pack_pos"])
+    decompressor = lzma.LZMADecompressor(lzma.FORMAT_RAW, filters=filters)
+    return decompressor.decompress(f.read(packed_size), max_length=folder["size"])
+
+
+def _7z_files(reader: _SevenZipReader, sizes: List[int], max_entries: int):
+    count = reader.number()
+    empty = [False] * count
+    names: List[str] = []
+    while True:
+        kind = reader.number()
+        if kind == K_END:
+            break
+        data = reader.bytes(reader.number())
+        if kind == K_EMPTY_STREAM:
+            empty = _SevenZipReader(data).bits(count)
+        elif kind == K_NAME and data and data[0] == 0:
+            names = data[1:].decode("utf-16-le", errors="replace").split("\x00")[:count]
+
+    streams = iter(sizes)
+    for index in range(min(count, max_entries)):
+        name = names[index] if index < len(names) else f"entry_{index}"
+        if empty[index]:
+            # Sem conteúdo: diretórios e arquivos vazios (tratados como diretório)
+            yield _entry(name, 0, True)
+        else:
+            yield _entry(name, next(streams, None))
+
+
+def iter_7z_entries(path: str, max_entries: int, max_index_bytes: int,
+                    state: Dict[str, Any]) -> Iterator[Tuple[str, Optional[int], bool, bool]]:
+    """
+    Lê o índice de um 7z: o cabeçalho de assinatura aponta para o cabeçalho
+    no fim do arquivo, que pode estar compactado (LZMA/LZMA2).
+    """
+    with open_file(path) as f:
+        start = f.read(SEVENZIP_SIGNATURE_HEADER)
+        if len(start) < SEVENZIP_SIGNATURE_HEADER or start[:6] != SEVENZIP_SIGNATURE:
+            raise ValueError("Assinatura 7z inválida")
+        next_offset, next_size = struct.unpack_from("<QQ", start, 12)
+        if next_size == 0:
+            return
+        if next_size > max_index_bytes:
+            raise ValueError("Cabeçalho 7z maior que o limite")
+        f.seek(SEVENZIP_SIGNATURE_HEADER + next_offset)
+        reader = _SevenZipReader(f.read(next_size))
+
+        kind = reader.number()
+        while kind == K_ENCODED_HEADER:
+            try:
+                reader = _SevenZipReader(_7z_decode(f, _7z_streams(reader), max_index_bytes))
+            except PermissionError:
+                state["encrypted"] = True
+                return
+            kind = reader.number()
+        if kind != K_HEADER:
+            raise ValueError("Cabeçalho 7z inesperado")
+
+    sizes: List[int] = []
+    while True:
+        kind = reader.number()
+        if kind == K_END:
+            return
+        if kind == K_ARCHIVE_PROPERTIES:
+            while reader.number() != K_END:
+                reader.bytes(reader.number())
+        elif kind == K_ADDITIONAL_STREAMS:
+            _7z_streams(reader)
+        elif kind == K_MAIN_STREAMS:
+            streams = _7z_streams(reader)
+            sizes = streams["substreams"]
+            if any(coder[0] == SEVENZIP_AES for folder in streams["folders"] for coder in folder["coders"]):
+                state["encrypted"] = True
+        elif kind == K_FILES_INFO:
+            yield from _7z_files(reader, sizes, max_entries)
+            return
+
+
+# ISO 9660: descritor de volume primário e registros de diretório
+
+ISO_SECTOR = 2048
+ISO_PVD_SECTOR = 16
+
+
+def iter_iso_entries(path: str, max_entries: int, max_index_bytes: int,
+                     state: Dict[str, Any]) -> Iterator[Tuple[str, Optional[int], bool, bool]]:
+    """
+    Percorre a árvore de diretórios de uma imagem ISO 9660 lendo só as
+    extensões de diretório, nunca o conteúdo dos arquivos.
+    """
+    with open_file(path) as f:
+        f.seek(ISO_PVD_SECTOR * ISO_SECTOR)
+        descriptor = f.read(ISO_SECTOR)
+        if descriptor[1:6] != b"CD001" or descriptor[0] != 1:
+            raise ValueError("Descritor de volume ISO não encontrado")
+        root = descriptor[156:190]
+        pending = [("", struct.unpack_from("<I", root, 2)[0], struct.unpack_from("<I", root, 10)[0])]
+        visited = set()
+        budget = max_index_bytes
+        count = 0
+
+        while pending:
+            prefix, extent, length = pending.pop(0)
+            if extent in visited:
+                continue
+            visited.add(extent)
+            length = min(length, budget)
+            budget -= length
+            f.seek(extent * ISO_SECTOR)
+            data = f.read(length)
+
+            offset = 0
+            while offset < len(data):
+                record_length = data[offset]
+                if record_length == 0:
+                    # Registros não atravessam setores: pular para o próximo
+                    offset = (offset // ISO_SECTOR + 1) * ISO_SECTOR
+                    continue
+                record = data[offset:offset + record_length]
+                offset += record_length
+                if len(record) < 34:
+                    break
+                name_length = record[32]
+                raw_name = record[33:33 + name_length]
+                if raw_name in (b"\x00", b"\x01"):
+                    continue
+                name = prefix + raw_name.decode("latin-1").split(";", 1)[0].rstrip(".")
+                child_extent, child_length = struct.unpack_from("<I", record, 2)[0], struct.unpack_from("<I", record, 10)[0]
+                is_dir = bool(record[25] & 0x02)
+                count += 1
+                if count > max_entries:
+                    state["truncated"] = True
+                    return
+                if is_dir:
+                    pending.append((name + "/", child_extent, child_length))
+                    yield _entry(name + "/", 0, True)
+                else:
+                    yield _entry(name, child_length)
+
+            if budget <= 0:
+                state["truncated"] = True
+                return
+
+
+def _detect_format(head: bytes, filename: str) -> Optional[str]:
+    if head.startswith(b"PK\x03\x04") or head.startswith(b"PK\x05\x06"):
+        return "zip"
+    if head.startswith(SEVENZIP_SIGNATURE):
+        return "7z"
+    if head[257:262] == b"ustar" or head.startswith(COMPRESSED_TAR_MAGIC):
+        return "tar"
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".iso":
+        return "iso"
+    if ext == ".tar":
+        return "tar"
+    return None
+
+
+def read_archive_manifest(path: str, filename: str, categories: Dict[str, str],
+                          max_entries: int = DEFAULT_MAX_ENTRIES,
+                          max_index_bytes: int = DEFAULT_MAX_INDEX_BYTES,
+                          max_stream_bytes: int = DEFAULT_MAX_STREAM_BYTES,
+                          bomb_ratio: float = DEFAULT_BOMB_RATIO,
+                          bomb_min_bytes: int = DEFAULT_BOMB_MIN_BYTES) -> Optional[Dict[str, Any]]:
+    """
+    Monta o manifesto de um arquivo compactado (ZIP, tar, 7z ou ISO) lendo
+    apenas o índice: número de entradas, tamanho descompactado total, tipos
+    internos predominantes e sinais de bomba de descompressão.
+
+    Args:
+        path: Caminho do arquivo
+        filename: Nome original
+        categories: Mapa extensão -> categoria usado para os tipos internos
+        max_entries: Número máximo de entradas lidas
+        max_index_bytes: Bytes máximos do índice (diretório central, cabeçalho 7z...)
+        max_stream_bytes: Volume descompactado máximo percorrido em tar compactados
+        bomb_ratio: Razão de compressão a partir da qual o arquivo é suspeito
+        bomb_min_bytes: Tamanho descompactado mínimo para considerar a razão
+
+    Returns:
+        Dicionário com o manifesto, ou None se o formato não é suportado
+    """
+    with open_file(path) as f:
+        head = f.read(512)
+    archive_format = _detect_format(head, filename)
+    if archive_format is None:
+        return None
+
+    state: Dict[str, Any] = {}
+    if archive_format == "zip":
+        entries = iter_zip_entries(path, max_entries, max_index_bytes, state)
+    elif archive_format == "7z":
+        entries = iter_7z_entries(path, max_entries, max_index_bytes, state)
+    elif archive_format == "iso":
+        entries = iter_iso_entries(path, max_entries, max_index_bytes, state)
+    else:
+        entries = iter_tar_entries(path, max_entries, max_stream_bytes, state)
+
+    files = directories = 0
+    total_size = 0
+    size_known = True
+    encrypted = False
+    types: Counter = Counter()
+    extensions: Counter = Counter()
+    nested_archives = 0
+    try:
+        for name, size, is_dir, entry_encrypted in entries:
+            if is_dir:
+                directories += 1
+                continue
+            files += 1
+            encrypted = encrypted or entry_encrypted
+            if size is None:
+                size_known = False
+            else:
+                total_size += size
+            ext = os.path.splitext(name)[1].lower()
+            category = categories.get(ext, UNKNOWN_TYPE)
+            types[category] += 1
+            if ext:
+                extensions[ext.lstrip(".")] += 1
+            if category == "archives":
+                nested_archives += 1
+    except tarfile.ReadError:
+        if archive_format != "tar" or not head.startswith(b"\x1f\x8b") or files:
+            logger.warning(f"Não foi possível ler o índice do arquivo {path}", exc_info=True)
+            return None
+        # .gz de um único arquivo (não é tar)
+        archive_format = "gzip"
+        name, total_size = gzip_member(path, filename)[:2]
+        files = 1
+        ext = os.path.splitext(name)[1].lower()
+        types[categories.get(ext, UNKNOWN_TYPE)] += 1
+        if ext:
+            extensions[ext.lstrip(".")] += 1
+    except (tarfile.TarError, ValueError, OSError, EOFError, lzma.LZMAError, struct.error):
+        logger.warning(f"Não foi possível ler o índice do arquivo {path}", exc_info=True)
+        return None
+
+    archive_size = os.path.getsize(path)
+    ratio = round(total_size / archive_size, 1) if archive_size and size_known else None
+
+    # Sinais de bomba de descompressão, todos obtidos só do índice
+    reasons = []
+    if ratio is not None and ratio >= bomb_ratio and total_size >= bomb_min_bytes:
+        reasons.append("compression_ratio")
+    if state.get("overlapping"):
+        reasons.append("overlapping_entries")
+    if state.get("declared_entries", 0) > max_entries or (state.get("truncated") and archive_format != "tar"):
+        reasons.append("too_many_entries")
+
+    return {
+        "format": archive_format,
+        "entries": files + directories,
+        "files": files,
+        "directories": directories,
+        "total_size": total_size if size_known else None,
+        "compression_ratio": ratio,
+        "types": dict(types.most_common(TOP_TYPES)),
+        "dominant_type": types.most_common(1)[0][0] if types else None,
+        "extensions": dict(extensions.most_common(TOP_TYPES)),
+        "nested_archives": nested_archives,
+        "encrypted": encrypted or bool(state.get("encrypted")),
+        "truncated": bool(state.get("truncated")) or state.get("declared_entries", 0) > max_entries,
+        "suspicious": bool(reasons),
+        "bomb_reasons": reasons,
+    }
+
+
+def archive_tags(manifest: Optional[Dict[str, Any]]) -> List[str]:
+    """
+    Sugere tags pelo conteúdo do arquivo compactado: tipos internos que
+    representam boa parte das entradas, extensão predominante e alertas.
+    """
+    if not manifest:
+        return []
+
+    tags = []
+    files = manifest.get("files") or 0
+    for category, count in (manifest.get("types") or {}).items():
+        if files and category != UNKNOWN_TYPE and count / files >= TAG_MIN_SHARE:
+            tags.append(category)
+    for ext, count in (manifest.get("extensions") or {}).items():
+        if files and count / files >= TAG_MIN_SHARE and ext not in tags:
+            tags.append(ext)
+            break
+    if manifest.get("encrypted"):
+        tags.append("encrypted")
+    if manifest.get("suspicious"):
+        tags.append("zip-bomb")
+    return tags
@@ -0,0 +1,287 @@
+import time
+import heapq
+import logging
+from threading import RLock
+from typing import Dict, Any, List, Optional
+
+from flask import current_app
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+class _TrieNode:
+    __slots__ = ("children", "tag_id", "top", "size")
+
+    def __init__(self):
+        self.children = {}
+        self.tag_id = None  # ID da tag que termina neste nó
+        self.top = []       # IDs das tags mais usadas da subárvore, em ordem
+        self.size = 0       # Número de tags na subárvore
+
+
+class TagTrie:
+    """
+    Árvore de prefixos com os nomes das tags. Cada nó guarda as `top_k` tags
+    mais usadas da sua subárvore, de modo que uma consulta custa apenas o
+    percurso do prefixo, independentemente do número de tags.
+    """
+
+    def __init__(self, top_k: int = 20):
+        self.top_k = top_k
+        self._root = _TrieNode()
+        self._tags = {}  # id -> (nome, contagem de uso)
+        self._lock = RLock()
+
+    def __len__(self):
+        return len(self._tags)
+
+    def __contains__(self, tag_id):
+        return tag_id in self._tags
+
+    def _key(self, tag_id):
+        name, usage = self._tags[tag_id]
+        return (-usage, name)
+
+    def _path(self, name):
+        """Retorna os nós do caminho de um nome, da raiz até o nó final"""
+        nodes = [self._root]
+        node = self._root
+        for char in name:
+            node = node.children.get(char)
+            if node is None:
+                return None
+            nodes.append(node)
+        return nodes
+
+    def _refill(self, node):
+        """
+        Recalcula a lista de mais usadas de um nó a partir das listas dos
+        filhos, sem percorrer a subárvore: custa no máximo top_k candidatos
+        por filho. As listas dos filhos devem estar atualizadas (os caminhos
+        são percorridos da folha para a raiz).
+        """
+        candidates = [node.tag_id] if node.tag_id is not None else []
+        for child in node.children.values():
+            candidates.extend(child.top)
+        node.top = heapq.nsmallest(self.top_k, candidates, key=self._key)
+
+    def _promote(self, node, tag_id):
+        """Insere ou reposiciona uma tag na lista de mais usadas de um nó"""
+        if tag_id in node.top:
+            node.top.remove(tag_id)
+        node.top.append(tag_id)
+        node.top.sort(key=self._key)
+        del node.top[self.top_k:]
+
+    def add(self, tag_id: int, name: str, usage: int = 0) -> None:
+        """
+        Adiciona uma tag ao índice (ou atualiza, se já existir).
+        """
+        with self._lock:
+            if tag_id in self._tags:
+                self.remove(tag_id)
+
+            name = name.lower()
+            self._tags[tag_id] = (name, usage or 0)
+
+            node = self._root
+            nodes = [node]
+            for char in name:
+                node = node.children.setdefault(char, _TrieNode())
+                nodes.append(node)
+            node.tag_id = tag_id
+
+            for node in nodes:
+                node.size += 1
+                self._promote(node, tag_id)
+
+    def remove(self, tag_id: int) -> None:
+        """
+        Remove uma tag do índice.
+        """
+        with self._lock:
+            if tag_id not in self._tags:
+                return
+            name, _ = self._tags[tag_id]
+            nodes = self._path(name)
+            nodes[-1].tag_id = None
+            del self._tags[tag_id]
+
+            for node in reversed(nodes):
+                node.size -= 1
+                if tag_id in node.top:
+                    node.top.remove(tag_id)
+                    # Alguma tag fora da lista pode ter subido de posição
+                    if node.size > len(node.top):
+                        self._refill(node)
+
+            # Remover nós que ficaram vazios
+            for depth in range(len(nodes) - 1, 0, -1):
+                if nodes[depth].size == 0:
+                    del nodes[depth - 1].children[name[depth - 1]]
+
+    def rename(self, tag_id: int, new_name: str) -> None:
+        """
+        Atualiza o nome de uma tag mantendo sua contagem de uso.
+        """
+        with self._lock:
+            usage = self._tags[tag_id][1] if tag_id in self._tags else 0
+            self.add(tag_id, new_name, usage)
+
+    def update_usage(self, tag_id: int, usage: int) -> None:
+        """
+        Atualiza a contagem de uso de uma tag e reordena os nós afetados.
+        """
+        with self._lock:
+            if tag_id not in self._tags:
+                return
+            name, old_usage = self._tags[tag_id]
+            usage = usage or 0
+            if usage == old_usage:
+                return
+            self._tags[tag_id] = (name, usage)
+
+            for node in reversed(self._path(name)):
+                if tag_id in node.top:
+                    if usage < old_usage and node.size > len(node.top):
+                        self._refill(node)
+                    else:
+                        node.top.sort(key=self._key)
+                elif len(node.top) < self.top_k or self._key(tag_id) < self._key(node.top[-1]):
+                    self._promote(node, tag_id)
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Retorna as tags mais usadas que começam com o prefixo.
+
+        Args:
+            prefix: Prefixo do nome da tag
+            limit: Número máximo de resultados (até `top_k`)
+
+        Returns:
+            Lista de dicionários com id, nome e contagem de uso
+        """
+        with self._lock:
+            nodes = self._path(prefix.strip().lower())
+            if nodes is None:
+                return []
+            return [
+                {"id": tag_id, "name": self._tags[tag_id][0], "usage_count": self._tags[tag_id][1]}
+                for tag_id in nodes[-1].top[:limit]
+            ]
+
+
+_index: Optional[TagTrie] = None
+_index_built_at = 0.0
+_index_lock = RLock()
+
+
+def build_tag_index() -> TagTrie:
+    """
+    Constrói o índice de autocomplete a partir de todas as tags do banco.
+    """
+    from app.db.models.tag import Tag
+
+    global _index, _index_built_at
+    index = TagTrie(current_app.config.get("TAG_AUTOCOMPLETE_MAX_RESULTS", 20))
+    rows = Tag.query.with_entities(Tag.id, Tag.name, Tag.usage_count).all()
+    for tag_id, name, usage in rows:
+        index.add(tag_id, name, usage)
+
+    with _index_lock:
+        _index = index
+        _index_built_at = time.monotonic()
+    return index
+
+
+def get_tag_index() -> TagTrie:
+    """
+    Retorna o índice de autocomplete, reconstruindo-o quando ainda não existe
+    ou quando expirou. A reconstrução periódica alinha o índice com alterações
+    feitas por outros processos.
+    """
+    refresh = current_app.config.get("TAG_AUTOCOMPLETE_REFRESH_SECONDS", 300)
+    with _index_lock:
+        if _index is not None and time.monotonic() - _index_built_at < refresh:
+            return _index
+    return build_tag_index()
+
+
+def invalidate_tag_index() -> None:
+    """
+    Marca o índice como expirado, forçando sua reconstrução na próxima consulta.
+    """
+    global _index_built_at
+    with _index_lock:
+        _index_built_at = 0.0
+
+
+def autocomplete_tags(prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Retorna as tags mais usadas que começam com o prefixo.
+    """
+    return get_tag_index().search(prefix, limit)
+
+
+def _collect_tag_changes(session, flush_context):
+    """Registra as tags alteradas em um flush para aplicar no índice após o commit"""
+    from app.db.models.tag import Tag
+
+    changes = session.info.setdefault("tag_index_changes", [])
+    for obj in session.new:
+        if isinstance(obj, Tag):
+            changes.append(("add", obj.id, obj.name, obj.usage_count))
+    for obj in session.dirty:
+        if isinstance(obj, Tag):
+            changes.append(("add", obj.id, obj.name, obj.usage_count))
+    for obj in session.deleted:
+        if isinstance(obj, Tag):
+            changes.append(("remove", obj.id, None, None))
+
+
+def record_tag_change(session, operation: str, tag_id: int, name: Optional[str] = None,
+                      usage: Optional[int] = None) -> None:
+    """
+    Registra uma alteração de tag feita com SQL direto (fora do ORM) para
+    ser aplicada no índice após o commit.
+
+    Args:
+        session: Sessão do banco de dados
+        operation: "add", "usage" ou "remove"
+        tag_id: ID da tag
+        name: Nome da tag (para "add")
+        usage: Contagem de uso (para "add" e "usage")
+    """
+    session.info.setdefault("tag_index_changes", []).append((operation, tag_id, name, usage))
+
+
+def _apply_tag_changes(session):
+    changes = session.info.pop("tag_index_changes", None)
+    if not changes or _index is None:
+        return
+    for operation, tag_id, name, usage in changes:
+        if operation == "remove":
+            _index.remove(tag_id)
+        elif operation == "usage":
+            _index.update_usage(tag_id, usage)
+        else:
+            _index.add(tag_id, name, usage)
+
+
+def _discard_tag_changes(session, *args):
+    session.info.pop("tag_index_changes", None)
+
+
+def init_tag_index(app):
+    """
+    Registra os eventos que mantêm o índice de autocomplete atualizado
+    quando tags são criadas, renomeadas, usadas ou excluídas.
+    """
+    from app.db.database import db
+
+    session_class = db.session.session_factory.class_
+    if not event.contains(session_class, "after_flush", _collect_tag_changes):
+        event.listen(session_class, "after_flush", _collect_tag_changes)
+        event.listen(session_class, "after_commit", _apply_tag_changes)
+        event.listen(session_class, "after_rollback", _discard_tag_changes)
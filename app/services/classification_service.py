@@ -0,0 +1,316 @@
+import os
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Bytes do início do upload usados na identificação do conteúdo
+SNIFF_BYTES = 4096
+
+# Assinaturas com menos bytes que isto não prevalecem sobre a extensão de
+# um conteúdo que parece texto
+STRONG_SIGNATURE_BYTES = 4
+
+# Assinaturas (magic numbers): (deslocamento, bytes, tipo MIME, categoria).
+# A categoria None indica um contêiner genérico (zip, OLE2, RIFF...), cuja
+# categoria vem da extensão quando ela é compatível.
+SIGNATURES: List[Tuple[int, bytes, str, Optional[str]]] = [
+    (0, b"\x89PNG\r\n\x1a\n", "image/png", "images"),
+    (0, b"\xff\xd8\xff", "image/jpeg", "images"),
+    (0, b"GIF87a", "image/gif", "images"),
+    (0, b"GIF89a", "image/gif", "images"),
+    (0, b"II*\x00", "image/tiff", "images"),
+    (0, b"MM\x00*", "image/tiff", "images"),
+    (0, b"8BPS", "image/vnd.adobe.photoshop", "images"),
+    (0, b"\x00\x00\x01\x00", "image/vnd.microsoft.icon", "images"),
+    (0, b"BM", "image/bmp", "images"),
+    (0, b"%PDF-", "application/pdf", "documents"),
+    (0, b"{\\rtf", "application/rtf", "documents"),
+    (0, b"Rar!\x1a\x07", "application/vnd.rar", "archives"),
+    (0, b"7z\xbc\xaf\x27\x1c", "application/x-7z-compressed", "archives"),
+    (0, b"\x1f\x8b", "application/gzip", "archives"),
+    (0, b"BZh", "application/x-bzip2", "archives"),
+    (0, b"\xfd7zXZ\x00", "application/x-xz", "archives"),
+    (257, b"ustar", "application/x-tar", "archives"),
+    (0, b"ID3", "audio/mpeg", "audio"),
+    (0, b"fLaC", "audio/flac", "audio"),
+    (0, b"OggS", "audio/ogg", "audio"),
+    (0, b"MThd", "audio/midi", "audio"),
+    (0, b"\x1a\x45\xdf\xa3", "video/x-matroska", "videos"),
+    (0, b"FLV\x01", "video/x-flv", "videos"),
+    (0, b"\x00\x00\x01\xba", "video/mpeg", "videos"),
+    (0, b"\x30\x26\xb2\x75\x8e\x66\xcf\x11", "video/x-ms-asf", "videos"),
+    (0, b"SQLite format 3\x00", "application/vnd.sqlite3", "data"),
+    (0, b"PAR1", "application/vnd.apache.parquet", "data"),
+    (0, b"\x89HDF\r\n\x1a\n", "application/x-hdf5", "data"),
+    (0, b"PK\x03\x04", "application/zip", None),
+    (0, b"PK\x05\x06", "application/zip", None),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/x-ole-storage", None),
+]
+
+# Subtipos de contêineres RIFF (bytes 8-12) e FORM (AIFF)
+RIFF_TYPES = {
+    b"WEBP": ("image/webp", "images"),
+    b"WAVE": ("audio/wav", "audio"),
+    b"AVI ": ("video/x-msvideo", "videos"),
+}
+
+# Marcas do box "ftyp" da família ISO/MP4 (bytes 8-12)
+FTYP_BRANDS = {
+    b"M4A ": ("audio/mp4", "audio"),
+    b"M4B ": ("audio/mp4", "audio"),
+    b"qt  ": ("video/quicktime", "videos"),
+    b"3gp4": ("video/3gpp", "videos"),
+    b"3gp5": ("video/3gpp", "videos"),
+    b"3g2a": ("video/3gpp2", "videos"),
+}
+
+# Tipos MIME exatos de formatos cuja assinatura é de um contêiner genérico
+EXTENSION_MIME_TYPES = {
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".xlsm": "application/vnd.ms-excel.sheet.macroEnabled.12",
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    ".ppsx": "application/vnd.openxmlformats-officedocument.presentationml.slideshow",
+    ".odt": "application/vnd.oasis.opendocument.text",
+    ".ods": "application/vnd.oasis.opendocument.spreadsheet",
+    ".odp": "application/vnd.oasis.opendocument.presentation",
+    ".epub": "application/epub+zip",
+    ".doc": "application/msword",
+    ".xls": "application/vnd.ms-excel",
+    ".ppt": "application/vnd.ms-powerpoint",
+    ".pps": "application/vnd.ms-powerpoint",
+}
+
+# Extensões compatíveis com cada contêiner genérico
+CONTAINER_EXTENSIONS = {
+    "application/zip": {
+        ".docx", ".xlsx", ".xlsm", ".xltx", ".xltm", ".pptx", ".ppsx", ".odt", ".ods",
+        ".odp", ".epub", ".pages", ".numbers", ".key", ".zip",
+    },
+    "application/x-ole-storage": {".doc", ".xls", ".xlsb", ".ppt", ".pps", ".msg"},
+}
+
+# Prefixos e trechos de tipos MIME -> categoria (usado com libmagic e com o
+# content-type informado pelo cliente). A ordem importa: o primeiro que bate vence.
+MIME_CATEGORIES = [
+    ("image/", "images"),
+    ("video/", "videos"),
+    ("audio/", "audio"),
+    ("application/pdf", "documents"),
+    ("application/rtf", "documents"),
+    ("application/epub", "documents"),
+    ("wordprocessingml", "documents"),
+    ("opendocument.text", "documents"),
+    ("msword", "documents"),
+    ("spreadsheet", "spreadsheets"),
+    ("excel", "spreadsheets"),
+    ("text/csv", "spreadsheets"),
+    ("presentation", "presentations"),
+    ("powerpoint", "presentations"),
+    ("zip", "archives"),
+    ("x-tar", "archives"),
+    ("x-7z", "archives"),
+    ("rar", "archives"),
+    ("gzip", "archives"),
+    ("x-bzip", "archives"),
+    ("x-xz", "archives"),
+    ("iso9660", "archives"),
+    ("sqlite", "data"),
+    ("application/json", "code"),
+    ("application/xml", "code"),
+    ("text/", "documents"),
+]
+
+# Categoria padrão para arquivos não reconhecidos
+UNKNOWN_CATEGORY = "outros"
+
+# Mapa extensão -> categoria, montado uma vez a partir de ALLOWED_EXTENSIONS
+_extension_categories: Optional[Dict[str, str]] = None
+
+# Um handle de libmagic por thread (o objeto não é seguro entre threads)
+_local = threading.local()
+
+
+def build_extension_map(allowed: Dict[str, Iterable[str]]) -> Dict[str, str]:
+    """
+    Monta o mapa extensão -> categoria. Se uma extensão aparece em mais de
+    uma categoria, vale a primeira, como na busca linear anterior.
+    """
+    categories = {}
+    for category, extensions in allowed.items():
+        for ext in extensions:
+            categories.setdefault(ext.lower(), category)
+    return categories
+
+
+def get_extension_map() -> Dict[str, str]:
+    global _extension_categories
+    if _extension_categories is None:
+        _extension_categories = build_extension_map(current_app.config["ALLOWED_EXTENSIONS"])
+    return _extension_categories
+
+
+def category_for_mime(mime_type: Optional[str]) -> Optional[str]:
+    """
+    Retorna a categoria de um tipo MIME, ou None se não for reconhecido.
+    """
+    if not mime_type:
+        return None
+    mime_type = mime_type.split(";")[0].strip().lower()
+    for fragment, category in MIME_CATEGORIES:
+        if mime_type.startswith(fragment) or fragment in mime_type:
+            return category
+    return None
+
+
+def match_signature(head: bytes) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Identifica o formato pelos primeiros bytes do conteúdo.
+
+    Returns:
+        Tupla (tipo MIME, categoria) ou None se nenhuma assinatura bater
+    """
+    match = _match_signature(head)
+    return match[:2] if match else None
+
+
+def _match_signature(head: bytes) -> Optional[Tuple[str, Optional[str], int]]:
+    """Como match_signature, incluindo o número de bytes comparados"""
+    if head[:4] == b"RIFF" and head[8:12] in RIFF_TYPES:
+        return RIFF_TYPES[head[8:12]] + (12,)
+    if head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC"):
+        return "audio/aiff", "audio", 12
+    if head[4:8] == b"ftyp":
+        return FTYP_BRANDS.get(head[8:12], ("video/mp4", "videos")) + (8,)
+    if head[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"):
+        return "audio/mpeg", "audio", 2
+    if head[:2] in (b"\xff\xf1", b"\xff\xf9"):
+        return "audio/aac", "audio", 2
+
+    for offset, signature, mime_type, category in SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            return mime_type, category, len(signature)
+    return None
+
+
+def looks_like_text(head: bytes) -> bool:
+    """
+    Verifica se o conteúdo parece texto (UTF-8 sem bytes nulos).
+    """
+    if not head or b"\x00" in head:
+        return False
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Um caractere multibyte cortado no fim do bloco não invalida o texto
+        return e.start >= len(head) - 3
+    return True
+
+
+def get_magic():
+    """
+    Retorna o handle de libmagic da thread atual, criado no primeiro uso.
+    """
+    handle = getattr(_local, "magic", None)
+    if handle is None:
+        import magic
+
+        handle = _local.magic = magic.Magic(mime=True)
+    return handle
+
+
+def _libmagic_mime(head: bytes) -> Optional[str]:
+    try:
+        return get_magic().from_buffer(head)
+    except Exception as e:
+        logger.warning(f"Erro ao identificar o conteúdo com libmagic: {str(e)}")
+        return None
+
+
+def classify_content(filename: str, head: bytes = b"", content_type: Optional[str] = None,
+                     use_libmagic: bool = False) -> Dict[str, Any]:
+    """
+    Classifica um arquivo pelo conteúdo (primeiros bytes) e pela extensão,
+    sem ler o arquivo do disco.
+
+    A ordem de confiança é: assinatura conhecida, libmagic (opcional),
+    extensão e, por último, o content-type informado pelo cliente.
+
+    Args:
+        filename: Nome original do arquivo
+        head: Primeiros bytes do conteúdo (ver SNIFF_BYTES)
+        content_type: Tipo MIME informado no upload
+        use_libmagic: Consultar a libmagic quando nenhuma assinatura bater
+
+    Returns:
+        Dicionário com category, mime_type, confidence (0 a 1) e source
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    ext_category = get_extension_map().get(ext)
+
+    signature = _match_signature(head) if head else None
+    if signature and signature[2] < STRONG_SIGNATURE_BYTES and ext_category != signature[1] \
+            and looks_like_text(head):
+        # Assinaturas curtas ("BM", "ID3"...) também iniciam textos comuns
+        # ("BMI,peso" num CSV): num texto, só valem se a extensão concordar
+        signature = None
+    if signature:
+        mime_type, category, _ = signature
+        if category is None:
+            # Contêiner genérico: a extensão decide se for compatível
+            if ext in CONTAINER_EXTENSIONS.get(mime_type, ()):
+                mime_type = EXTENSION_MIME_TYPES.get(ext, mime_type)
+                category = ext_category or category_for_mime(mime_type)
+                return _result(category, mime_type, 0.95, "signature")
+            category = category_for_mime(mime_type) or UNKNOWN_CATEGORY
+            return _result(category, mime_type, 0.6, "signature")
+        confidence = 1.0 if ext_category in (None, category) else 0.8
+        return _result(category, mime_type, confidence, "signature")
+
+    if head and use_libmagic:
+        mime_type = _libmagic_mime(head)
+        category = category_for_mime(mime_type)
+        if category and mime_type not in ("text/plain", "application/octet-stream"):
+            confidence = 0.9 if ext_category in (None, category) else 0.7
+            return _result(category, mime_type, confidence, "libmagic")
+
+    if ext_category:
+        # Formatos de texto (código, CSV, markdown...) não têm assinatura
+        mime_type = content_type if category_for_mime(content_type) == ext_category else None
+        if head and looks_like_text(head) and mime_type is None:
+            mime_type = "text/plain"
+        confidence = 0.7 if head and looks_like_text(head) else 0.5
+        return _result(ext_category, mime_type or "application/octet-stream", confidence, "extension")
+
+    category = category_for_mime(content_type)
+    if category:
+        return _result(category, content_type, 0.3, "content_type")
+
+    if head and looks_like_text(head):
+        return _result("documents", "text/plain", 0.3, "text")
+
+    return _result(UNKNOWN_CATEGORY, content_type or "application/octet-stream", 0.0, "unknown")
+
+
+def _result(category: str, mime_type: str, confidence: float, source: str) -> Dict[str, Any]:
+    return {
+        "category": category,
+        "mime_type": mime_type,
+        "confidence": confidence,
+        "source": source,
+    }
+
+
+def read_head(stream, size: int = SNIFF_BYTES) -> bytes:
+    """
+    Lê os primeiros bytes de um upload e volta o stream ao início, para que
+    o arquivo seja salvo normalmente em seguida.
+    """
+    position = stream.tell()
+    head = stream.read(size)
+    stream.seek(position)
+    return head
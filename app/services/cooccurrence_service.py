@@ -0,0 +1,247 @@
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, List
+
+from flask import current_app
+from sqlalchemy import and_, func, select, tuple_, union_all
+
+from app.core.cache import TTLCache
+from app.db.database import db, upsert_insert
+from app.db.models.tag import Tag
+from app.db.models.file import File, file_tags
+from app.db.models.tag_cooccurrence import TagCooccurrence
+
+logger = logging.getLogger(__name__)
+
+# Total de arquivos, usado no cálculo do lift (não precisa ser exato)
+_file_count_cache = TTLCache(maxsize=1, ttl=60, name="file_count")
+
+
+def pair_deltas(changed: Iterable[int], others: Iterable[int], delta: int) -> Counter:
+    """
+    Calcula as variações de co-ocorrência quando tags entram ou saem de um arquivo.
+
+    Args:
+        changed: Tags adicionadas ou removidas do arquivo
+        others: Tags que continuam no arquivo
+        delta: 1 para adição, -1 para remoção
+
+    Returns:
+        Counter (tag, outra tag) -> variação, com os pares nos dois sentidos
+    """
+    changed = list(dict.fromkeys(changed))
+    others = [tag_id for tag_id in dict.fromkeys(others) if tag_id not in changed]
+    deltas = Counter()
+
+    for i, tag_id in enumerate(changed):
+        # Pares entre as tags alteradas
+        for other_id in changed[i + 1:]:
+            deltas[(tag_id, other_id)] += delta
+            deltas[(other_id, tag_id)] += delta
+        # Pares com as tags que permanecem no arquivo
+        for other_id in others:
+            deltas[(tag_id, other_id)] += delta
+            deltas[(other_id, tag_id)] += delta
+
+    return deltas
+
+
+def _current_tags(file_id: int) -> List[int]:
+    return list(db.session.execute(
+        select(file_tags.c.tag_id).where(file_tags.c.file_id == file_id)
+    ).scalars())
+
+
+def _apply(deltas: Counter) -> None:
+    """Aplica variações de co-ocorrência com um único upsert"""
+    stmt = upsert_insert(TagCooccurrence.__table__)
+    if stmt is None:
+        logger.warning("Banco sem suporte a upsert: co-ocorrências dependem de reconstrução")
+        return
+
+    rows = [
+        {"tag_id": tag_id, "other_tag_id": other_id, "count": delta}
+        for (tag_id, other_id), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["tag_id", "other_tag_id"],
+        set_={"count": TagCooccurrence.__table__.c.count + stmt.excluded.count},
+    )
+    db.session.execute(stmt, rows)
+
+    # Só os pares decrementados podem ter zerado: a exclusão usa a chave primária
+    decremented = [(row["tag_id"], row["other_tag_id"]) for row in rows if row["count"] < 0]
+    if decremented:
+        table = TagCooccurrence.__table__
+        db.session.execute(table.delete().where(
+            tuple_(table.c.tag_id, table.c.other_tag_id).in_(decremented),
+            table.c.count <= 0,
+        ))
+
+
+def record_tags_added(file_id: int, added: Iterable[int]) -> None:
+    """
+    Atualiza as co-ocorrências depois que tags foram associadas a um arquivo,
+    com um único INSERT ... SELECT sobre as associações já gravadas (sem ler
+    antes as tags do arquivo).
+    """
+    added = list(added)
+    if not added:
+        return
+    rows = select(file_tags.c.file_id, file_tags.c.tag_id).where(file_tags.c.file_id == file_id)
+    record_bulk_change(
+        rows.where(file_tags.c.tag_id.in_(added)), rows.where(file_tags.c.tag_id.not_in(added)), 1
+    )
+
+
+def record_tags_removed(file_id: int, removed: Iterable[int]) -> None:
+    """
+    Atualiza as co-ocorrências depois que tags foram removidas de um arquivo.
+    """
+    removed = list(removed)
+    if not removed or not current_app.config.get("TAG_COOCCURRENCE_ENABLED", True):
+        return
+    _apply(pair_deltas(removed, _current_tags(file_id), -1))
+
+
+def record_bulk_change(changed, others, delta: int) -> None:
+    """
+    Versão em SQL de pair_deltas para alterações em muitos arquivos: os pares
+    são contados com um GROUP BY e gravados com um único INSERT ... SELECT.
+    Deve ser chamada antes de inserir ou excluir as associações.
+
+    Args:
+        changed: Select (file_id, tag_id) das associações adicionadas ou removidas
+        others: Select (file_id, tag_id) das associações que permanecem nesses arquivos
+        delta: 1 para adição, -1 para remoção
+    """
+    if not current_app.config.get("TAG_COOCCURRENCE_ENABLED", True):
+        return
+    table = TagCooccurrence.__table__
+    stmt = upsert_insert(table)
+    if stmt is None:
+        logger.warning("Banco sem suporte a upsert: co-ocorrências dependem de reconstrução")
+        return
+
+    a = changed.subquery("a")
+    b = changed.subquery("b")
+    kept = others.subquery("kept")
+    pairs = union_all(
+        # Pares entre as tags alteradas
+        select(a.c.tag_id, b.c.tag_id.label("other_tag_id"))
+        .join_from(a, b, and_(a.c.file_id == b.c.file_id, a.c.tag_id != b.c.tag_id)),
+        # Pares com as tags que permanecem, nos dois sentidos
+        select(a.c.tag_id, kept.c.tag_id).join_from(a, kept, a.c.file_id == kept.c.file_id),
+        select(kept.c.tag_id, a.c.tag_id).join_from(kept, a, kept.c.file_id == a.c.file_id),
+    ).subquery("pairs")
+    counts = (
+        select(pairs.c.tag_id, pairs.c.other_tag_id, func.count() * delta)
+        .group_by(pairs.c.tag_id, pairs.c.other_tag_id)
+    )
+
+    stmt = stmt.from_select(["tag_id", "other_tag_id", "count"], counts)
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=["tag_id", "other_tag_id"],
+        set_={"count": table.c.count + stmt.excluded.count},
+    ))
+    if delta < 0:
+        db.session.execute(table.delete().where(
+            tuple_(table.c.tag_id, table.c.other_tag_id).in_(select(pairs.c.tag_id, pairs.c.other_tag_id)),
+            table.c.count <= 0,
+        ))
+
+
+def forget_tag_cooccurrences(tag_id: int) -> None:
+    """
+    Remove todas as co-ocorrências de uma tag (usado ao excluí-la).
+    """
+    table = TagCooccurrence.__table__
+    db.session.execute(
+        table.delete().where((table.c.tag_id == tag_id) | (table.c.other_tag_id == tag_id))
+    )
+
+
+def rebuild_cooccurrences() -> int:
+    """
+    Reconstrói toda a matriz de co-ocorrência a partir da tabela de associação,
+    com um único INSERT ... SELECT agregado.
+
+    Returns:
+        Número de pares (em cada sentido) gravados
+    """
+    a = file_tags.alias("a")
+    b = file_tags.alias("b")
+    pairs = (
+        select(a.c.tag_id, b.c.tag_id, func.count())
+        .select_from(a.join(b, (a.c.file_id == b.c.file_id) & (a.c.tag_id != b.c.tag_id)))
+        .group_by(a.c.tag_id, b.c.tag_id)
+    )
+
+    table = TagCooccurrence.__table__
+    db.session.execute(table.delete())
+    db.session.execute(
+        table.insert().from_select(["tag_id", "other_tag_id", "count"], pairs)
+    )
+    db.session.commit()
+
+    return db.session.execute(select(func.count()).select_from(table)).scalar()
+
+
+def _total_files() -> int:
+    total = _file_count_cache.get("files")
+    if total is None:
+        total = db.session.execute(select(func.count()).select_from(File)).scalar() or 0
+        _file_count_cache.set("files", total)
+    return total
+
+
+def related_tags(tag: Tag, limit: int = 10, metric: str = "jaccard") -> List[Dict[str, Any]]:
+    """
+    Retorna as tags que mais aparecem junto com uma tag.
+
+    Lê apenas uma faixa limitada do índice (tag_id, count) e reordena esses
+    candidatos pela métrica escolhida, então o custo não depende do tamanho
+    do acervo.
+
+    Args:
+        tag: Tag de referência
+        limit: Número máximo de resultados
+        metric: "jaccard" (|A∩B| / |A∪B|) ou "lift" (P(A∩B) / P(A)P(B))
+
+    Returns:
+        Lista de dicionários com id, nome, co-ocorrências e pontuação
+    """
+    pool = max(limit * current_app.config.get("TAG_RELATED_CANDIDATE_FACTOR", 5), 50)
+    rows = db.session.execute(
+        select(Tag.id, Tag.name, Tag.usage_count, TagCooccurrence.count)
+        .select_from(TagCooccurrence)
+        .join(Tag, Tag.id == TagCooccurrence.other_tag_id)
+        .where(TagCooccurrence.tag_id == tag.id)
+        .order_by(TagCooccurrence.count.desc())
+        .limit(pool)
+    ).all()
+
+    tag_usage = tag.usage_count or 0
+    total = _total_files() if metric == "lift" else 0
+
+    results = []
+    for other_id, name, other_usage, together in rows:
+        other_usage = other_usage or 0
+        if metric == "lift":
+            denominator = tag_usage * other_usage
+            score = together * total / denominator if denominator else 0.0
+        else:
+            union = tag_usage + other_usage - together
+            score = together / union if union > 0 else 0.0
+        results.append({
+            "id": other_id,
+            "name": name,
+            "cooccurrences": together,
+            "score": round(score, 4),
+        })
+
+    results.sort(key=lambda item: (-item["score"], -item["cooccurrences"], item["name"]))
+    return results[:limit]
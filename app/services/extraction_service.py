@@ -0,0 +1,439 @@
+import os
+import re
+import time
+import logging
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import Counter
+from typing import Dict, Any, Iterator, List, Optional
+
+from flask import current_app
+
+from app.services.storage_service import open_file
+
+logger = logging.getLogger(__name__)
+
+# Tamanho dos blocos lidos de arquivos de texto puro
+READ_CHUNK_SIZE = 64 * 1024
+
+# Palavras ignoradas na extração de palavras-chave (português e inglês)
+STOPWORDS = {
+    "para", "como", "mais", "pelo", "pela", "pelos", "pelas", "este", "esta", "isso", "isto",
+    "esse", "essa", "aquele", "aquela", "qual", "quais", "quando", "onde", "porque", "também",
+    "entre", "sobre", "após", "até", "desde", "sem", "com", "uma", "umas", "uns", "seu", "sua",
+    "seus", "suas", "nosso", "nossa", "eles", "elas", "você", "vocês", "ser", "são", "está",
+    "estão", "foram", "será", "pode", "podem", "deve", "devem", "cada", "outro", "outra",
+    "that", "this", "with", "from", "have", "will", "would", "there", "their", "they", "them",
+    "what", "which", "when", "where", "were", "been", "being", "into", "than", "then", "also",
+    "about", "after", "before", "other", "such", "only", "some", "more", "most", "these",
+    "those", "your", "yours", "should", "could", "does", "each",
+}
+
+# Destinos RTF cujo conteúdo não é texto do documento
+RTF_SKIP_DESTINATIONS = {
+    "fonttbl", "colortbl", "stylesheet", "info", "pict", "object", "header", "footer",
+    "headerl", "headerr", "footerl", "footerr", "listtable", "listoverridetable",
+    "rsidtbl", "generator", "xmlnstbl", "themedata", "colorschememapping", "latentstyles",
+    "datastore", "fldinst",
+}
+
+
+def get_extension(filename: str) -> str:
+    """
+    Retorna a extensão do arquivo em minúsculas, com o ponto.
+    """
+    return os.path.splitext(filename)[1].lower()
+
+
+def is_extractable(filename: str) -> bool:
+    """
+    Verifica se o texto de um arquivo pode ser extraído.
+
+    Args:
+        filename: Nome do arquivo
+
+    Returns:
+        True se a extensão tem um extrator de texto
+    """
+    extensions = current_app.config.get("TEXT_EXTRACTION_EXTENSIONS", list(EXTRACTORS))
+    ext = get_extension(filename)
+    return ext in extensions and ext in EXTRACTORS
+
+
+class ExtractionTimeout(Exception):
+    """O prazo de extração terminou no meio de uma página ou parte do documento"""
+
+
+def _check_deadline(deadline: Optional[float]) -> None:
+    """Interrompe o extrator (ExtractionTimeout) se o prazo já passou"""
+    if deadline is not None and time.monotonic() > deadline:
+        raise ExtractionTimeout()
+
+
+def _local_name(tag: str) -> str:
+    """Remove o namespace de uma tag XML ("{ns}p" -> "p")"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _iter_xml_blocks(stream, block_tags: set, deadline: Optional[float] = None) -> Iterator[str]:
+    """
+    Percorre um XML de forma incremental, gerando o texto de cada bloco
+    (parágrafo, título...). Os elementos já processados são esvaziados e
+    removidos do pai, de modo que a árvore em memória fica limitada aos
+    elementos abertos e ao bloco atual.
+    """
+    open_elements = []
+    open_blocks = 0
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        is_block = _local_name(elem.tag) in block_tags
+        if event == "start":
+            open_elements.append(elem)
+            open_blocks += is_block
+            continue
+
+        open_elements.pop()
+        open_blocks -= is_block
+        # Dentro de um bloco, os filhos ficam até o bloco terminar (itertext)
+        if open_blocks and not is_block:
+            continue
+
+        text = "".join(elem.itertext()).strip() if is_block else ""
+        elem.clear()
+        if open_elements:
+            open_elements[-1].remove(elem)
+        if text:
+            yield text + "\n"
+        _check_deadline(deadline)
+
+
+def _iter_txt(file_path: str, deadline: Optional[float] = None) -> Iterator[str]:
+    """Lê arquivos de texto puro (.txt, .md) em blocos"""
+    with open_file(file_path, "r", encoding="utf-8", errors="replace") as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), ""):
+            yield chunk
+
+
+def _iter_pdf(file_path: str, deadline: Optional[float] = None) -> Iterator[str]:
+    """
+    Extrai o texto de um PDF página por página. O prazo também é verificado
+    a cada operador do conteúdo da página, para que uma página muito pesada
+    não o ultrapasse.
+    """
+    # Importação tardia: pypdf só é necessário quando há PDFs para processar
+    from pypdf import PdfReader
+
+    def check(*args):
+        _check_deadline(deadline)
+
+    with open_file(file_path) as f:
+        reader = PdfReader(f)
+        for page in reader.pages:
+            _check_deadline(deadline)
+            yield (page.extract_text(visitor_operand_before=check) or "") + "\f"
+
+
+def _iter_docx(file_path: str, deadline: Optional[float] = None) -> Iterator[str]:
+    """Extrai os parágrafos de um .docx sem carregar o XML inteiro"""
+    with open_file(file_path) as f, zipfile.ZipFile(f) as archive:
+        with archive.open("word/document.xml") as stream:
+            yield from _iter_xml_blocks(stream, {"p"}, deadline)
+
+
+def _iter_odt(file_path: str, deadline: Optional[float] = None) -> Iterator[str]:
+    """Extrai os parágrafos e títulos de um .odt"""
+    with open_file(file_path) as f, zipfile.ZipFile(f) as archive:
+        with archive.open("content.xml") as stream:
+            yield from _iter_xml_blocks(stream, {"p", "h"}, deadline)
+
+
+def _iter_epub(file_path: str, deadline: Optional[float] = None) -> Iterator[str]:
+    """Extrai o texto de um .epub capítulo por capítulo, na ordem de leitura"""
+    with open_file(file_path) as f, zipfile.ZipFile(f) as archive:
+        # Localizar o arquivo OPF a partir do container
+        container = ET.fromstring(archive.read("META-INF/container.xml"))
+        rootfile = next(e for e in container.iter() if _local_name(e.tag) == "rootfile")
+        opf_path = rootfile.get("full-path")
+        opf = ET.fromstring(archive.read(opf_path))
+
+        manifest = {
+            item.get("id"): item.get("href")
+            for item in opf.iter() if _local_name(item.tag) == "item"
+        }
+        spine = [item.get("idref") for item in opf.iter() if _local_name(item.tag) == "itemref"]
+
+        base_dir = posixpath.dirname(opf_path)
+        for idref in spine:
+            href = manifest.get(idref)
+            if not href:
+                continue
+            with archive.open(posixpath.join(base_dir, href)) as stream:
+                yield from _iter_xml_blocks(stream, {"p", "h1", "h2", "h3", "h4", "h5", "h6", "li"}, deadline)
+
+
+def _iter_rtf_chars(file_path: str, deadline: Optional[float] = None) -> Iterator[str]:
+    with open_file(file_path, "r", encoding="latin-1") as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), ""):
+            yield from chunk
+            # Grupos ignorados (imagens, fontes) podem ocupar muitos blocos sem gerar texto
+            _check_deadline(deadline)
+
+
+def _iter_rtf(file_path: str, deadline: Optional[float] = None) -> Iterator[str]:
+    """
+    Remove os comandos de controle de um .rtf à medida que o arquivo é lido,
+    gerando o texto em blocos.
+    """
+    chars = _iter_rtf_chars(file_path, deadline)
+    pending = None  # Caractere lido além do necessário (lookahead)
+    skip_stack = []
+    skip = False
+    skip_fallback = 0  # Caracteres alternativos após \uN
+    out = []
+
+    def next_char():
+        nonlocal pending
+        if pending is not None:
+            ch, pending = pending, None
+            return ch
+        return next(chars, "")
+
+    def emit(text):
+        nonlocal skip_fallback
+        if skip:
+            return
+        if skip_fallback:
+            skip_fallback -= 1
+            return
+        out.append(text)
+
+    while True:
+        ch = next_char()
+        if ch == "":
+            break
+
+        if ch == "{":
+            skip_stack.append(skip)
+        elif ch == "}":
+            skip = skip_stack.pop() if skip_stack else False
+        elif ch in "\r\n":
+            continue
+        elif ch == "\\":
+            ch = next_char()
+            if ch.isalpha():
+                word = ch
+                while True:
+                    ch = next_char()
+                    if not ch.isalpha():
+                        break
+                    word += ch
+                param = ""
+                if ch == "-" or ch.isdigit():
+                    param = ch
+                    while True:
+                        ch = next_char()
+                        if not ch.isdigit():
+                            break
+                        param += ch
+                # O espaço após um comando é apenas um delimitador
+                if ch != " ":
+                    pending = ch
+
+                if word in RTF_SKIP_DESTINATIONS:
+                    skip = True
+                elif word in ("par", "line", "sect", "page"):
+                    emit("\n")
+                elif word == "tab":
+                    emit("\t")
+                elif word == "u" and param:
+                    code = int(param)
+                    emit(chr(code + 65536 if code < 0 else code))
+                    skip_fallback = 1
+            elif ch == "*":
+                skip = True
+            elif ch == "'":
+                hex_code = next_char() + next_char()
+                try:
+                    emit(bytes([int(hex_code, 16)]).decode("cp1252", errors="replace"))
+                except ValueError:
+                    pass
+            elif ch in "\\{}":
+                emit(ch)
+            elif ch == "~":
+                emit(" ")
+        else:
+            emit(ch)
+
+        if len(out) >= READ_CHUNK_SIZE:
+            yield "".join(out)
+            out = []
+
+    if out:
+        yield "".join(out)
+
+
+# Extratores disponíveis por extensão
+EXTRACTORS = {
+    ".pdf": _iter_pdf,
+    ".docx": _iter_docx,
+    ".odt": _iter_odt,
+    ".txt": _iter_txt,
+    ".md": _iter_txt,
+    ".rtf": _iter_rtf,
+    ".epub": _iter_epub,
+}
+
+
+def iter_document_text(file_path: str, ext: Optional[str] = None,
+                       deadline: Optional[float] = None) -> Iterator[str]:
+    """
+    Gera o texto de um documento aos poucos (página por página ou parte por parte).
+
+    Args:
+        file_path: Caminho do arquivo
+        ext: Extensão a considerar (por padrão, a do próprio caminho)
+        deadline: Instante (time.monotonic) após o qual o extrator levanta
+            ExtractionTimeout, mesmo no meio de uma página
+
+    Returns:
+        Iterador de trechos de texto
+    """
+    ext = (ext or get_extension(file_path)).lower()
+    extractor = EXTRACTORS.get(ext)
+    if not extractor:
+        raise ValueError(f"Extensão sem extrator de texto: {ext}")
+    return extractor(file_path, deadline)
+
+
+def extract_text(file_path: str, ext: Optional[str] = None,
+                 max_bytes: int = 2 * 1024 * 1024, max_seconds: float = 30.0) -> Dict[str, Any]:
+    """
+    Extrai o texto de um documento respeitando um orçamento de bytes e de tempo.
+    A leitura é interrompida assim que um dos limites é atingido, de modo que
+    documentos muito grandes nunca são carregados por inteiro na memória. O
+    prazo é verificado também dentro dos extratores (a cada operador de uma
+    página de PDF, a cada elemento XML e a cada bloco de RTF).
+
+    Args:
+        file_path: Caminho do arquivo
+        ext: Extensão a considerar (por padrão, a do próprio caminho)
+        max_bytes: Quantidade máxima de bytes (UTF-8) de texto extraído
+        max_seconds: Tempo máximo de extração em segundos
+
+    Returns:
+        Dicionário com o texto, número de partes lidas e se houve truncamento
+    """
+    deadline = time.monotonic() + max_seconds
+    parts = []
+    used_bytes = 0
+    pages = 0
+    truncated = False
+    timed_out = False
+
+    chunks = iter_document_text(file_path, ext, deadline)
+    try:
+        for chunk in chunks:
+            pages += 1
+            encoded = chunk.encode("utf-8")
+            if used_bytes + len(encoded) > max_bytes:
+                remaining = max_bytes - used_bytes
+                parts.append(encoded[:remaining].decode("utf-8", errors="ignore"))
+                truncated = True
+                break
+            parts.append(chunk)
+            used_bytes += len(encoded)
+
+            if time.monotonic() > deadline:
+                timed_out = True
+                break
+    except ExtractionTimeout:
+        # O extrator parou no meio de uma página: fica o texto já lido
+        timed_out = True
+    finally:
+        # Fechar o gerador libera os arquivos abertos pelo extrator
+        chunks.close()
+
+    return {
+        "text": "".join(parts),
+        "pages": pages,
+        "truncated": truncated,
+        "timed_out": timed_out,
+    }
+
+
+def extract_keywords(text: str, limit: int = 5) -> List[str]:
+    """
+    Retorna as palavras mais frequentes de um texto, ignorando palavras comuns.
+
+    Args:
+        text: Texto a analisar
+        limit: Número máximo de palavras-chave
+
+    Returns:
+        Lista de palavras-chave ordenadas por frequência
+    """
+    words = re.findall(r"[^\W\d_]{4,}", text.lower())
+    counter = Counter(word for word in words if word not in STOPWORDS)
+    return [word for word, _ in counter.most_common(limit)]
+
+
+def extract_file_text(file_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Extrai e persiste o texto de um arquivo já salvo, adicionando as
+    palavras-chave como tags automáticas. Feita para rodar em segundo plano.
+
+    Args:
+        file_id: ID do arquivo
+
+    Returns:
+        Dicionário da extração persistida ou None se o arquivo não existir
+    """
+    from app.db.database import db
+    from app.db.models.file import File
+    from app.db.models.file_content import FileContent
+    from app.services.tag_service import resolve_tags, attach_tags
+    from app.services.version_service import touch_files
+
+    file_obj = db.session.get(File, file_id)
+    if not file_obj:
+        return None
+
+    content = db.session.get(FileContent, file_id) or FileContent(file_id=file_id)
+
+    try:
+        result = extract_text(
+            file_obj.file_path,
+            ext=get_extension(file_obj.original_filename),
+            max_bytes=current_app.config.get("TEXT_EXTRACTION_MAX_BYTES", 2 * 1024 * 1024),
+            max_seconds=current_app.config.get("TEXT_EXTRACTION_MAX_SECONDS", 30),
+        )
+    except Exception as e:
+        logger.error(f"Erro ao extrair texto do arquivo {file_id}: {str(e)}")
+        content.error = str(e)[:255]
+        db.session.add(content)
+        db.session.commit()
+        return content.to_dict()
+
+    content.text = result["text"]
+    content.pages = result["pages"]
+    content.truncated = result["truncated"]
+    content.timed_out = result["timed_out"]
+    content.error = None
+    content.keywords = extract_keywords(
+        result["text"], current_app.config.get("TEXT_KEYWORD_TAGS", 5)
+    )
+    db.session.add(content)
+
+    # Adicionar palavras-chave como tags, respeitando o limite por arquivo
+    max_tags = current_app.config.get("MAX_TAGS_PER_FILE", 10)
+    available = max_tags - len(file_obj.tags)
+    if available > 0:
+        current = {tag.name for tag in file_obj.tags}
+        keywords = [keyword for keyword in content.keywords if keyword not in current]
+        tag_ids = resolve_tags(keywords[:available], auto_generated=True)
+        if attach_tags(file_obj.id, tag_ids.values()):
+            touch_files(file_obj.project_id)
+
+    db.session.commit()
+
+    return content.to_dict()
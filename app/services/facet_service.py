@@ -0,0 +1,111 @@
+from typing import Any, Dict, Optional
+
+from flask import current_app
+from sqlalchemy import String, cast, func, literal, select, union_all
+
+from app.core.cache import TTLCache
+from app.db.database import db
+from app.db.models.file import File, file_tags
+from app.db.models.tag import Tag
+from app.services.file_service import apply_file_filters, filter_signature
+from app.services.version_service import TAGS_SCOPE, files_scope, get_versions
+
+# Cache de contagens por assinatura de filtro (por processo)
+_facet_cache = None
+
+
+def get_facet_cache() -> TTLCache:
+    global _facet_cache
+    if _facet_cache is None:
+        _facet_cache = TTLCache(
+            maxsize=current_app.config.get("FACET_CACHE_SIZE", 1024),
+            ttl=current_app.config.get("FACET_CACHE_TTL_SECONDS", 300),
+            name="facets",
+        )
+    return _facet_cache
+
+
+def compute_facets(filters: Dict[str, Any], top_tags: int = 10) -> Dict[str, Any]:
+    """
+    Calcula todas as contagens de facetas de um filtro em uma única consulta:
+    os arquivos filtrados ficam em uma CTE e cada faceta é um GROUP BY sobre
+    ela, unidos com UNION ALL.
+
+    Args:
+        filters: Filtros de listagem (ver parse_file_filters)
+        top_tags: Número de tags mais frequentes a retornar
+
+    Returns:
+        Dicionário com o total e as contagens por tipo, tag, uploader e projeto
+    """
+    filtered = apply_file_filters(
+        select(File.id, File.file_type, File.uploader_id, File.project_id), filters
+    ).cte("filtered")
+
+    def group(facet, column):
+        return (
+            select(literal(facet).label("facet"), cast(column, String).label("value"), func.count().label("count"))
+            .select_from(filtered)
+            .group_by(column)
+        )
+
+    top = (
+        select(Tag.name.label("value"), func.count().label("count"))
+        .select_from(file_tags)
+        .join(filtered, filtered.c.id == file_tags.c.file_id)
+        .join(Tag, Tag.id == file_tags.c.tag_id)
+        .group_by(Tag.name)
+        .order_by(func.count().desc(), Tag.name)
+        .limit(top_tags)
+        .subquery()
+    )
+
+    query = union_all(
+        select(literal("total").label("facet"), literal(None, String).label("value"),
+               func.count().label("count")).select_from(filtered),
+        group("file_type", filtered.c.file_type),
+        group("uploader_id", filtered.c.uploader_id),
+        group("project_id", filtered.c.project_id),
+        select(literal("tags"), top.c.value, top.c.count),
+    )
+
+    facets = {"total": 0, "file_type": {}, "tags": [], "uploader_id": {}, "project_id": {}}
+    for facet, value, count in db.session.execute(query):
+        if facet == "total":
+            facets["total"] = count
+        elif facet == "tags":
+            facets["tags"].append({"name": value, "count": count})
+        elif facet == "file_type":
+            facets["file_type"][value] = count
+        else:
+            facets[facet][value] = count
+
+    facets["tags"].sort(key=lambda item: (-item["count"], item["name"]))
+    return facets
+
+
+def get_facets(
+    filters: Dict[str, Any], top_tags: int = 10, versions: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    """
+    Retorna as contagens de facetas de um filtro, usando o cache enquanto os
+    contadores de versão do projeto (ou de todos os arquivos) e das tags não
+    mudarem.
+
+    Args:
+        filters: Filtros de listagem (ver parse_file_filters)
+        top_tags: Número de tags mais frequentes a retornar
+        versions: Versões já lidas na requisição (ver request_versions); sem
+            elas, os contadores são consultados aqui
+    """
+    scope = files_scope(filters.get("project_id"))
+    if versions is None or scope not in versions or TAGS_SCOPE not in versions:
+        versions = get_versions([scope, TAGS_SCOPE])
+    key = (filter_signature(filters), top_tags, versions[scope], versions[TAGS_SCOPE])
+
+    cache = get_facet_cache()
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(filters, top_tags)
+        cache.set(key, facets)
+    return facets
@@ -1,10 +1,20 @@
 import os 
-import magic
 from werkzeug.utils import secure_filename
 from flask import current_app
+from sqlalchemy import select
 import uuid
 import shutil
 
+from app.db.models.file import File, file_tags
+from app.db.models.tag import Tag
+from app.db.models.file_content import FileContent
+from app.db.database import db
+from app.core.metrics import record_storage
+from app.services.metadata_service import parse_metadata_filters, apply_metadata_filters
+from app.services.classification_service import (
+    UNKNOWN_CATEGORY, category_for_mime, classify_content, get_extension_map, get_magic, read_head
+)
+
 def save_file(file_obj, filename):
     """ 
     Salva um arquivo no sistema de arquivos.
@@ -26,6 +36,7 @@ def save_file(file_obj, filename):
 
     # Salvar o arquivo
     file_obj.save(file_path)
+    record_storage("write", os.path.getsize(file_path))
 
     return file_path
 
@@ -58,40 +69,33 @@ def get_file_type(filename, content_type=None):
     Returns:
         str: O tipo de arquivo(image, document, spreadsheet, code, etc.) 
     """
-    # Obter a extensão do arquivo
+    # Obter a extensão do arquivo e consultar o mapa extensão -> categoria
     _, ext = os.path.splitext(filename)
-    ext = ext.lower().lstrip('.')
-
-    # Verificar em quais tipo permitidos a extensão se encaixa
-    for file_type, extensions in current_app.config["ALLOWED_EXTENSIONS"].items():
-        if ext in extensions:
-            return file_type
-        
-    # Se não encontrado pela extensão, tentar outro tipo de conteúdo
-    if content_type:
-        if content_type.startswith("images/"):
-            return "images"
-        elif content_type.startswith("text/"):
-            return "documents"
-        elif content_type.startswith("spreadsheets/"):
-            return "spreadsheets"
-        elif content_type.startswith("presentations"):
-            return "presentations"
-        elif content_type.startswith("audio/"):
-            return "audio"
-        elif content_type.startswith("archives/"):
-            return "archives"
-        elif content_type.startswith("code/"):
-            return "code"
-        elif content_type.startswith("data"):
-            return "data"
-        elif "application/pdf" in content_type:
-            return "documents"
-        elif any(office_type in content_type for office_type in ["word", "excel", "powerpoint", "msword"]):
-            return "documents"
-        
-    # Padrão para outros não reconhecidos
-    return "outros"
+    file_type = get_extension_map().get(ext.lower())
+    if file_type:
+        return file_type
+
+    # Se não encontrado pela extensão, tentar pelo tipo de conteúdo
+    return category_for_mime(content_type) or UNKNOWN_CATEGORY
+
+def classify_upload(file_obj, filename, content_type=None):
+    """
+    Classifica um upload pelos primeiros bytes do conteúdo e pela extensão,
+    sem ler o arquivo do disco.
+
+    Args:
+        file_obj: O arquivo enviado (FileStorage)
+        filename: O nome original do arquivo
+        content_type: O tipo MIME informado pelo cliente
+
+    Returns:
+        dict: Categoria, tipo MIME, confiança e origem da classificação
+    """
+    head = read_head(file_obj.stream)
+    return classify_content(
+        filename, head, content_type,
+        use_libmagic=current_app.config.get("FILE_SNIFF_LIBMAGIC", False),
+    )
 
 def detect_mime_type(file_path):
     """
@@ -104,12 +108,83 @@ def detect_mime_type(file_path):
         str: O tipo MIME do arquivo
     """
     try:
-        mime = magic.Magic(mime=True)
-        return mime.from_file(file_path)
+        # Handle reaproveitado por thread, em vez de um novo por chamada
+        return get_magic().from_file(file_path)
     except Exception as e:
         current_app.logger.error(f"Erro do tipo MIME detectado: {str(e)}")
         return "application/octet-stream"
-    
 
-    
-    
\ No newline at end of file
+def parse_file_filters(args):
+    """
+    Lê os filtros de listagem de arquivos dos parâmetros da requisição.
+
+    Args:
+        args: Parâmetros de consulta (request.args)
+
+    Returns:
+        dict: Filtros informados (project_id, uploader_id, file_type, tags, q, meta)
+
+    Raises:
+        ValueError: Se um filtro de metadados (meta.*) for inválido
+    """
+    return {
+        "project_id": args.get("project_id", type=int),
+        "uploader_id": args.get("uploader_id", type=int),
+        "file_type": args.get("file_type"),
+        "tags": [tag.strip().lower() for tag in args.getlist("tags") if tag.strip()],
+        "q": args.get("q"),
+        "meta": parse_metadata_filters(args),
+    }
+
+def apply_file_filters(query, filters):
+    """
+    Aplica os filtros de listagem a uma consulta sobre File (Query ou Select).
+
+    Args:
+        query: Consulta a filtrar
+        filters: Filtros retornados por parse_file_filters
+
+    Returns:
+        A consulta filtrada
+    """
+    if filters.get("project_id"):
+        query = query.filter(File.project_id == filters["project_id"])
+
+    if filters.get("uploader_id"):
+        query = query.filter(File.uploader_id == filters["uploader_id"])
+
+    if filters.get("file_type"):
+        query = query.filter(File.file_type == filters["file_type"])
+
+    # Cada tag vira uma subconsulta na tabela de associação, que parte do
+    # índice (tag_id, file_id) em vez de percorrer todos os arquivos
+    for tag_name in filters.get("tags") or []:
+        query = query.filter(File.id.in_(
+            select(file_tags.c.file_id)
+            .join(Tag, Tag.id == file_tags.c.tag_id)
+            .where(Tag.name == tag_name)
+        ))
+
+    if filters.get("q"):
+        # Buscar no texto extraído dos documentos
+        query = query.filter(
+            select(FileContent.file_id)
+            .where(FileContent.file_id == File.id, FileContent.text.ilike(f"%{filters['q']}%"))
+            .exists()
+        )
+
+    if filters.get("meta"):
+        dialect = db.session.get_bind().dialect.name
+        query = apply_metadata_filters(query, filters["meta"], dialect)
+
+    return query
+
+def filter_signature(filters):
+    """
+    Retorna uma chave estável (e hasheável) que identifica um conjunto de filtros.
+    """
+    return tuple(
+        (key, tuple(sorted(value)) if isinstance(value, list) else value)
+        for key, value in sorted(filters.items())
+        if value not in (None, "", [])
+    )
@@ -0,0 +1,699 @@
+import os
+import struct
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.storage_service import open_file
+
+logger = logging.getLogger(__name__)
+
+# Limite padrão de bytes lidos por arquivo (cabeçalhos e índices apenas)
+DEFAULT_MAX_BYTES = 1024 * 1024
+
+# Categorias de arquivo cujos cabeçalhos são lidos no upload
+MEDIA_CATEGORIES = ("images", "videos", "audio")
+
+# Resoluções mínimas para as tags de vídeo (lado maior x lado menor)
+RESOLUTION_TAGS = [("4k", 3840, 2160), ("hd", 1280, 720)]
+
+# Duração mínima, em segundos, para a tag "longform"
+DEFAULT_LONGFORM_SECONDS = 600
+
+
+class HeaderReader:
+    """
+    Leitor de arquivo com orçamento de bytes: os parsers só conseguem ler
+    cabeçalhos e índices, nunca o conteúdo inteiro de um vídeo grande.
+    """
+
+    def __init__(self, fileobj, size: int, max_bytes: int):
+        self.fileobj = fileobj
+        self.size = size
+        self.remaining = max_bytes
+
+    def read_at(self, offset: int, length: int) -> bytes:
+        length = max(0, min(length, self.size - offset, self.remaining))
+        if length == 0:
+            return b""
+        self.fileobj.seek(offset)
+        data = self.fileobj.read(length)
+        self.remaining -= len(data)
+        return data
+
+
+# Imagens
+
+# Tags EXIF usadas (IFD0, Exif IFD)
+EXIF_TAGS = {
+    0x010F: "make",
+    0x0110: "model",
+    0x0112: "orientation",
+    0x0132: "datetime",
+    0x9003: "taken_at",
+    0xA002: "width",
+    0xA003: "height",
+}
+EXIF_IFD_POINTER = 0x8769
+GPS_IFD_POINTER = 0x8825
+
+# Marcadores JPEG de início de quadro (SOFn), que trazem as dimensões
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def parse_exif(data: bytes) -> Dict[str, Any]:
+    """
+    Lê os campos principais de um bloco EXIF (estrutura TIFF).
+    """
+    if len(data) < 8 or data[:2] not in (b"II", b"MM"):
+        return {}
+    order = "<" if data[:2] == b"II" else ">"
+    result: Dict[str, Any] = {}
+
+    def read_ifd(offset, depth=0):
+        if depth > 2 or offset + 2 > len(data):
+            return
+        (count,) = struct.unpack_from(order + "H", data, offset)
+        for i in range(min(count, 256)):
+            entry = offset + 2 + i * 12
+            if entry + 12 > len(data):
+                return
+            tag, kind, n = struct.unpack_from(order + "HHI", data, entry)
+            if tag == EXIF_IFD_POINTER:
+                read_ifd(struct.unpack_from(order + "I", data, entry + 8)[0], depth + 1)
+            elif tag == GPS_IFD_POINTER:
+                result["has_gps"] = True
+            elif tag in EXIF_TAGS:
+                value = _exif_value(data, order, kind, n, entry + 8)
+                if value not in (None, ""):
+                    result[EXIF_TAGS[tag]] = value
+
+    read_ifd(struct.unpack_from(order + "I", data, 4)[0])
+    return result
+
+
+def _exif_value(data, order, kind, count, field):
+    if kind == 2:  # ASCII
+        offset = field if count <= 4 else struct.unpack_from(order + "I", data, field)[0]
+        return data[offset:offset + count].split(b"\x00")[0].decode("latin-1").strip()
+    if kind == 3:  # SHORT
+        return struct.unpack_from(order + "H", data, field)[0]
+    if kind == 4:  # LONG
+        return struct.unpack_from(order + "I", data, field)[0]
+    return None
+
+
+def parse_jpeg(reader: HeaderReader) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"format": "jpeg"}
+    offset = 2
+    while offset + 4 <= reader.size:
+        header = reader.read_at(offset, 4)
+        if len(header) < 4 or header[0] != 0xFF:
+            break
+        marker, length = header[1], struct.unpack(">H", header[2:4])[0]
+        if marker == 0xDA:  # Início dos dados da imagem
+            break
+        if marker == 0xE1:
+            segment = reader.read_at(offset + 4, length - 2)
+            if segment.startswith(b"Exif\x00\x00"):
+                exif = parse_exif(segment[6:])
+                # As dimensões do SOF prevalecem sobre as do EXIF
+                for key, value in exif.items():
+                    result.setdefault(key, value)
+        elif marker in JPEG_SOF_MARKERS:
+            frame = reader.read_at(offset + 4, 5)
+            if len(frame) == 5:
+                height, width = struct.unpack(">HH", frame[1:5])
+                result["width"], result["height"] = width, height
+        offset += 2 + length
+    return result
+
+
+def parse_png(reader: HeaderReader) -> Dict[str, Any]:
+    header = reader.read_at(16, 8)
+    if len(header) < 8:
+        return {"format": "png"}
+    width, height = struct.unpack(">II", header)
+    return {"format": "png", "width": width, "height": height}
+
+
+def parse_gif(reader: HeaderReader) -> Dict[str, Any]:
+    width, height = struct.unpack("<HH", reader.read_at(6, 4).ljust(4, b"\x00"))
+    return {"format": "gif", "width": width, "height": height}
+
+
+def parse_bmp(reader: HeaderReader) -> Dict[str, Any]:
+    width, height = struct.unpack("<ii", reader.read_at(18, 8).ljust(8, b"\x00"))
+    return {"format": "bmp", "width": width, "height": abs(height)}
+
+
+def parse_webp(reader: HeaderReader) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"format": "webp"}
+    chunk = reader.read_at(12, 18)
+    kind = chunk[:4]
+    if kind == b"VP8X" and len(chunk) >= 18:
+        result["width"] = int.from_bytes(chunk[12:15], "little") + 1
+        result["height"] = int.from_bytes(chunk[15:18], "little") + 1
+    elif kind == b"VP8 ":
+        frame = reader.read_at(26, 4)
+        if len(frame) == 4:
+            width, height = struct.unpack("<HH", frame)
+            result["width"], result["height"] = width & 0x3FFF, height & 0x3FFF
+    elif kind == b"VP8L":
+        bits = reader.read_at(21, 4)
+        if len(bits) == 4:
+            value = int.from_bytes(bits, "little")
+            result["width"] = (value & 0x3FFF) + 1
+            result["height"] = ((value >> 14) & 0x3FFF) + 1
+    return result
+
+
+# Áudio
+
+ID3_TEXT_FRAMES = {
+    "TIT2": "title", "TPE1": "artist", "TALB": "album", "TCON": "genre",
+    "TYER": "year", "TDRC": "year", "TLEN": "length_ms",
+}
+ID3_MAX_BYTES = 256 * 1024
+ID3_V22_FRAMES = {"TT2": "title", "TP1": "artist", "TAL": "album", "TCO": "genre", "TYE": "year"}
+
+# Taxas de bits (kbps) e de amostragem do MPEG áudio, camada III
+MPEG1_L3_BITRATES = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320]
+MPEG2_L3_BITRATES = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+MPEG_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def _syncsafe(data: bytes) -> int:
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _decode_id3_text(payload: bytes) -> str:
+    if not payload:
+        return ""
+    encoding, text = payload[0], payload[1:]
+    if encoding == 1:
+        value = text.decode("utf-16", errors="ignore")
+    elif encoding == 2:
+        value = text.decode("utf-16-be", errors="ignore")
+    elif encoding == 3:
+        value = text.decode("utf-8", errors="ignore")
+    else:
+        value = text.decode("latin-1", errors="ignore")
+    return value.split("\x00")[0].strip()
+
+
+def parse_id3(reader: HeaderReader) -> Tuple[Dict[str, Any], int]:
+    """
+    Lê os quadros de texto de uma tag ID3v2.
+
+    Returns:
+        Tupla (campos, tamanho total da tag em bytes)
+    """
+    header = reader.read_at(0, 10)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return {}, 0
+    version, size = header[3], _syncsafe(header[6:10])
+    # Quadros de texto vêm antes das capas (APIC), que podem ter megabytes
+    data = reader.read_at(10, min(size, ID3_MAX_BYTES))
+    result: Dict[str, Any] = {}
+
+    offset = 0
+    id_size, header_size = (3, 6) if version == 2 else (4, 10)
+    frames = ID3_V22_FRAMES if version == 2 else ID3_TEXT_FRAMES
+    while offset + header_size <= len(data):
+        frame_id = data[offset:offset + id_size].decode("latin-1", errors="ignore")
+        if not frame_id.strip("\x00"):
+            break
+        if version == 2:
+            frame_size = int.from_bytes(data[offset + 3:offset + 6], "big")
+        elif version == 4:
+            frame_size = _syncsafe(data[offset + 4:offset + 8])
+        else:
+            frame_size = struct.unpack(">I", data[offset + 4:offset + 8])[0]
+        payload = data[offset + header_size:offset + header_size + frame_size]
+        if frame_id in frames:
+            value = _decode_id3_text(payload)
+            if value:
+                result.setdefault(frames[frame_id], value)
+        offset += header_size + frame_size
+    return result, 10 + size
+
+
+def parse_mpeg_frame(reader: HeaderReader, offset: int) -> Dict[str, Any]:
+    """
+    Estima a duração de um MP3 pelo primeiro quadro: usa o número de quadros
+    do cabeçalho Xing/Info (VBR) ou, se não houver, a taxa de bits (CBR).
+    """
+    data = reader.read_at(offset, 4096)
+    start = data.find(b"\xff")
+    while start != -1 and start + 4 <= len(data):
+        b1, b2, b3 = data[start + 1], data[start + 2], data[start + 3]
+        if (b1 & 0xE0) == 0xE0 and ((b1 >> 1) & 0x03) == 1:  # Camada III
+            version = (b1 >> 3) & 0x03
+            bitrate_index, rate_index = b2 >> 4, (b2 >> 2) & 0x03
+            if version != 1 and 0 < bitrate_index < 15 and rate_index < 3:
+                break
+        start = data.find(b"\xff", start + 1)
+    else:
+        return {}
+
+    bitrates = MPEG1_L3_BITRATES if version == 3 else MPEG2_L3_BITRATES
+    bitrate = bitrates[bitrate_index] * 1000
+    sample_rate = MPEG_SAMPLE_RATES[version][rate_index]
+    channels = 1 if (b3 >> 6) == 3 else 2
+    result = {"sample_rate": sample_rate, "channels": channels, "bitrate": bitrate}
+
+    samples_per_frame = 1152 if version == 3 else 576
+    side_info = (32 if channels == 2 else 17) if version == 3 else (17 if channels == 2 else 9)
+    xing = start + 4 + side_info
+    if data[xing:xing + 4] in (b"Xing", b"Info") and len(data) >= xing + 12:
+        flags = struct.unpack(">I", data[xing + 4:xing + 8])[0]
+        if flags & 0x1:
+            frames = struct.unpack(">I", data[xing + 8:xing + 12])[0]
+            result["duration"] = frames * samples_per_frame / sample_rate
+            return result
+
+    audio_bytes = reader.size - (offset + start)
+    if bitrate:
+        result["duration"] = audio_bytes * 8 / bitrate
+    return result
+
+
+def parse_mp3(reader: HeaderReader) -> Dict[str, Any]:
+    tags, tag_size = parse_id3(reader)
+    result: Dict[str, Any] = {"format": "mp3", **tags}
+    result.update(parse_mpeg_frame(reader, tag_size))
+    length_ms = result.pop("length_ms", None)
+    if "duration" not in result and str(length_ms).isdigit():
+        result["duration"] = int(length_ms) / 1000
+    return result
+
+
+def parse_vorbis_comments(data: bytes) -> Dict[str, Any]:
+    """
+    Lê um bloco de comentários Vorbis (FLAC, Ogg Vorbis, Opus).
+    """
+    fields = {"ARTIST": "artist", "TITLE": "title", "ALBUM": "album", "GENRE": "genre", "DATE": "year"}
+    result: Dict[str, Any] = {}
+    if len(data) < 8:
+        return result
+    vendor_length = struct.unpack_from("<I", data, 0)[0]
+    offset = 4 + vendor_length
+    if offset + 4 > len(data):
+        return result
+    count = struct.unpack_from("<I", data, offset)[0]
+    offset += 4
+    for _ in range(min(count, 1024)):
+        if offset + 4 > len(data):
+            break
+        length = struct.unpack_from("<I", data, offset)[0]
+        comment = data[offset + 4:offset + 4 + length].decode("utf-8", errors="ignore")
+        offset += 4 + length
+        key, _, value = comment.partition("=")
+        if key.upper() in fields and value.strip():
+            result.setdefault(fields[key.upper()], value.strip())
+    return result
+
+
+def parse_flac(reader: HeaderReader) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"format": "flac"}
+    offset = 4
+    while True:
+        header = reader.read_at(offset, 4)
+        if len(header) < 4:
+            break
+        last, kind = header[0] & 0x80, header[0] & 0x7F
+        length = int.from_bytes(header[1:4], "big")
+        if kind == 0:  # STREAMINFO
+            info = reader.read_at(offset + 4, 18)
+            if len(info) == 18:
+                value = int.from_bytes(info[10:18], "big")
+                sample_rate = value >> 44
+                total_samples = value & 0xFFFFFFFFF
+                result["sample_rate"] = sample_rate
+                result["channels"] = ((value >> 41) & 0x07) + 1
+                if sample_rate and total_samples:
+                    result["duration"] = total_samples / sample_rate
+        elif kind == 4:  # VORBIS_COMMENT
+            result.update(parse_vorbis_comments(reader.read_at(offset + 4, length)))
+        if last:
+            break
+        offset += 4 + length
+    return result
+
+
+def _ogg_packets(data: bytes, limit: int = 3) -> List[bytes]:
+    """Remonta os primeiros pacotes de um fluxo Ogg a partir das páginas"""
+    packets, current, offset = [], b"", 0
+    while offset + 27 <= len(data) and len(packets) < limit:
+        if data[offset:offset + 4] != b"OggS":
+            break
+        segments = data[offset + 26]
+        table = data[offset + 27:offset + 27 + segments]
+        position = offset + 27 + segments
+        for lacing in table:
+            current += data[position:position + lacing]
+            position += lacing
+            if lacing < 255:
+                packets.append(current)
+                current = b""
+        offset = position
+    return packets
+
+
+def parse_ogg(reader: HeaderReader) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"format": "ogg"}
+    packets = _ogg_packets(reader.read_at(0, 64 * 1024))
+    rate = None
+    for packet in packets:
+        if packet.startswith(b"\x01vorbis") and len(packet) >= 16:
+            result["channels"] = packet[11]
+            rate = result["sample_rate"] = struct.unpack_from("<I", packet, 12)[0]
+        elif packet.startswith(b"OpusHead") and len(packet) >= 10:
+            result["format"] = "opus"
+            result["channels"] = packet[9]
+            rate = 48000  # A posição do Opus é sempre em amostras de 48 kHz
+        elif packet.startswith(b"\x03vorbis"):
+            result.update(parse_vorbis_comments(packet[7:]))
+        elif packet.startswith(b"OpusTags"):
+            result.update(parse_vorbis_comments(packet[8:]))
+
+    # Duração: posição (granule) da última página do arquivo
+    tail_size = min(reader.size, 64 * 1024)
+    tail = reader.read_at(reader.size - tail_size, tail_size)
+    last = tail.rfind(b"OggS")
+    if rate and last != -1 and last + 14 <= len(tail):
+        granule = struct.unpack_from("<q", tail, last + 6)[0]
+        if granule > 0:
+            result["duration"] = granule / rate
+    return result
+
+
+def parse_riff(reader: HeaderReader) -> Dict[str, Any]:
+    kind = reader.read_at(8, 4)
+    if kind == b"WAVE":
+        result: Dict[str, Any] = {"format": "wav"}
+        offset, byte_rate = 12, 0
+        while offset + 8 <= reader.size:
+            header = reader.read_at(offset, 8)
+            if len(header) < 8:
+                break
+            chunk, size = header[:4], struct.unpack("<I", header[4:])[0]
+            if chunk == b"fmt ":
+                fmt = reader.read_at(offset + 8, 16)
+                if len(fmt) == 16:
+                    _, channels, sample_rate, byte_rate = struct.unpack("<HHII", fmt[:12])
+                    result["channels"], result["sample_rate"] = channels, sample_rate
+            elif chunk == b"data":
+                if byte_rate:
+                    result["duration"] = size / byte_rate
+                break
+            offset += 8 + size + (size & 1)
+        return result
+
+    if kind == b"AVI ":
+        result = {"format": "avi"}
+        data = reader.read_at(12, 4096)
+        position = data.find(b"avih")
+        if position != -1 and position + 48 <= len(data):
+            us_per_frame, = struct.unpack_from("<I", data, position + 8)
+            frames, = struct.unpack_from("<I", data, position + 24)
+            width, height = struct.unpack_from("<II", data, position + 40)
+            result["width"], result["height"] = width, height
+            if us_per_frame and frames:
+                result["duration"] = frames * us_per_frame / 1_000_000
+        return result
+
+    if kind == b"WEBP":
+        return parse_webp(reader)
+    return {}
+
+
+# Contêineres ISO/MP4 (MP4, MOV, M4A)
+
+# Caixas que só agrupam outras caixas
+MP4_CONTAINERS = {b"moov", b"trak", b"mdia", b"udta", b"ilst"}
+MP4_ITEMS = {b"\xa9ART": "artist", b"\xa9nam": "title", b"\xa9alb": "album",
+             b"\xa9gen": "genre", b"\xa9day": "year"}
+
+
+def _mp4_boxes(reader: HeaderReader, start: int, end: int):
+    """Percorre as caixas entre start e end lendo apenas os cabeçalhos"""
+    offset = start
+    while offset + 8 <= end:
+        header = reader.read_at(offset, 16)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack(">I", header[:4])[0], header[4:8]
+        header_size = 8
+        if size == 1 and len(header) >= 16:
+            size, header_size = struct.unpack(">Q", header[8:16])[0], 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size:
+            return
+        yield kind, offset + header_size, min(offset + size, end)
+        offset += size
+
+
+def parse_mp4(reader: HeaderReader) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"format": "mp4"}
+    brand = reader.read_at(8, 4)
+    if brand == b"qt  ":
+        result["format"] = "mov"
+    elif brand in (b"M4A ", b"M4B "):
+        result["format"] = "m4a"
+
+    tracks: List[Dict[str, Any]] = []
+
+    def walk(start, end, track=None, depth=0):
+        # As caixas úteis ficam a poucos níveis de moov; arquivos com
+        # aninhamento maior (malformados) não podem estourar a recursão
+        if depth > 8:
+            return
+        for kind, body, box_end in _mp4_boxes(reader, start, end):
+            if kind == b"trak":
+                track = {}
+                tracks.append(track)
+                walk(body, box_end, track, depth + 1)
+            elif kind in MP4_CONTAINERS:
+                walk(body, box_end, track, depth + 1)
+            elif kind == b"meta":
+                walk(body + 4, box_end, track, depth + 1)  # Caixa "full": versão e flags
+            elif kind == b"mvhd":
+                data = reader.read_at(body, 32)
+                if data[:1] == b"\x01" and len(data) >= 32:
+                    timescale, duration = struct.unpack(">IQ", data[20:32])
+                elif len(data) >= 20:
+                    timescale, duration = struct.unpack(">II", data[12:20])
+                else:
+                    continue
+                if timescale:
+                    result["duration"] = duration / timescale
+            elif kind == b"tkhd" and track is not None:
+                data = reader.read_at(body, 92)
+                position = 84 if data[:1] == b"\x01" else 76
+                if len(data) >= position + 8:
+                    width, height = struct.unpack(">II", data[position:position + 8])
+                    track["width"], track["height"] = width >> 16, height >> 16
+            elif kind == b"hdlr" and track is not None:
+                track["handler"] = reader.read_at(body + 8, 4)
+            elif kind in MP4_ITEMS:
+                for item_kind, item_body, item_end in _mp4_boxes(reader, body, box_end):
+                    if item_kind == b"data":
+                        value = reader.read_at(item_body + 8, min(item_end - item_body - 8, 512))
+                        text = value.decode("utf-8", errors="ignore").strip()
+                        if text:
+                            result.setdefault(MP4_ITEMS[kind], text)
+
+    for kind, body, box_end in _mp4_boxes(reader, 0, reader.size):
+        if kind == b"moov":
+            walk(body, box_end)
+            break
+
+    video = [t for t in tracks if t.get("handler") == b"vide" and t.get("width")]
+    if video:
+        best = max(video, key=lambda t: t["width"] * t["height"])
+        result["width"], result["height"] = best["width"], best["height"]
+    elif not any(t.get("handler") == b"vide" for t in tracks) and tracks:
+        result["audio_only"] = True
+    return result
+
+
+# Matroska / WebM (EBML)
+
+MKV_SEGMENT = 0x18538067
+MKV_INFO = 0x1549A966
+MKV_TRACKS = 0x1654AE6B
+MKV_TRACK_ENTRY = 0xAE
+MKV_VIDEO = 0xE0
+MKV_CLUSTER = 0x1F43B675
+MKV_FIELDS = {
+    0x2AD7B1: "timecode_scale",
+    0x4489: "duration",
+    0x7BA9: "title",
+    0xB0: "width",
+    0xBA: "height",
+}
+
+
+def _ebml_varint(data: bytes, offset: int, keep_marker: bool) -> Tuple[Optional[int], int]:
+    if offset >= len(data) or data[offset] == 0:
+        return None, 0
+    first = data[offset]
+    length = 8 - first.bit_length() + 1
+    if offset + length > len(data):
+        return None, 0
+    value = first if keep_marker else first & ((1 << (8 - length)) - 1)
+    for byte in data[offset + 1:offset + length]:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        value = -1  # Tamanho desconhecido
+    return value, length
+
+
+def parse_mkv(reader: HeaderReader) -> Dict[str, Any]:
+    # Info e Tracks ficam no início do segmento, antes dos clusters
+    data = reader.read_at(0, reader.remaining)
+    fields: Dict[str, Any] = {}
+    widths: List[Tuple[int, int]] = []
+
+    def walk(start, end, depth=0):
+        offset = start
+        while offset < end:
+            element, id_length = _ebml_varint(data, offset, keep_marker=True)
+            size, size_length = _ebml_varint(data, offset + id_length, keep_marker=False)
+            if element is None or size is None:
+                return
+            body = offset + id_length + size_length
+            body_end = end if size == -1 else min(body + size, end)
+            if element == MKV_CLUSTER:
+                return  # Daqui em diante só há quadros de mídia
+            if element in (MKV_SEGMENT, MKV_INFO, MKV_TRACKS, MKV_TRACK_ENTRY, MKV_VIDEO) and depth < 4:
+                walk(body, body_end, depth + 1)
+                if element == MKV_VIDEO and fields.get("width") and fields.get("height"):
+                    widths.append((fields.pop("width"), fields.pop("height")))
+            elif element in MKV_FIELDS:
+                raw = data[body:body_end]
+                name = MKV_FIELDS[element]
+                if name == "duration":
+                    if len(raw) in (4, 8):
+                        fields[name] = struct.unpack(">f" if len(raw) == 4 else ">d", raw)[0]
+                elif name == "title":
+                    fields[name] = raw.decode("utf-8", errors="ignore")
+                else:
+                    fields[name] = int.from_bytes(raw, "big")
+            if size == -1:
+                return
+            offset = body_end
+
+    walk(0, len(data))
+    result: Dict[str, Any] = {"format": "webm" if b"webm" in data[:64] else "mkv"}
+    if fields.get("duration"):
+        result["duration"] = fields["duration"] * fields.get("timecode_scale", 1_000_000) / 1e9
+    if fields.get("title"):
+        result["title"] = fields["title"]
+    if widths:
+        result["width"], result["height"] = max(widths, key=lambda wh: wh[0] * wh[1])
+    return result
+
+
+# Identificação do formato e API pública
+
+def _detect_parser(head: bytes) -> Optional[Callable]:
+    if head.startswith(b"\xff\xd8\xff"):
+        return parse_jpeg
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return parse_png
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return parse_gif
+    if head.startswith(b"BM"):
+        return parse_bmp
+    if head.startswith(b"RIFF"):
+        return parse_riff
+    if head[4:8] == b"ftyp":
+        return parse_mp4
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return parse_mkv
+    if head.startswith(b"fLaC"):
+        return parse_flac
+    if head.startswith(b"OggS"):
+        return parse_ogg
+    if head.startswith(b"ID3") or head[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"):
+        return parse_mp3
+    return None
+
+
+def read_media_metadata(path: str, max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[Dict[str, Any]]:
+    """
+    Extrai metadados de mídia lendo apenas cabeçalhos e índices do arquivo:
+    EXIF e dimensões de imagens, ID3/Vorbis/MP4 de áudio e caixas MP4/MKV
+    de vídeo. Nunca lê mais que `max_bytes` bytes.
+
+    Args:
+        path: Caminho do arquivo
+        max_bytes: Limite de bytes lidos
+
+    Returns:
+        Dicionário com formato, dimensões, duração (segundos), artista etc.,
+        ou None se o formato não for reconhecido
+    """
+    try:
+        size = os.path.getsize(path)
+        with open_file(path) as f:
+            reader = HeaderReader(f, size, max_bytes)
+            parser = _detect_parser(reader.read_at(0, 16))
+            if parser is None:
+                return None
+            result = parser(reader)
+    except (OSError, struct.error, ValueError, IndexError) as e:
+        logger.warning(f"Erro ao ler metadados de mídia de {path}: {str(e)}")
+        return None
+
+    if "duration" in result:
+        result["duration"] = round(result["duration"], 2)
+    return {key: value for key, value in result.items() if value not in (None, "")}
+
+
+def media_tags(media: Optional[Dict[str, Any]], file_type: str,
+               longform_seconds: float = DEFAULT_LONGFORM_SECONDS) -> List[str]:
+    """
+    Deriva tags dos metadados de mídia (resolução, duração, artista, câmera).
+
+    Args:
+        media: Metadados retornados por read_media_metadata
+        file_type: Categoria do arquivo
+        longform_seconds: Duração mínima para a tag "longform"
+
+    Returns:
+        Lista de tags
+    """
+    if not isinstance(media, dict):
+        return []
+    tags = []
+
+    width, height = media.get("width") or 0, media.get("height") or 0
+    if file_type == "videos" and width and height:
+        long_side, short_side = max(width, height), min(width, height)
+        for tag, min_long, min_short in RESOLUTION_TAGS:
+            if long_side >= min_long and short_side >= min_short:
+                tags.append(tag)
+                break
+        else:
+            tags.append("sd")
+
+    duration = media.get("duration") or 0
+    if file_type in ("videos", "audio") and duration >= longform_seconds:
+        tags.append("longform")
+
+    for key in ("artist", "genre"):
+        value = media.get(key)
+        # Gêneros ID3 numéricos ("(17)") não são úteis como tag
+        if isinstance(value, str) and value.strip() and not value.strip("() ").isdigit():
+            tags.append(value.strip().lower()[:100])
+
+    if media.get("make"):
+        tags.append(str(media["make"]).strip().lower()[:100])
+    if media.get("has_gps"):
+        tags.append("geotagged")
+
+    return tags
@@ -0,0 +1,205 @@
+import re
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, cast, exists, func, literal, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.models.file import File
+
+logger = logging.getLogger(__name__)
+
+# Prefixo dos parâmetros de consulta sobre metadados (ex.: meta.client=Acme)
+META_PREFIX = "meta."
+
+# Sufixos de operador para faixas em chaves numéricas (ex.: meta.amount__gte=100)
+RANGE_OPERATORS = {
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+}
+
+# Chaves aceitas: usadas em caminhos JSON e em nomes de índices
+KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,62}$")
+
+# Caminhos aninhados: até 4 chaves separadas por ponto (ex.: meta.spreadsheet.columns)
+MAX_PATH_DEPTH = 4
+
+
+def is_valid_path(key: str) -> bool:
+    """Verifica se uma chave (ou caminho com pontos) pode ser usada em filtros"""
+    parts = key.split(".")
+    return len(parts) <= MAX_PATH_DEPTH and all(KEY_PATTERN.match(part) for part in parts)
+
+
+def parse_indexed_keys(value: str) -> Dict[str, str]:
+    """
+    Lê a lista de chaves de metadados indexadas ("client,amount:number").
+
+    Args:
+        value: Chaves separadas por vírgula, com tipo opcional (text ou number)
+
+    Returns:
+        Dicionário chave -> tipo
+    """
+    keys = {}
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        key, _, kind = item.partition(":")
+        if KEY_PATTERN.match(key):
+            keys[key] = "number" if kind.strip() == "number" else "text"
+    return keys
+
+
+def _to_number(value: str) -> Optional[float]:
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return int(number) if number.is_integer() else number
+
+
+def parse_metadata_filters(args) -> List[Tuple[str, str, Any]]:
+    """
+    Lê os filtros de metadados dos parâmetros da requisição.
+
+    Args:
+        args: Parâmetros de consulta (request.args)
+
+    Returns:
+        Lista de tuplas (chave, operador, valor); o operador é "eq" ou uma faixa
+    """
+    filters = []
+    for name, values in args.lists():
+        if not name.startswith(META_PREFIX):
+            continue
+        key, _, operator = name[len(META_PREFIX):].partition("__")
+        operator = operator or "eq"
+        if not is_valid_path(key):
+            raise ValueError(f"Chave de metadados inválida: {key}")
+        if operator != "eq" and operator not in RANGE_OPERATORS:
+            raise ValueError(f"Operador de metadados inválido: {operator}")
+
+        for value in values:
+            if operator != "eq":
+                number = _to_number(value)
+                if number is None:
+                    raise ValueError(f"Valor numérico inválido para {name}: {value}")
+                value = number
+            filters.append((key, operator, value))
+    return filters
+
+
+def _sqlite_value(key: str):
+    # O caminho vai como literal (e não parâmetro) para coincidir com a
+    # expressão do índice; a chave já foi validada por is_valid_path
+    return func.json_extract(File.file_metadata, literal_column(f"'$.{key}'"))
+
+
+def _postgres_number(key: str):
+    # Mesma expressão do índice: CASE evita erro de conversão em valores não numéricos
+    if "." in key:
+        path = "{" + key.replace(".", ",") + "}"
+        return literal_column(
+            f"(CASE WHEN jsonb_typeof(metadata #> '{path}') = 'number' "
+            f"THEN (metadata #>> '{path}')::numeric END)"
+        )
+    return literal_column(
+        f"(CASE WHEN jsonb_typeof(metadata -> '{key}') = 'number' "
+        f"THEN (metadata ->> '{key}')::numeric END)"
+    )
+
+
+def _nested_document(key: str, value: Any) -> Dict[str, Any]:
+    """Monta o documento de contenção de um caminho ("a.b", 1 -> {"a": {"b": 1}})"""
+    for part in reversed(key.split(".")):
+        value = {part: value}
+    return value
+
+
+def metadata_condition(key: str, operator: str, value: Any, dialect: str):
+    """
+    Monta a condição SQL de um filtro de metadados para o dialeto do banco.
+
+    No Postgres, igualdades usam contenção (@>), atendida pelo índice GIN, e
+    faixas usam a expressão numérica dos índices de chaves declaradas. No
+    SQLite, ambas usam json_extract, atendido pelos índices de expressão.
+
+    Em caminhos aninhados ("spreadsheet.columns"), a igualdade também casa
+    com listas que contêm o valor.
+    """
+    nested = "." in key
+    if dialect == "postgresql":
+        if operator == "eq":
+            candidates = [value]
+            number = _to_number(value)
+            if number is not None:
+                candidates.append(number)
+            if nested:
+                candidates += [[candidate] for candidate in candidates]
+            return or_(*[
+                File.file_metadata.op("@>")(cast(literal(json.dumps(_nested_document(key, candidate))), JSONB))
+                for candidate in candidates
+            ])
+        return RANGE_OPERATORS[operator](_postgres_number(key), value)
+
+    column = _sqlite_value(key)
+    if operator == "eq" and nested:
+        # json_each percorre listas e também devolve valores escalares
+        items = func.json_each(File.file_metadata, literal_column(f"'$.{key}'")).table_valued("value")
+        number = _to_number(value)
+        matches = [items.c.value == literal(value)]
+        if number is not None:
+            matches.append(items.c.value == literal(number))
+        return exists(select(literal(1)).select_from(items).where(or_(*matches)))
+    if operator == "eq":
+        number = _to_number(value)
+        if number is None:
+            return column == literal(value)
+        # Cada valor com seu próprio tipo: o JSON pode guardar "42" ou 42
+        return or_(column == literal(value), column == literal(number))
+    return and_(
+        func.json_type(File.file_metadata, literal_column(f"'$.{key}'")).in_(["integer", "real"]),
+        RANGE_OPERATORS[operator](column, literal(value)),
+    )
+
+
+def apply_metadata_filters(query, filters: List[Tuple[str, str, Any]], dialect: str):
+    """
+    Aplica filtros de metadados a uma consulta sobre File.
+    """
+    for key, operator, value in filters:
+        query = query.filter(metadata_condition(key, operator, value, dialect))
+    return query
+
+
+def ensure_metadata_indexes(connection, keys: Dict[str, str]) -> None:
+    """
+    Cria os índices de expressão das chaves de metadados declaradas como
+    frequentes (METADATA_INDEXED_KEYS). No Postgres o índice GIN já cobre
+    igualdades, então só as chaves numéricas ganham índice próprio.
+
+    Args:
+        connection: Conexão com o banco
+        keys: Dicionário chave -> tipo ("text" ou "number")
+    """
+    dialect = connection.dialect.name
+    for key, kind in keys.items():
+        if not KEY_PATTERN.match(key):
+            continue
+        name = f"ix_files_meta_{key.lower()}"
+        if dialect == "sqlite":
+            expression = f"json_extract(metadata, '$.{key}')"
+        elif dialect == "postgresql" and kind == "number":
+            expression = (
+                f"(CASE WHEN jsonb_typeof(metadata -> '{key}') = 'number' "
+                f"THEN (metadata ->> '{key}')::numeric END)"
+            )
+        else:
+            continue
+        connection.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON files ({expression})")
+        logger.info(f"Índice de metadados garantido: {name}")
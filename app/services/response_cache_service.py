@@ -0,0 +1,84 @@
+import hashlib
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional
+
+from flask import current_app, g, make_response, request
+
+from app.core.cache import TTLCache
+from app.services.version_service import get_versions
+
+# Respostas serializadas por URL e versão (por processo)
+_response_cache = None
+
+
+def get_response_cache() -> TTLCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = TTLCache(
+            maxsize=current_app.config.get("RESPONSE_CACHE_SIZE", 512),
+            ttl=current_app.config.get("RESPONSE_CACHE_TTL_SECONDS", 60),
+            name="responses",
+        )
+    return _response_cache
+
+
+def weak_etag(versions: Dict[str, int]) -> str:
+    """
+    Valor do ETag (sem aspas) para um conjunto de versões de escopos. Muda
+    sempre que algum dos contadores muda.
+    """
+    signature = ";".join(f"{scope}={version}" for scope, version in sorted(versions.items()))
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()[:20]
+
+
+def request_versions() -> Optional[Dict[str, int]]:
+    """
+    Versões dos escopos lidas por @conditional nesta requisição (None fora
+    de uma rota condicional).
+    """
+    return g.get("versions")
+
+
+def conditional(scopes: Callable[..., Iterable[str]], cache: bool = False):
+    """
+    Decorador de rotas GET com ETag fraco derivado dos contadores de versão.
+    Se o cliente já tem a versão atual (If-None-Match), responde 304 lendo
+    apenas a tabela change_counters, sem executar a rota.
+
+    Args:
+        scopes: Função que recebe os argumentos da rota e retorna os escopos
+            de versão dos quais a resposta depende
+        cache: Guardar a resposta serializada em memória, por URL e versão
+            (se RESPONSE_CACHE_ENABLED)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # As versões são lidas antes dos dados: se mudarem durante a rota,
+            # o ETag devolvido fica para trás e a próxima requisição busca de novo.
+            # A rota as reaproveita (request_versions) em vez de lê-las de novo
+            g.versions = get_versions(scopes(**kwargs))
+            etag = weak_etag(g.versions)
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag, weak=True)
+                return response
+
+            use_cache = cache and current_app.config.get("RESPONSE_CACHE_ENABLED", True)
+            key = (request.full_path, etag)
+            cached = get_response_cache().get(key) if use_cache else None
+            if cached is not None:
+                body, mimetype = cached
+                response = current_app.response_class(body, mimetype=mimetype)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if use_cache and response.status_code == 200 and not response.is_streamed:
+                    get_response_cache().set(key, (response.get_data(), response.mimetype))
+
+            if response.status_code == 200:
+                response.set_etag(etag, weak=True)
+                # O cliente pode guardar a resposta, mas deve revalidá-la sempre
+                response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,264 @@
+import os
+import json
+import logging
+import multiprocessing
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import bindparam, select
+
+from app.db.database import db, insert_ignore
+from app.db.models.tag import Tag
+from app.db.models.file import File, file_tags
+from app.db.models.file_content import FileContent
+from app.services.file_service import apply_file_filters
+from app.services.tag_service import resolve_tags
+from app.services.tagger_service import rank_tags, run_taggers
+from app.services.usage_service import add_usage
+from app.services.version_service import touch_files
+
+logger = logging.getLogger(__name__)
+
+# Aplicação criada em cada processo do pool (ver _init_worker)
+_worker_app = None
+
+
+def file_batches(filters: Optional[Dict[str, Any]], batch_size: int,
+                 after_id: int = 0) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Percorre os arquivos em lotes ordenados por ID (paginação por chave, sem
+    OFFSET), gerando o resumo de cada arquivo entregue aos extratores. Só um
+    lote fica em memória por vez.
+
+    Args:
+        filters: Filtros de parse_file_filters (None = todos os arquivos)
+        batch_size: Número de arquivos por lote
+        after_id: Processar apenas arquivos com ID maior (retomada)
+    """
+    files = File.__table__
+    contents = FileContent.__table__
+    base = select(
+        files.c.id, files.c.original_filename, files.c.file_path,
+        files.c.file_type, files.c.content_type, files.c["metadata"],
+    )
+    if filters:
+        base = apply_file_filters(base, filters)
+
+    while True:
+        rows = db.session.execute(
+            base.where(files.c.id > after_id).order_by(files.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return
+
+        ids = [row.id for row in rows]
+        keywords = dict(db.session.execute(
+            select(contents.c.file_id, contents.c.keywords).where(contents.c.file_id.in_(ids))
+        ).all())
+
+        yield [
+            {
+                "id": row.id,
+                "original_filename": row.original_filename,
+                "file_path": row.file_path,
+                "file_type": row.file_type,
+                "content_type": row.content_type,
+                "metadata": row._mapping["metadata"],
+                "keywords": list(keywords.get(row.id) or []),
+            }
+            for row in rows
+        ]
+        after_id = ids[-1]
+
+
+def tag_snapshots(snapshots: List[Dict[str, Any]], max_tags: int) -> List[Tuple[int, List[str]]]:
+    """
+    Gera as tags de um lote de arquivos com os extratores registrados.
+    """
+    return [(snapshot["id"], rank_tags(run_taggers(snapshot), max_tags)) for snapshot in snapshots]
+
+
+def _init_worker():
+    """Cria a aplicação (e seu próprio pool de conexões) em cada processo"""
+    global _worker_app
+    from app.main import create_app
+
+    _worker_app = create_app()
+
+
+def _tag_batch_in_worker(snapshots: List[Dict[str, Any]], max_tags: int) -> List[Tuple[int, List[str]]]:
+    with _worker_app.app_context():
+        return tag_snapshots(snapshots, max_tags)
+
+
+def diff_tags(generated: List[Tuple[int, List[str]]]) -> List[Dict[str, Any]]:
+    """
+    Compara as tags geradas com as atuais de cada arquivo. Tags adicionadas
+    manualmente (auto_generated = False) nunca são removidas; só as geradas
+    automaticamente que deixaram de ser sugeridas.
+
+    Returns:
+        Lista de {"file_id", "added", "removed"} apenas dos arquivos alterados
+    """
+    tags = Tag.__table__
+    ids = [file_id for file_id, _ in generated]
+    current: Dict[int, Dict[str, bool]] = {file_id: {} for file_id in ids}
+    rows = db.session.execute(
+        select(file_tags.c.file_id, tags.c.name, tags.c.auto_generated)
+        .join(tags, tags.c.id == file_tags.c.tag_id)
+        .where(file_tags.c.file_id.in_(ids))
+    )
+    for file_id, name, auto_generated in rows:
+        current[file_id][name] = bool(auto_generated)
+
+    diffs = []
+    for file_id, names in generated:
+        existing = current[file_id]
+        added = [name for name in names if name not in existing]
+        removed = sorted(name for name, auto in existing.items() if auto and name not in names)
+        if added or removed:
+            diffs.append({"file_id": file_id, "added": added, "removed": removed})
+    return diffs
+
+
+def apply_tag_diffs(diffs: List[Dict[str, Any]]) -> None:
+    """
+    Grava as diferenças de um lote com operações em massa: um INSERT (ON
+    CONFLICT DO NOTHING) para todas as associações novas e um DELETE em
+    lote para as removidas. As contagens de uso são ajustadas por tag.
+    """
+    if not diffs:
+        return
+
+    added_ids = resolve_tags(
+        [name for diff in diffs for name in diff["added"]], auto_generated=True
+    )
+    removed_names = {name for diff in diffs for name in diff["removed"]}
+    tags = Tag.__table__
+    removed_ids = dict(db.session.execute(
+        select(tags.c.name, tags.c.id).where(tags.c.name.in_(removed_names))
+    ).all()) if removed_names else {}
+
+    inserts = [
+        {"file_id": diff["file_id"], "tag_id": added_ids[name]}
+        for diff in diffs for name in diff["added"] if name in added_ids
+    ]
+    deletes = [
+        {"f": diff["file_id"], "t": removed_ids[name]}
+        for diff in diffs for name in diff["removed"] if name in removed_ids
+    ]
+
+    if inserts:
+        stmt = insert_ignore(file_tags)
+        db.session.execute(stmt if stmt is not None else file_tags.insert(), inserts)
+    if deletes:
+        db.session.execute(
+            file_tags.delete().where(
+                file_tags.c.file_id == bindparam("f"), file_tags.c.tag_id == bindparam("t")
+            ),
+            deletes,
+        )
+
+    # Uma variação por tag, gravada no commit com incremento atômico
+    deltas: Counter = Counter()
+    for row in inserts:
+        deltas[row["tag_id"]] += 1
+    for row in deletes:
+        deltas[row["t"]] -= 1
+    for tag_id, delta in deltas.items():
+        if delta:
+            add_usage([tag_id], delta)
+
+    # Invalida as listagens de cada projeto com arquivos alterados
+    files = File.__table__
+    projects = db.session.execute(
+        select(files.c.project_id).where(files.c.id.in_({diff["file_id"] for diff in diffs})).distinct()
+    ).scalars()
+    for project_id in projects:
+        touch_files(project_id)
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    """Lê o ponto de retomada gravado por save_checkpoint"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    """
+    Grava o ponto de retomada de forma atômica (arquivo temporário + rename),
+    para que uma interrupção no meio da escrita não o corrompa.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def retag_files(filters: Optional[Dict[str, Any]] = None, after_id: int = 0, batch_size: int = 500,
+                workers: int = 0, dry_run: bool = False,
+                on_batch: Optional[Callable[[int, List[Dict[str, Any]], Dict[str, int]], None]] = None
+                ) -> Dict[str, int]:
+    """
+    Gera novamente as tags de todos os arquivos (ou dos que atendem aos
+    filtros), lote a lote.
+
+    Os lotes são lidos no processo principal e as tags são geradas em um
+    pool de processos; os resultados voltam na ordem dos lotes, de modo que
+    cada commit avança o ponto de retomada de forma contínua. No máximo
+    2 x workers lotes ficam em andamento, o que limita a memória usada.
+
+    Args:
+        filters: Filtros de parse_file_filters (None = todos os arquivos)
+        after_id: Retomar a partir deste ID (exclusive)
+        batch_size: Número de arquivos por lote
+        workers: Processos do pool (0 = gerar as tags no próprio processo)
+        dry_run: Apenas calcular as diferenças, sem gravar
+        on_batch: Chamado após cada lote com (último ID, diferenças, totais)
+
+    Returns:
+        Totais: arquivos processados, alterados, tags adicionadas e removidas
+    """
+    max_tags = current_app.config.get("MAX_TAGS_PER_FILE", 10)
+    totals = {"processed": 0, "changed": 0, "added": 0, "removed": 0}
+
+    def finish(last_id, generated):
+        diffs = diff_tags(generated)
+        if dry_run:
+            db.session.rollback()
+        else:
+            apply_tag_diffs(diffs)
+            db.session.commit()
+        totals["processed"] += len(generated)
+        totals["changed"] += len(diffs)
+        totals["added"] += sum(len(diff["added"]) for diff in diffs)
+        totals["removed"] += sum(len(diff["removed"]) for diff in diffs)
+        logger.info(f"Re-tag: lote até o ID {last_id} ({len(diffs)} arquivo(s) alterado(s))")
+        if on_batch:
+            on_batch(last_id, diffs, totals)
+
+    batches = file_batches(filters, batch_size, after_id)
+    if workers <= 0:
+        for batch in batches:
+            finish(batch[-1]["id"], tag_snapshots(batch, max_tags))
+        return totals
+
+    # "spawn": os processos não herdam conexões abertas do processo principal
+    context = multiprocessing.get_context("spawn")
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as executor:
+        for batch in batches:
+            pending.append((batch[-1]["id"], executor.submit(_tag_batch_in_worker, batch, max_tags)))
+            if len(pending) >= 2 * workers:
+                last_id, future = pending.popleft()
+                finish(last_id, future.result())
+        while pending:
+            last_id, future = pending.popleft()
+            finish(last_id, future.result())
+
+    return totals
@@ -0,0 +1,436 @@
+import os
+import re
+import csv
+import codecs
+import logging
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.services.storage_service import open_file
+
+logger = logging.getLogger(__name__)
+
+# Limites padrão da amostra lida de cada planilha
+DEFAULT_SAMPLE_ROWS = 200
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+
+# Tamanho máximo de uma linha de CSV (linhas maiores são truncadas)
+MAX_LINE_BYTES = 256 * 1024
+
+# Bytes usados para detectar o delimitador
+SNIFF_BYTES = 64 * 1024
+
+# Número máximo de abas descritas por pasta de trabalho
+MAX_SHEETS = 20
+
+# Número máximo de colunas descritas por aba
+MAX_COLUMNS = 200
+
+DELIMITERS = ",;\t|"
+
+# Tipos inferidos, do mais para o menos específico
+BOOLEAN_VALUES = {"true", "false", "sim", "não", "nao", "yes", "no"}
+INTEGER_PATTERN = re.compile(r"^[+-]?\d+$")
+NUMBER_PATTERN = re.compile(r"^[+-]?(\d+([.,]\d*)?|[.,]\d+)([eE][+-]?\d+)?$")
+DATE_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4})$")
+DATETIME_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?$")
+
+# Combinação de tipos entre linhas: números inteiros e decimais viram "number"
+NUMERIC_TYPES = {"integer", "number"}
+
+
+def infer_type(value: str) -> Optional[str]:
+    """
+    Infere o tipo de um valor de célula.
+
+    Returns:
+        "integer", "number", "boolean", "date", "datetime", "text" ou None (vazio)
+    """
+    value = value.strip()
+    if not value:
+        return None
+    if INTEGER_PATTERN.match(value):
+        return "integer"
+    if NUMBER_PATTERN.match(value):
+        return "number"
+    if value.lower() in BOOLEAN_VALUES:
+        return "boolean"
+    if DATE_PATTERN.match(value):
+        return "date"
+    if DATETIME_PATTERN.match(value):
+        return "datetime"
+    return "text"
+
+
+def merge_types(current: Optional[str], new: Optional[str]) -> Optional[str]:
+    """Combina o tipo acumulado de uma coluna com o tipo de um novo valor"""
+    if new is None or current == new:
+        return current
+    if current is None:
+        return new
+    if current in NUMERIC_TYPES and new in NUMERIC_TYPES:
+        return "number"
+    if {current, new} == {"date", "datetime"}:
+        return "datetime"
+    return "text"
+
+
+def describe_columns(header: List[str], rows: List[List[str]]) -> List[Dict[str, Any]]:
+    """
+    Monta a descrição das colunas (nome e tipo inferido) a partir do
+    cabeçalho e de uma amostra de linhas.
+    """
+    width = min(max([len(header)] + [len(row) for row in rows]), MAX_COLUMNS)
+    types: List[Optional[str]] = [None] * width
+    for row in rows:
+        for index, value in enumerate(row[:width]):
+            types[index] = merge_types(types[index], infer_type(value))
+
+    columns = []
+    for index in range(width):
+        name = header[index].strip() if index < len(header) else ""
+        columns.append({"name": name or f"column_{index + 1}", "type": types[index] or "empty"})
+    return columns
+
+
+# CSV / TSV
+
+def _detect_encoding(head: bytes) -> str:
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Um caractere cortado no fim da amostra não indica outra codificação
+        if e.start < len(head) - 3:
+            return "latin-1"
+    return "utf-8"
+
+
+def _detect_delimiter(sample: str, ext: str) -> str:
+    if ext == ".tsv":
+        return "\t"
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        # Sem padrão claro: o delimitador mais frequente na primeira linha
+        first_line = sample.split("\n", 1)[0]
+        return max(DELIMITERS, key=first_line.count) if any(d in first_line for d in DELIMITERS) else ","
+
+
+class _LineBudget:
+    """
+    Fonte de linhas para o csv.reader que conta os bytes consumidos e para
+    ao atingir o orçamento, mantendo o uso de memória limitado mesmo em
+    arquivos de vários GB.
+    """
+
+    def __init__(self, stream, encoding: str, max_bytes: int):
+        self.stream = stream
+        self.encoding = encoding
+        self.remaining = max_bytes
+        self.consumed = 0
+        self.exhausted = False
+
+    def __iter__(self) -> Iterator[str]:
+        while self.remaining > 0:
+            raw = self.stream.readline(MAX_LINE_BYTES)
+            if not raw:
+                self.exhausted = True
+                return
+            self.consumed += len(raw)
+            self.remaining -= len(raw)
+            yield raw.decode(self.encoding, errors="replace")
+
+
+def read_csv_schema(path: str, ext: str, sample_rows: int = DEFAULT_SAMPLE_ROWS,
+                    max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[Dict[str, Any]]:
+    """
+    Lê o cabeçalho e uma amostra de linhas de um CSV/TSV.
+
+    A contagem de linhas é exata quando o arquivo inteiro cabe na amostra;
+    caso contrário é estimada pelo tamanho médio das linhas lidas.
+    """
+    size = os.path.getsize(path)
+    with open_file(path) as f:
+        head = f.read(SNIFF_BYTES)
+        encoding = _detect_encoding(head)
+        delimiter = _detect_delimiter(head.decode(encoding, errors="ignore"), ext)
+        f.seek(0)
+
+        lines = _LineBudget(f, encoding, max_bytes)
+        reader = csv.reader(lines, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return None
+        header_bytes = lines.consumed
+
+        # Depois da amostra, as linhas só são contadas até o fim do orçamento
+        rows = []
+        counted = 0
+        for row in reader:
+            counted += 1
+            if len(rows) < sample_rows:
+                rows.append(row)
+
+        if lines.exhausted:
+            row_count, exact = counted, True
+        else:
+            data_bytes = lines.consumed - header_bytes
+            row_count = int((size - header_bytes) * counted / data_bytes) if data_bytes else 0
+            exact = False
+
+    return {
+        "format": ext.lstrip("."),
+        "delimiter": delimiter,
+        "encoding": encoding,
+        "sheets": [{
+            "name": None,
+            "columns": describe_columns(header, rows),
+            "row_count": row_count,
+            "row_count_exact": exact,
+        }],
+    }
+
+
+# XLSX
+
+XLSX_RELATIONSHIP_ATTR = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+CELL_REFERENCE = re.compile(r"^([A-Z]+)(\d+)$")
+
+
+def _local_name(tag: str) -> str:
+    """Remove o namespace de uma tag XML ("{ns}c" -> "c")"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _column_index(reference: str) -> Optional[int]:
+    match = CELL_REFERENCE.match(reference or "")
+    if not match:
+        return None
+    index = 0
+    for char in match.group(1):
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+class _CountingStream:
+    """Envolve um stream do zip contando os bytes (descompactados) lidos"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.consumed = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.consumed += len(data)
+        return data
+
+
+def _xlsx_sheets(archive: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """Retorna os pares (nome da aba, caminho do XML) na ordem da pasta de trabalho"""
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels}
+
+    sheets = []
+    for elem in workbook.iter():
+        if _local_name(elem.tag) != "sheet":
+            continue
+        target = targets.get(elem.get(XLSX_RELATIONSHIP_ATTR))
+        if not target:
+            continue
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+        sheets.append((elem.get("name"), path))
+    return sheets[:MAX_SHEETS]
+
+
+def _read_sheet_rows(archive: zipfile.ZipFile, path: str, sample_rows: int,
+                     max_bytes: int) -> Dict[str, Any]:
+    """
+    Percorre o XML de uma aba de forma incremental, guardando as primeiras
+    linhas (células de texto compartilhado ficam como ("s", índice)).
+    """
+    info = archive.getinfo(path)
+    rows: List[Dict[int, Any]] = []
+    dimension_rows = None
+    counted = 0
+    finished = True
+
+    with archive.open(path) as raw:
+        stream = _CountingStream(raw)
+        row: Dict[int, Any] = {}
+        cell_index = cell_type = value = None
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            name = _local_name(elem.tag)
+            if event == "start":
+                if name == "dimension":
+                    # "A1:K1200": a última linha informa o tamanho da aba
+                    match = CELL_REFERENCE.match(elem.get("ref", "").rsplit(":", 1)[-1])
+                    if match:
+                        dimension_rows = int(match.group(2))
+                elif name == "c":
+                    cell_index = _column_index(elem.get("r"))
+                    if cell_index is None:
+                        cell_index = len(row)
+                    cell_type = elem.get("t")
+                    value = None
+                continue
+
+            if name == "v" or (name == "t" and cell_type == "inlineStr"):
+                value = elem.text or ""
+            elif name == "c":
+                if value is not None and cell_index < MAX_COLUMNS:
+                    row[cell_index] = ("s", int(value)) if cell_type == "s" and value.isdigit() else value
+            elif name == "row":
+                counted += 1
+                if len(rows) < sample_rows:
+                    rows.append(row)
+                row = {}
+                # Descartar os elementos já lidos mantém a memória constante
+                elem.clear()
+                if len(rows) >= sample_rows and stream.consumed >= max_bytes:
+                    finished = False
+                    break
+            elif name == "sheetData":
+                break
+
+    if finished:
+        row_count, exact = counted, True
+    elif dimension_rows and dimension_rows > counted:
+        row_count, exact = dimension_rows, False
+    else:
+        row_count = int(info.file_size * counted / stream.consumed) if stream.consumed else 0
+        exact = False
+
+    return {"rows": rows, "row_count": row_count, "exact": exact}
+
+
+def _read_shared_strings(archive: zipfile.ZipFile, wanted: set) -> Dict[int, str]:
+    """
+    Lê apenas os textos compartilhados usados pela amostra, parando assim
+    que o maior índice necessário for encontrado.
+    """
+    if not wanted or "xl/sharedStrings.xml" not in archive.namelist():
+        return {}
+
+    last = max(wanted)
+    strings = {}
+    index = 0
+    with archive.open("xl/sharedStrings.xml") as stream:
+        for event, elem in ET.iterparse(stream, events=("end",)):
+            if _local_name(elem.tag) != "si":
+                continue
+            if index in wanted:
+                strings[index] = "".join(elem.itertext())
+            elem.clear()
+            if index >= last:
+                break
+            index += 1
+    return strings
+
+
+def read_xlsx_schema(path: str, sample_rows: int = DEFAULT_SAMPLE_ROWS,
+                     max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[Dict[str, Any]]:
+    """
+    Lê os nomes das abas, o cabeçalho e uma amostra de linhas de cada aba de
+    um .xlsx, sem carregar a pasta de trabalho inteira.
+    """
+    with open_file(path) as f, zipfile.ZipFile(f) as archive:
+        sheets = []
+        paths = _xlsx_sheets(archive)
+        # O orçamento é dividido entre as abas
+        budget = max(max_bytes // max(len(paths), 1), 64 * 1024)
+        for name, sheet_path in paths:
+            try:
+                sheet = _read_sheet_rows(archive, sheet_path, sample_rows + 1, budget)
+            except KeyError:
+                continue
+            sheets.append((name, sheet))
+
+        wanted = {
+            value[1]
+            for _, sheet in sheets for row in sheet["rows"] for value in row.values()
+            if isinstance(value, tuple)
+        }
+        strings = _read_shared_strings(archive, wanted)
+
+    described = []
+    for name, sheet in sheets:
+        rows = [
+            [
+                strings.get(value[1], "") if isinstance(value, tuple) else value
+                for value in (row.get(index, "") for index in range(max(row, default=-1) + 1))
+            ]
+            for row in sheet["rows"]
+        ]
+        header, body = (rows[0], rows[1:]) if rows else ([], [])
+        described.append({
+            "name": name,
+            "columns": describe_columns(header, body) if header else [],
+            "row_count": max(sheet["row_count"] - 1, 0),
+            "row_count_exact": sheet["exact"],
+        })
+
+    return {"format": "xlsx", "sheets": described}
+
+
+def read_spreadsheet_schema(path: str, filename: str, sample_rows: int = DEFAULT_SAMPLE_ROWS,
+                            max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[Dict[str, Any]]:
+    """
+    Extrai o esquema de uma planilha (abas, colunas, tipos inferidos e
+    estimativa de linhas) lendo apenas o início de cada aba.
+
+    Args:
+        path: Caminho do arquivo
+        filename: Nome original (a extensão define o formato)
+        sample_rows: Número de linhas usadas na inferência de tipos
+        max_bytes: Bytes máximos lidos (descompactados, no caso de .xlsx)
+
+    Returns:
+        Dicionário com o esquema, incluindo "columns" (nomes de todas as
+        colunas, em minúsculas, para busca), ou None se o formato não é
+        suportado ou o arquivo não pôde ser lido
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    try:
+        if ext in (".csv", ".tsv"):
+            schema = read_csv_schema(path, ext, sample_rows, max_bytes)
+        elif ext in (".xlsx", ".xlsm"):
+            schema = read_xlsx_schema(path, sample_rows, max_bytes)
+        else:
+            return None
+    except (OSError, ValueError, KeyError, csv.Error, zipfile.BadZipFile, ET.ParseError):
+        logger.warning(f"Não foi possível ler o esquema da planilha {path}", exc_info=True)
+        return None
+
+    if not schema or not schema["sheets"]:
+        return None
+
+    names = []
+    for sheet in schema["sheets"]:
+        for column in sheet["columns"]:
+            name = column["name"].lower()
+            if name not in names:
+                names.append(name)
+    schema["columns"] = names
+    schema["row_count"] = sum(sheet["row_count"] for sheet in schema["sheets"])
+    return schema
+
+
+def column_tags(schema: Optional[Dict[str, Any]], limit: int = 5) -> List[str]:
+    """
+    Sugere tags a partir dos nomes de colunas: só nomes que parecem palavras
+    (sem números, nomes genéricos ou muito curtos).
+    """
+    if not schema:
+        return []
+    tags = []
+    for name in schema.get("columns", []):
+        if len(tags) >= limit:
+            break
+        if re.fullmatch(r"[^\W\d_]{3,30}", name) and not name.startswith("column"):
+            tags.append(name)
+    return tags
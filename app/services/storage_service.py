@@ -1,3 +1,4 @@
+import io
 import os
 import uuid
 import shutil
@@ -6,6 +7,41 @@ from werkzeug.utils import secure_filename
 from flask import current_app
 from datetime import datetime
 
+from app.core.metrics import record_storage
+
+
+class _CountingFileIO(io.FileIO):
+    """Arquivo que contabiliza os bytes lidos na métrica storage_bytes_total"""
+
+    def readinto(self, buffer):
+        size = super().readinto(buffer)
+        if size:
+            record_storage("read", size)
+        return size
+
+    def readall(self):
+        data = super().readall()
+        record_storage("read", len(data))
+        return data
+
+
+def open_file(file_path: str, mode: str = "rb", encoding: Optional[str] = None,
+              errors: Optional[str] = None):
+    """
+    Abre um arquivo armazenado para leitura, como open(), contabilizando os
+    bytes efetivamente lidos do disco.
+
+    Args:
+        file_path: Caminho do arquivo
+        mode: "rb" (binário) ou "r" (texto)
+        encoding: Codificação do modo texto
+        errors: Tratamento de erros de decodificação do modo texto
+    """
+    stream = io.BufferedReader(_CountingFileIO(file_path, "r"))
+    if "b" in mode:
+        return stream
+    return io.TextIOWrapper(stream, encoding=encoding, errors=errors)
+
 def get_storage_path() -> str:
     """
     Retorna o caminho base do armazenamento de arquivos.
@@ -79,6 +115,7 @@ def save_file(file_obj, filename: Optional[str] = None) -> Tuple[str, str]:
     
     # Salva o arquivo
     file_obj.save(file_path)
+    record_storage("write", os.path.getsize(file_path))
     
     return file_path, stored_filename
 
@@ -1,12 +1,79 @@
 import os 
 import json 
+import time
+from typing import Dict, Iterable, List
 from flask import current_app
-from werkzeug.utils import Tag
+from sqlalchemy import func, select
 import re
 
-from app.db.database import db
+from app.core.cache import TTLCache
+from app.db.database import db, insert_ignore
 from app.db.models.tag import Tag
+from app.db.models.file import File, file_tags
+from app.db.models.file_content import FileContent
+from app.services.autocomplete_service import record_tag_change
+from app.services.usage_service import add_usage
+from app.services.cooccurrence_service import (
+    record_tags_added, record_tags_removed, record_bulk_change, forget_tag_cooccurrences
+)
+from app.services.version_service import bump_versions, get_versions, touch_files, TAGS_SCOPE, TAG_STATS_SCOPE
 from app.services.vision_service import analyze_images
+from app.services.media_service import media_tags as header_media_tags
+from app.services.spreadsheet_service import column_tags
+from app.services.archive_service import archive_tags
+from app.services.tagger_service import register_tagger, rank_tags, run_taggers
+
+# Cache nome -> ID das tags já resolvidas neste processo. Renomear, excluir
+# ou fundir tags em qualquer processo incrementa a versão de TAGS_SCOPE no
+# commit; a versão é conferida no máximo a cada TAG_CACHE_VERSION_CHECK_SECONDS
+# (e não a cada chamada), e o cache é descartado quando ela muda
+_tag_id_cache = None
+_tag_cache_version = None
+_tag_cache_checked_at = 0.0
+
+def get_tag_id_cache():
+    """
+    Retorna o cache nome -> ID de tags, criando-o com os limites configurados.
+    """
+    global _tag_id_cache, _tag_cache_version, _tag_cache_checked_at
+    if _tag_id_cache is None:
+        _tag_id_cache = TTLCache(
+            maxsize=current_app.config.get("TAG_CACHE_SIZE", 10000),
+            ttl=current_app.config.get("TAG_CACHE_TTL_SECONDS", 300),
+            name="tag_ids",
+        )
+        # Versão desconhecida: a primeira conferência descarta o que houver
+        _tag_cache_version = None
+        _tag_cache_checked_at = time.monotonic()
+    return _tag_id_cache
+
+def _check_tag_cache_version(cache):
+    """
+    Descarta o cache se a versão de TAGS_SCOPE mudou desde a última
+    conferência. Só consulta o banco se a conferência estiver vencida.
+    """
+    global _tag_cache_version, _tag_cache_checked_at
+    now = time.monotonic()
+    if now - _tag_cache_checked_at < current_app.config.get("TAG_CACHE_VERSION_CHECK_SECONDS", 5):
+        return
+    version = get_versions([TAGS_SCOPE])[TAGS_SCOPE]
+    if version != _tag_cache_version:
+        cache.clear()
+    _tag_cache_version, _tag_cache_checked_at = version, now
+
+def forget_tag(name):
+    """
+    Descarta do cache deste processo o ID de uma tag (usado ao renomear ou
+    excluir tags). Os demais processos descartam os seus na próxima
+    conferência da versão de TAGS_SCOPE.
+    """
+    get_tag_id_cache().pop(normalize_tag_name(name))
+
+def normalize_tag_name(name):
+    """
+    Normaliza o nome de uma tag (lowercase, sem espaços extras).
+    """
+    return name.strip().lower()
 
 def find_or_create_tag(name, description=None, auto_generated=False):
     """
@@ -22,7 +89,7 @@ def find_or_create_tag(name, description=None, auto_generated=False):
     """
 
     # Normalizar o nome da tag (lowercase, sem espaços extras)
-    normalized_name = name.strip().lower()
+    normalized_name = normalize_tag_name(name)
 
     # Encontrar tag existente
     tag = Tag.query.filter_by(name=normalized_name).first()
@@ -36,145 +103,453 @@ def find_or_create_tag(name, description=None, auto_generated=False):
         )
         db.session.add(tag)
         db.session.flush() # Obter ID sem fazer commit
+        bump_versions(TAG_STATS_SCOPE)
 
     return tag
 
-def generated_tags_for_file(file_obj):
+def resolve_tags(names: Iterable[str], auto_generated: bool = False) -> Dict[str, int]:
     """
-    Gera tag automaticamente para um arquivo com base em seu conteúdo.
-    
+    Resolve vários nomes de tags para seus IDs de uma só vez, criando as
+    tags que ainda não existem.
+
+    Nomes já conhecidos vêm do cache em memória (ver
+    _check_tag_cache_version); os demais são inseridos com um único
+    INSERT ... ON CONFLICT DO NOTHING RETURNING, e as tags criadas nesse
+    meio-tempo por outra requisição são buscadas em seguida. Assim não há
+    conflito de unicidade quando dois uploads criam a mesma tag.
+
     Args:
-        file_obj: Objeto File do banco de dados 
-    
+        names: Nomes das tags
+        auto_generated: Se as tags criadas foram geradas automaticamente
+
     Returns:
-        list: Lista de nomes de tags gerados
+        Dicionário nome normalizado -> ID, na ordem dos nomes recebidos
     """
+    cache = get_tag_id_cache()
+
+    normalized = []
+    for name in names:
+        if not isinstance(name, str):
+            continue
+        name = normalize_tag_name(name)
+        if name and len(name) <= 100 and name not in normalized:
+            normalized.append(name)
+
+    if not normalized:
+        return {}
+    if any(cache.get(name) is not None for name in normalized):
+        _check_tag_cache_version(cache)
+
+    resolved = {}
+    missing = []
+    for name in normalized:
+        tag_id = cache.get(name)
+        if tag_id is None:
+            missing.append(name)
+        else:
+            resolved[name] = tag_id
+
+    if missing:
+        stmt = insert_ignore(Tag.__table__)
+        if stmt is None:
+            # Banco sem ON CONFLICT: criar uma a uma
+            for name in missing:
+                resolved[name] = find_or_create_tag(name, auto_generated=auto_generated).id
+        else:
+            rows = db.session.execute(
+                stmt.returning(Tag.id, Tag.name),
+                [{"name": name, "auto_generated": auto_generated} for name in missing],
+            ).all()
+            for tag_id, name in rows:
+                resolved[name] = tag_id
+                record_tag_change(db.session, "add", tag_id, name, 0)
+            if rows:
+                bump_versions(TAG_STATS_SCOPE)
+
+            # Tags que já existiam (ou foram criadas por outra transação)
+            existing = [name for name in missing if name not in resolved]
+            if existing:
+                rows = db.session.execute(
+                    select(Tag.id, Tag.name).where(Tag.name.in_(existing))
+                ).all()
+                for tag_id, name in rows:
+                    resolved[name] = tag_id
+
+        for name in missing:
+            if name in resolved:
+                cache.set(name, resolved[name])
+
+    return {name: resolved[name] for name in normalized if name in resolved}
+
+def attach_tags(file_id: int, tag_ids: Iterable[int]) -> List[int]:
+    """
+    Associa tags a um arquivo, ignorando as que já estão associadas, e
+    incrementa a contagem de uso apenas das tags efetivamente adicionadas.
 
-    tags = []
-
-    # Adicionar uma tag para o tipo de arquivo
-    tags.append(file_obj.file_type)
-
-    # Adicionar tag para a extensão do arquivo
-    _, ext = os.path.splitext(file_obj.original_filename)
-    if ext: 
-        tags.append(ext.lower().lstrip("."))
-
-    # Gerar tags específicas com base no tipo de arquivo
-    if file_obj.file_type == "images":
-        # Usar o serviço de visão para imagens
-        image_tags = analyze_images(file_obj.file_path)
-        tags.extend(image_tags)
-
-    elif file_obj.file_type == "documents":
-        # Para documentos, usar o nome do arquivo (sem extensão) como fonte de tags
-        name_without_ext = os.path.splitext(file_obj.original_filename)[0]
-        # Extrair palavras do nome do arquivo
-        words = re.findall(r"\w+", name_without_ext.lower())
-        tags.extend([word for word in words if len(word) > 2])
-
-    elif file_obj.file_type == "spreadsheets":
-        # Para planilhas, adicionar tags relacionadas a dados e análise
-        tags.extend(["data", "spreadsheet"])
-
-        # Extrair nome das abas ou colunas como tags, se possível
-        # Isso exigiria uma bibilioteca para ler arquivos Excel/CSV como pandas ou openpyxl
-        name_without_ext = os.path.splitext(file_obj.original_filename)[0]
-
-        # Extrair palavras do nome do arquivo
-        words = re.findall(r"/w+", name_without_ext.lower())
-        tags.extend([word for word in words if len(word) > 2])
-
-        # Adicionar tags comuns para planilhas com base nas extensões
-        _, ext = os.path.splitext(file_obj.original_filename)
-        if ext.lower() == ".xlsx" or ext.lower() == ".xls":
-            tags.append("excel")
-        elif ext.lower() == ".":
-            tags.append("csv")
-        elif ext.lower() == ".ods":
-            tags.append("openoffice")
-    
-    elif file_obj.file_type == "videos":
-        # para videos, adicionar tags básicas relacionadas a conteúdo audiovisual
-        tags.extend(["video", "multimedia"])
-
-        # Extrair informações do nome do arquivo
-        name_without_ext = os.path.splitext(file_obj.original_filename)[0]
-        words = re.findall(r"\w+", name_without_ext.lower())
-        tags.extend([word for word in words if len(word) > 2])
-
-        # Adicionar tags baseadas na extensão do arquivo
-        _, ext = os.path.splitext(file_obj.original_filename)
-        if ext.lower() in [".mp4", ".mov", ".avi", ".mvk"]:
-            tags.append(ext.lower().lstrip("."))
-
-        # Adicionar tags baseadas na resolução ou duração (se tivesse uma biblioteca para extrair metadados)
-        # Exemplo potencial:
-        # video_metadata = extract_video_metadata(file_obj.file_path)
-        # if video_metadata.get("resolution") == "1920x1080":
-        #     tags.append("hd")
-        # if video_metadata.get("duration", 0) > 600:  # Se duração > 10 minutos
-        #     tags.append("longform")
-
-    elif file_obj.file_type == "audio":
-        # Para arquivos de música/áudio, adicionar tags básicas
-        tags.extends(["audio", "sound"])
-
-        # Extrair informações do nome do arquivo
-        name_without_ext = os.path.splitext(file_obj.original_filename)[0]
-        words = re.findall(r"\w+", name_without_ext.lower())
-        tags.extend([word for word in words if len(word) > 2])
-
-        # Adicionar tags baseadas na extensão do arquivo
-        _, ext = os.path.splitext(file_obj.original_filename)
-        if ext.lower() in [".mp3", ".wav", ".flac", ".ogg", ".m4a"]:
-            tags.append(ext.lower().lstrip("."))
-        
-        # Caso tivéssemos uma biblioteca para extrair metadados de áudio, poderíamos adicionar:
-        # audio_metadata = extract_audio_metadata(file_obj.file_path)
-        # if audio_metadata.get("artist"):
-        #     tags.append(audio_metadata.get("artist").lower())
-        # if audio_metadata.get("genre"):
-        #     tags.append(audio_metadata.get("genre").lower())
-
-    elif file_obj.file_type == "code":
-        # Para código, adicionar a linguagem como tag
-        ext = os.path.splitext(file_obj.original_filename)[1].lower().lstrip(".")
-        language_map = {
-                    'py': 'python',
-            'js': 'javascript',
-            'ts': 'typescript',
-            'html': 'html',
-            'css': 'css',
-            'java': 'java',
-            'cpp': 'c++',
-            'c': 'c',
-            'cs': 'csharp',
-            'go': 'golang',
-            'rb': 'ruby',
-            'php': 'php',
-            'swift': 'swift',
-            'json': 'json',
-            'xml': 'xml',
-        }
-        if ext in language_map:
-            tags.append(language_map[ext])
-
-    # Verificar se há metadados com tags
-    if file_obj.metadata and "tags" in file_obj.metadata:
-        user_tags = file_obj.metadata["tags"]
-        if isinstance(user_tags, list):
-            tags.extend(user_tags)
+    Args:
+        file_id: ID do arquivo
+        tag_ids: IDs das tags
 
-    # Limitar número de tags
-    max_tags = current_app.config.get("MAX_TAGS_PER_FILE", 10)
-    unique_tags = list(set(tags)) # Remover duplicatas
+    Returns:
+        Lista de IDs das tags adicionadas
+    """
+    tag_ids = list(dict.fromkeys(tag_ids))
+    if not tag_ids:
+        return []
+
+    rows = [{"file_id": file_id, "tag_id": tag_id} for tag_id in tag_ids]
+    stmt = insert_ignore(file_tags)
+    if stmt is None:
+        current = set(db.session.execute(
+            select(file_tags.c.tag_id).where(file_tags.c.file_id == file_id)
+        ).scalars())
+        added = [tag_id for tag_id in tag_ids if tag_id not in current]
+        if added:
+            db.session.execute(file_tags.insert(), [r for r in rows if r["tag_id"] in added])
+    else:
+        added = list(db.session.execute(stmt.returning(file_tags.c.tag_id), rows).scalars())
+
+    # A contagem é gravada no commit, com incremento atômico
+    add_usage(added, 1)
+    record_tags_added(file_id, added)
+
+    return added
+
+def detach_tags(file_id: int, tag_ids: Iterable[int] = None) -> List[int]:
+    """
+    Remove tags de um arquivo (todas, se `tag_ids` não for informado) e
+    decrementa a contagem de uso das tags efetivamente removidas.
 
-    return unique_tags[:max_tags]
+    Args:
+        file_id: ID do arquivo
+        tag_ids: IDs das tags a remover
 
+    Returns:
+        Lista de IDs das tags removidas
+    """
+    stmt = file_tags.delete().where(file_tags.c.file_id == file_id)
+    if tag_ids is not None:
+        tag_ids = list(tag_ids)
+        if not tag_ids:
+            return []
+        stmt = stmt.where(file_tags.c.tag_id.in_(tag_ids))
+
+    if db.session.get_bind().dialect.delete_returning:
+        removed = list(db.session.execute(stmt.returning(file_tags.c.tag_id)).scalars())
+    else:
+        query = select(file_tags.c.tag_id).where(file_tags.c.file_id == file_id)
+        if tag_ids is not None:
+            query = query.where(file_tags.c.tag_id.in_(tag_ids))
+        removed = list(db.session.execute(query).scalars())
+        db.session.execute(stmt)
+
+    add_usage(removed, -1)
+    record_tags_removed(file_id, removed)
+
+    return removed
+
+def _record_bulk_change(changed, others, delta: int) -> Dict[int, int]:
+    """
+    Registra, antes da alteração em massa, as variações de uso, de
+    co-ocorrência e de versão dos projetos afetados.
 
+    Returns:
+        Dicionário ID da tag -> número de associações alteradas
+    """
+    changed_rows = changed.subquery("changed")
+    counts = dict(db.session.execute(
+        select(changed_rows.c.tag_id, func.count()).group_by(changed_rows.c.tag_id)
+    ).all())
+    if not counts:
+        return {}
+
+    for tag_id, count in counts.items():
+        add_usage([tag_id], delta * count)
+    record_bulk_change(changed, others, delta)
+
+    files = File.__table__
+    projects = db.session.execute(
+        select(files.c.project_id).where(files.c.id.in_(select(changed_rows.c.file_id))).distinct()
+    ).scalars()
+    for project_id in projects:
+        touch_files(project_id)
+
+    return counts
+
+def bulk_attach_tags(targets, tag_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Associa tags a todos os arquivos de uma consulta com um único
+    INSERT ... SELECT, sem carregar os arquivos na sessão. As contagens de
+    uso e as co-ocorrências são agregadas no banco a partir das associações
+    que ainda não existem.
 
-    
+    Args:
+        targets: Select com os IDs dos arquivos (coluna "id")
+        tag_ids: IDs das tags
 
+    Returns:
+        Dicionário ID da tag -> número de arquivos aos quais foi adicionada
+    """
+    tag_ids = list(dict.fromkeys(tag_ids))
+    if not tag_ids:
+        return {}
+
+    files = targets.subquery("targets")
+    tags = Tag.__table__
+    existing = file_tags.alias("existing")
+    changed = (
+        select(files.c.id.label("file_id"), tags.c.id.label("tag_id"))
+        .select_from(files.join(tags, tags.c.id.in_(tag_ids)))
+        .where(~select(existing.c.file_id).where(
+            existing.c.file_id == files.c.id, existing.c.tag_id == tags.c.id
+        ).exists())
+    )
+    others = select(file_tags.c.file_id, file_tags.c.tag_id).where(
+        file_tags.c.file_id.in_(select(files.c.id))
+    )
+
+    counts = _record_bulk_change(changed, others, 1)
+    if counts:
+        stmt = insert_ignore(file_tags)
+        if stmt is None:
+            stmt = file_tags.insert()
+        db.session.execute(stmt.from_select(["file_id", "tag_id"], changed))
+
+    return counts
+
+def bulk_detach_tags(targets, tag_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Remove tags de todos os arquivos de uma consulta com um único DELETE,
+    atualizando contagens de uso e co-ocorrências por agregação.
+
+    Args:
+        targets: Select com os IDs dos arquivos (coluna "id")
+        tag_ids: IDs das tags
+
+    Returns:
+        Dicionário ID da tag -> número de arquivos dos quais foi removida
+    """
+    tag_ids = list(dict.fromkeys(tag_ids))
+    if not tag_ids:
+        return {}
+
+    files = targets.subquery("targets")
+    condition = file_tags.c.file_id.in_(select(files.c.id))
+    changed = select(file_tags.c.file_id, file_tags.c.tag_id).where(
+        condition, file_tags.c.tag_id.in_(tag_ids)
+    )
+    others = select(file_tags.c.file_id, file_tags.c.tag_id).where(
+        condition, file_tags.c.tag_id.not_in(tag_ids)
+    )
+
+    counts = _record_bulk_change(changed, others, -1)
+    if counts:
+        db.session.execute(
+            file_tags.delete().where(condition, file_tags.c.tag_id.in_(tag_ids))
+        )
+
+    return counts
 
-        
\ No newline at end of file
+def _touch_tagged_projects(tag_id: int) -> None:
+    """Marca como alterados os projetos com arquivos associados a uma tag"""
+    files = File.__table__
+    projects = db.session.execute(
+        select(files.c.project_id)
+        .where(files.c.id.in_(select(file_tags.c.file_id).where(file_tags.c.tag_id == tag_id)))
+        .distinct()
+    ).scalars()
+    for project_id in projects:
+        touch_files(project_id)
+
+def remove_tag(tag: Tag) -> None:
+    """
+    Exclui uma tag e todas as suas associações com DELETEs diretos, sem
+    carregar os arquivos associados na sessão.
+
+    Args:
+        tag: Tag a excluir
+    """
+    tag_id, name = tag.id, tag.name
+    _touch_tagged_projects(tag_id)
+
+    forget_tag_cooccurrences(tag_id)
+    db.session.execute(file_tags.delete().where(file_tags.c.tag_id == tag_id))
+    db.session.expunge(tag)
+    db.session.execute(Tag.__table__.delete().where(Tag.__table__.c.id == tag_id))
+
+    forget_tag(name)
+    record_tag_change(db.session, "remove", tag_id)
+    bump_versions(TAGS_SCOPE)
+
+def merge_tags(source: Tag, target: Tag) -> int:
+    """
+    Funde uma tag em outra: os arquivos da tag de origem passam a ter a tag
+    de destino (sem duplicar associações), e a origem é excluída. Contagens
+    de uso e co-ocorrências são ajustadas na mesma transação.
+
+    Args:
+        source: Tag que deixará de existir
+        target: Tag que recebe as associações
+
+    Returns:
+        Número de arquivos que passaram a ter a tag de destino
+    """
+    if source.id == target.id:
+        return 0
+
+    files = select(file_tags.c.file_id.label("id")).where(file_tags.c.tag_id == source.id)
+    moved = bulk_attach_tags(files, [target.id]).get(target.id, 0)
+    bulk_detach_tags(files, [source.id])
+    remove_tag(source)
+
+    return moved
+
+# Extratores de tags embutidos. Cada um recebe o resumo do arquivo montado
+# em generate_tags_for_file; só o do Vision (bloqueante) roda em um pool de
+# tagger_service, os demais são chamados na própria requisição.
+
+LANGUAGE_MAP = {
+    'py': 'python',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'html': 'html',
+    'css': 'css',
+    'java': 'java',
+    'cpp': 'c++',
+    'c': 'c',
+    'cs': 'csharp',
+    'go': 'golang',
+    'rb': 'ruby',
+    'php': 'php',
+    'swift': 'swift',
+    'json': 'json',
+    'xml': 'xml',
+}
+
+def _extension(snapshot):
+    return os.path.splitext(snapshot["original_filename"])[1].lower().lstrip(".")
+
+@register_tagger("file_type", weight=2.0)
+def file_type_tags(snapshot):
+    """Tipo do arquivo e extensão"""
+    tags = [snapshot["file_type"]]
+    if _extension(snapshot):
+        tags.append(_extension(snapshot))
+    return tags
+
+@register_tagger("metadata", weight=3.0)
+def metadata_tags(snapshot):
+    """Tags informadas nos metadados do upload"""
+    metadata = snapshot.get("metadata")
+    if isinstance(metadata, dict) and isinstance(metadata.get("tags"), list):
+        return metadata["tags"]
+    return []
+
+@register_tagger("filename", categories=["documents", "spreadsheets", "videos", "audio"], weight=0.8)
+def filename_tags(snapshot):
+    """Palavras do nome do arquivo (sem extensão)"""
+    name_without_ext = os.path.splitext(snapshot["original_filename"])[0]
+    # "_" separa palavras em nomes como relatorio_final
+    words = re.findall(r"[^\W_]+", name_without_ext.lower())
+    return [word for word in words if len(word) > 2]
+
+@register_tagger("vision", categories=["images"], timeout=10.0, weight=1.5, blocking=True)
+def vision_tags(snapshot):
+    """Objetos, cenas e textos identificados pelo serviço de visão"""
+    return analyze_images(snapshot["file_path"])
+
+@register_tagger("document_keywords", categories=["documents"], weight=1.0)
+def document_keyword_tags(snapshot):
+    """Palavras-chave do texto extraído (ver extraction_service)"""
+    return snapshot.get("keywords") or []
+
+@register_tagger("spreadsheet", categories=["spreadsheets"], weight=1.0)
+def spreadsheet_tags(snapshot):
+    """Tags comuns para planilhas, pelo formato"""
+    tags = ["data", "spreadsheet"]
+    ext = _extension(snapshot)
+    if ext in ("xlsx", "xls", "xlsm"):
+        tags.append("excel")
+    elif ext in ("csv", "tsv"):
+        tags.append(ext)
+    elif ext == "ods":
+        tags.append("openoffice")
+
+    # Nomes de colunas lidos no upload (ver spreadsheet_service)
+    metadata = snapshot.get("metadata")
+    schema = metadata.get("spreadsheet") if isinstance(metadata, dict) else None
+    tags += column_tags(schema, current_app.config.get("SPREADSHEET_COLUMN_TAGS", 5))
+    return tags
+
+@register_tagger("video", categories=["videos"], weight=1.0)
+def video_tags(snapshot):
+    """Tags básicas de conteúdo audiovisual"""
+    return ["video", "multimedia"]
+
+@register_tagger("audio", categories=["audio"], weight=1.0)
+def audio_tags(snapshot):
+    """Tags básicas de áudio"""
+    return ["audio", "sound"]
+
+@register_tagger("media", categories=["images", "videos", "audio"], weight=1.2)
+def media_header_tags(snapshot):
+    """Resolução, duração, artista e câmera lidos dos cabeçalhos (ver media_service)"""
+    metadata = snapshot.get("metadata")
+    media = metadata.get("media") if isinstance(metadata, dict) else None
+    longform_seconds = current_app.config.get("MEDIA_LONGFORM_SECONDS", 600)
+    return header_media_tags(media, snapshot["file_type"], longform_seconds)
+
+@register_tagger("archive", categories=["archives"], weight=1.2)
+def archive_content_tags(snapshot):
+    """Tipos internos predominantes e alertas do manifesto (ver archive_service)"""
+    metadata = snapshot.get("metadata")
+    return archive_tags(metadata.get("archive") if isinstance(metadata, dict) else None)
+
+@register_tagger("code_language", categories=["code"], weight=1.5)
+def code_language_tags(snapshot):
+    """Linguagem de programação, pela extensão"""
+    language = LANGUAGE_MAP.get(_extension(snapshot))
+    return [language] if language else []
+
+def file_snapshot(file_obj):
+    """
+    Monta o resumo de um arquivo entregue aos extratores de tags. Contém só
+    valores simples, já que os extratores rodam em outras threads e não
+    devem acessar objetos da sessão da requisição.
+    """
+    keywords = []
+    if file_obj.id:
+        content = db.session.get(FileContent, file_obj.id)
+        if content and content.keywords:
+            keywords = list(content.keywords)
+
+    return {
+        "id": file_obj.id,
+        "original_filename": file_obj.original_filename,
+        "file_path": file_obj.file_path,
+        "file_type": file_obj.file_type,
+        "content_type": file_obj.content_type,
+        "metadata": file_obj.file_metadata,
+        "keywords": keywords,
+    }
+
+def generate_tags_for_file(file_obj):
+    """
+    Gera tag automaticamente para um arquivo com base em seu conteúdo.
+
+    Os extratores registrados para a categoria do arquivo rodam com
+    run_taggers: os bloqueantes (Vision) em paralelo, cada um com seu limite
+    de tempo; um extrator lento ou com erro é ignorado sem atrasar o
+    upload. As tags são ordenadas por relevância.
+    
+    Args:
+        file_obj: Objeto File do banco de dados 
+    
+    Returns:
+        list: Lista de nomes de tags gerados
+    """
+    results = run_taggers(file_snapshot(file_obj))
+
+    # Limitar número de tags
+    max_tags = current_app.config.get("MAX_TAGS_PER_FILE", 10)
+    return rank_tags(results, max_tags)
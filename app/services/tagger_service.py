@@ -0,0 +1,208 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from flask import current_app
+
+from app.core.metrics import TAGGER_FAILURES
+from app.db.database import db
+
+logger = logging.getLogger(__name__)
+
+
+class Tagger(NamedTuple):
+    """Extrator de tags registrado para uma ou mais categorias de arquivo."""
+    name: str
+    func: Callable[[Dict[str, Any]], Iterable[str]]
+    # Categorias atendidas (None = todas)
+    categories: Optional[frozenset]
+    # Tempo máximo de execução em segundos (None = TAGGER_DEFAULT_TIMEOUT)
+    timeout: Optional[float]
+    # Peso das tags do extrator na ordenação final
+    weight: float
+    # Espera E/S (rede, disco): roda em um pool próprio, com limite de tempo.
+    # Os demais são funções puras e rápidas, chamadas na própria requisição
+    blocking: bool = False
+
+
+# Extratores registrados, na ordem de registro
+_registry: Dict[str, Tagger] = {}
+
+# Um pool limitado por extrator bloqueante: uma fila de chamadas lentas ao
+# Vision não ocupa as threads de outro extrator
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executor_lock = Lock()
+
+
+def _reset_executor() -> None:
+    # As threads dos pools não existem no processo filho após um fork (ex.:
+    # workers do gunicorn com preload); os pools são recriados no primeiro uso
+    global _executors, _executor_lock
+    _executors = {}
+    _executor_lock = Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_executor)
+
+
+def register_tagger(name: str, categories: Optional[Iterable[str]] = None,
+                    timeout: Optional[float] = None, weight: float = 1.0, blocking: bool = False):
+    """
+    Decorador que registra uma função como extrator de tags.
+
+    A função recebe o resumo do arquivo (ver snapshot em generate_tags_for_file)
+    e retorna uma lista de tags, da mais para a menos relevante.
+
+    Args:
+        name: Nome único do extrator (também usado em TAGGER_TIMEOUTS)
+        categories: Categorias de arquivo atendidas (None = todas)
+        timeout: Tempo máximo de execução em segundos (só extratores bloqueantes)
+        weight: Peso das tags do extrator na ordenação final
+        blocking: Se o extrator espera E/S e deve rodar no seu próprio pool
+    """
+    def decorator(func):
+        _registry[name] = Tagger(
+            name, func, frozenset(categories) if categories is not None else None, timeout, weight, blocking
+        )
+        return func
+    return decorator
+
+
+def unregister_tagger(name: str) -> None:
+    """Remove um extrator do registro"""
+    _registry.pop(name, None)
+
+
+def taggers_for(category: str) -> List[Tagger]:
+    """
+    Retorna os extratores registrados para uma categoria de arquivo.
+    """
+    return [
+        tagger for tagger in _registry.values()
+        if tagger.categories is None or category in tagger.categories
+    ]
+
+
+def get_tagger_executor(name: str) -> ThreadPoolExecutor:
+    """
+    Retorna o pool de threads de um extrator bloqueante, com TAGGER_WORKERS
+    threads. É separado do pool de tarefas em segundo plano para que
+    extrações longas não atrasem os uploads.
+    """
+    with _executor_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            workers = current_app.config.get("TAGGER_WORKERS", 8)
+            executor = _executors[name] = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix=f"tagger-{name}"
+            )
+    return executor
+
+
+def rank_tags(results: Iterable[Tuple[Tagger, Iterable[str]]], limit: int) -> List[str]:
+    """
+    Junta as tags de vários extratores, ordenando pela soma dos pesos (tags
+    sugeridas por mais de um extrator sobem) e pela posição em cada lista.
+
+    Args:
+        results: Pares (extrator, tags retornadas)
+        limit: Número máximo de tags
+
+    Returns:
+        Lista de tags normalizadas, da mais para a menos relevante
+    """
+    scores: Dict[str, float] = {}
+    for tagger, tags in results:
+        position = 0
+        for tag in tags or []:
+            if not isinstance(tag, str):
+                continue
+            tag = tag.strip().lower()
+            if not tag:
+                continue
+            # Tags no início da lista de um extrator valem um pouco mais
+            scores[tag] = scores.get(tag, 0.0) + tagger.weight / (1 + 0.1 * position)
+            position += 1
+
+    # sorted é estável: empates mantêm a ordem de chegada
+    ranked = sorted(scores, key=lambda tag: -scores[tag])
+    return ranked[:limit]
+
+
+def run_taggers(snapshot: Dict[str, Any]) -> List[Tuple[Tagger, List[str]]]:
+    """
+    Executa os extratores da categoria do arquivo. Os bloqueantes rodam em
+    paralelo, cada um no seu pool e com seu limite de tempo, contado a partir
+    do início da execução (e não do envio ao pool); a espera na fila também
+    é limitada a esse tempo. Os demais rodam em seguida na própria thread.
+    Extratores que falham ou estouram o tempo são ignorados (e registrados
+    no log), sem interromper os demais.
+
+    Args:
+        snapshot: Resumo do arquivo
+
+    Returns:
+        Pares (extrator, tags) dos extratores concluídos a tempo, na ordem de registro
+    """
+    app = current_app._get_current_object()
+    config = app.config
+    default_timeout = config.get("TAGGER_DEFAULT_TIMEOUT", 2.0)
+    timeouts = config.get("TAGGER_TIMEOUTS", {}) or {}
+
+    def call(tagger, started):
+        started.append(time.monotonic())
+        with app.app_context():
+            try:
+                return list(tagger.func(snapshot) or [])
+            finally:
+                db.session.remove()
+
+    def failed(tagger, reason):
+        TAGGER_FAILURES.labels(tagger.name, reason).inc()
+        if reason == "timeout":
+            logger.warning(f"Extrator de tags {tagger.name} excedeu o tempo limite e foi ignorado")
+        else:
+            logger.exception(f"Erro no extrator de tags {tagger.name}")
+
+    taggers = taggers_for(snapshot["file_type"])
+    pending = []
+    for tagger in taggers:
+        if tagger.blocking:
+            timeout = timeouts.get(tagger.name, tagger.timeout)
+            if not isinstance(timeout, (int, float)):
+                timeout = default_timeout
+            started: List[float] = []
+            future = get_tagger_executor(tagger.name).submit(call, tagger, started)
+            pending.append((tagger, timeout, time.monotonic(), started, future))
+
+    results: Dict[str, List[str]] = {}
+    for tagger in taggers:
+        if not tagger.blocking:
+            try:
+                results[tagger.name] = list(tagger.func(snapshot) or [])
+            except Exception:
+                failed(tagger, "error")
+
+    def wait(timeout, submitted, started, future):
+        try:
+            return future.result(timeout=max(0.0, submitted + timeout - time.monotonic()))
+        except TimeoutError:
+            # Ainda na fila: desiste. Já em execução: o tempo conta do início
+            if future.cancel():
+                raise
+        began = started[0] if started else time.monotonic()
+        return future.result(timeout=max(0.0, began + timeout - time.monotonic()))
+
+    for tagger, timeout, submitted, started, future in pending:
+        try:
+            results[tagger.name] = wait(timeout, submitted, started, future)
+        except TimeoutError:
+            failed(tagger, "timeout")
+        except Exception:
+            failed(tagger, "error")
+
+    return [(tagger, results[tagger.name]) for tagger in taggers if tagger.name in results]
@@ -0,0 +1,81 @@
+import os
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Optional
+
+from flask import current_app
+
+from app.core.metrics import BACKGROUND_TASKS_QUEUED, BACKGROUND_TASKS_RUNNING
+from app.db.database import db
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = Lock()
+
+
+def _reset_executor() -> None:
+    # As threads do pool não existem no processo filho após um fork (ex.:
+    # workers do gunicorn com preload); o pool é recriado no primeiro uso
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_executor)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Retorna o pool de threads compartilhado para tarefas em segundo plano.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = current_app.config.get("BACKGROUND_WORKERS", 4)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="background")
+    return _executor
+
+
+def submit_task(func: Callable, *args, **kwargs) -> Future:
+    """
+    Agenda uma função para execução em segundo plano, dentro de um contexto
+    da aplicação e com uma sessão de banco de dados própria.
+
+    Args:
+        func: Função a executar
+        *args, **kwargs: Argumentos repassados para a função
+
+    Returns:
+        Future com o resultado da função
+    """
+    app = current_app._get_current_object()
+
+    def run():
+        BACKGROUND_TASKS_QUEUED.dec()
+        BACKGROUND_TASKS_RUNNING.inc()
+        with app.app_context():
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                logger.exception(f"Erro na tarefa em segundo plano {func.__name__}")
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+                BACKGROUND_TASKS_RUNNING.dec()
+
+    # Em testes, executar imediatamente para resultados determinísticos
+    if app.config.get("BACKGROUND_TASKS_EAGER", False):
+        future = Future()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    # Fila de espera visível na métrica background_tasks_queued
+    BACKGROUND_TASKS_QUEUED.inc()
+    return get_executor().submit(run)
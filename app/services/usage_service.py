@@ -0,0 +1,220 @@
+import os
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, func, select
+
+from app.db.database import db
+from app.db.models.tag import Tag
+from app.db.models.file import file_tags
+from app.services.autocomplete_service import record_tag_change, invalidate_tag_index
+from app.services.version_service import TAG_STATS_SCOPE, bump_versions
+
+logger = logging.getLogger(__name__)
+
+# Buffer de escrita tardia do processo (None quando desativado)
+_buffer = None
+
+
+def add_usage(tag_ids: Iterable[int], delta: int = 1, session=None) -> None:
+    """
+    Acumula uma variação na contagem de uso de tags. As variações de uma
+    requisição são gravadas juntas, com incrementos atômicos no banco, no
+    momento do commit.
+
+    Args:
+        tag_ids: IDs das tags
+        delta: Variação a aplicar em cada tag
+        session: Sessão do banco de dados (por padrão, db.session)
+    """
+    session = session or db.session
+    deltas = session.info.setdefault("tag_usage_deltas", Counter())
+    for tag_id in tag_ids:
+        deltas[tag_id] += delta
+
+
+def apply_usage_deltas(deltas: Dict[int, int], session=None) -> None:
+    """
+    Aplica variações de uso com um UPDATE atômico por valor de variação
+    (usage_count = usage_count + delta), sem ler as contagens antes.
+
+    Args:
+        deltas: Dicionário ID da tag -> variação
+        session: Sessão do banco de dados (por padrão, db.session)
+    """
+    session = session or db.session
+    by_delta = defaultdict(list)
+    for tag_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(tag_id)
+
+    tags = Tag.__table__
+    returning = session.get_bind().dialect.update_returning
+    for delta, tag_ids in by_delta.items():
+        stmt = (
+            tags.update()
+            .where(tags.c.id.in_(tag_ids))
+            .values(usage_count=func.coalesce(tags.c.usage_count, 0) + delta)
+        )
+        if returning:
+            # Manter o índice de autocomplete com as contagens novas
+            for tag_id, usage in session.execute(stmt.returning(tags.c.id, tags.c.usage_count)):
+                record_tag_change(session, "usage", tag_id, usage=usage)
+        else:
+            session.execute(stmt)
+
+    if by_delta:
+        # Invalidar as respostas condicionais das rotas de tags
+        bump_versions(TAG_STATS_SCOPE, session=session)
+
+
+def reconcile_usage_counts(session=None) -> int:
+    """
+    Recalcula a contagem de uso de todas as tags a partir da tabela de
+    associação, em um único UPDATE com subconsulta agregada. Corrige
+    desvios causados por falhas ou por variações perdidas do buffer.
+
+    Args:
+        session: Sessão do banco de dados (por padrão, db.session)
+
+    Returns:
+        Número de tags corrigidas
+    """
+    session = session or db.session
+
+    # Gravar antes as variações pendentes, para não contá-las duas vezes
+    if _buffer is not None:
+        _buffer.flush()
+
+    tags = Tag.__table__
+    actual = (
+        select(func.count())
+        .select_from(file_tags)
+        .where(file_tags.c.tag_id == tags.c.id)
+        .scalar_subquery()
+    )
+    result = session.execute(
+        tags.update()
+        .where(func.coalesce(tags.c.usage_count, -1) != actual)
+        .values(usage_count=actual)
+    )
+    if result.rowcount:
+        bump_versions(TAG_STATS_SCOPE, session=session)
+    session.commit()
+
+    # As contagens mudaram fora do índice de autocomplete; reconstruí-lo depois
+    invalidate_tag_index()
+
+    return result.rowcount
+
+
+class UsageBuffer:
+    """
+    Buffer de escrita tardia para tags muito movimentadas: as variações de
+    vários commits são somadas em memória e gravadas periodicamente, trocando
+    muitos UPDATEs na mesma linha por um só. Variações ainda não gravadas são
+    perdidas se o processo cair; a reconciliação corrige esses casos.
+    """
+
+    def __init__(self, app, interval: float = 5.0):
+        self.app = app
+        self.interval = interval
+        self._deltas = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, deltas: Dict[int, int]) -> None:
+        with self._lock:
+            self._deltas.update(deltas)
+
+    def __len__(self):
+        return len(self._deltas)
+
+    def flush(self) -> None:
+        """
+        Grava as variações acumuladas. Em caso de erro, elas voltam ao buffer.
+        """
+        with self._lock:
+            deltas, self._deltas = self._deltas, Counter()
+        if not deltas:
+            return
+
+        with self.app.app_context():
+            try:
+                apply_usage_deltas(deltas)
+                db.session.commit()
+            except Exception:
+                logger.exception("Erro ao gravar contagens de uso de tags")
+                db.session.rollback()
+                self.add(deltas)
+            finally:
+                db.session.remove()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="usage-buffer", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=self._restart_after_fork)
+
+    def _restart_after_fork(self) -> None:
+        # O processo filho não herda a thread de gravação; as variações
+        # pendentes pertencem ao pai e não devem ser gravadas duas vezes
+        self._deltas = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="usage-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.flush()
+
+
+def _before_commit(session):
+    deltas = session.info.pop("tag_usage_deltas", None)
+    if not deltas:
+        return
+    if _buffer is not None:
+        # Só vai para o buffer se o commit for concluído
+        session.info["tag_usage_buffered"] = deltas
+    else:
+        apply_usage_deltas(deltas, session)
+
+
+def _after_commit(session):
+    deltas = session.info.pop("tag_usage_buffered", None)
+    if deltas and _buffer is not None:
+        _buffer.add(deltas)
+
+
+def _after_rollback(session):
+    session.info.pop("tag_usage_deltas", None)
+    session.info.pop("tag_usage_buffered", None)
+
+
+def init_usage_counters(app):
+    """
+    Registra os eventos que gravam as variações de uso no commit e, se
+    configurado, inicia o buffer de escrita tardia.
+    """
+    global _buffer
+
+    session_class = db.session.session_factory.class_
+    if not event.contains(session_class, "before_commit", _before_commit):
+        event.listen(session_class, "before_commit", _before_commit)
+        event.listen(session_class, "after_commit", _after_commit)
+        event.listen(session_class, "after_rollback", _after_rollback)
+
+    if app.config.get("TAG_USAGE_WRITE_BEHIND") and _buffer is None:
+        _buffer = UsageBuffer(app, app.config.get("TAG_USAGE_FLUSH_SECONDS", 5))
+        _buffer.start()
@@ -0,0 +1,127 @@
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, func, literal, or_, select, union_all
+
+from app.db.database import db, upsert_insert
+from app.db.models.change_counter import ChangeCounter
+
+# Escopos de versão. A versão de FILES_SCOPE (todos os arquivos) é derivada:
+# a soma do próprio contador, usado só por alterações sem projeto, com os
+# contadores de todos os projetos
+FILES_SCOPE = "files"
+PROJECT_SCOPE_PREFIX = "files:project:"
+# Nomes das tags (renomear, excluir, fundir): afeta as listagens de arquivos
+TAGS_SCOPE = "tags"
+# Demais dados das tags (criação, contagens de uso, descrição): afeta só as
+# rotas de tags, para não invalidar as listagens de arquivos a cada upload
+TAG_STATS_SCOPE = "tags:stats"
+
+
+def project_scope(project_id: Optional[int]) -> str:
+    """
+    Retorna o escopo de versão dos arquivos de um projeto.
+    """
+    return f"{PROJECT_SCOPE_PREFIX}{project_id}"
+
+
+def files_scope(project_id: Optional[int] = None) -> str:
+    """
+    Retorna o escopo de versão de uma listagem de arquivos: o do projeto,
+    se filtrada por projeto, ou o de todos os arquivos.
+    """
+    return project_scope(project_id) if project_id else FILES_SCOPE
+
+
+def bump_versions(*scopes: str, session=None) -> None:
+    """
+    Marca escopos como alterados. Os contadores são incrementados uma única
+    vez por commit, na mesma transação das alterações.
+
+    Args:
+        *scopes: Escopos alterados
+        session: Sessão do banco de dados (por padrão, db.session)
+    """
+    session = session or db.session
+    session.info.setdefault("version_bumps", set()).update(scopes)
+
+
+def touch_files(project_id: Optional[int] = None, session=None) -> None:
+    """
+    Marca os arquivos do projeto como alterados (ou os arquivos em geral,
+    sem projeto). Só o contador do projeto é incrementado: uploads
+    simultâneos de projetos diferentes não disputam a mesma linha, e a
+    versão de FILES_SCOPE muda junto, por ser derivada dos projetos.
+    """
+    bump_versions(project_scope(project_id) if project_id is not None else FILES_SCOPE, session=session)
+
+
+def get_versions(scopes: Iterable[str]) -> Dict[str, int]:
+    """
+    Retorna a versão atual de cada escopo (0 se nunca foi alterado).
+
+    A de FILES_SCOPE é a soma dos contadores de arquivos (o geral e os de
+    cada projeto): cresce a cada alteração em qualquer projeto, sem que os
+    commits precisem incrementar uma linha global. Tudo em uma consulta.
+    """
+    scopes = list(scopes)
+    # Consulta Core: roda a cada requisição condicional, sem passar pelo ORM
+    table = ChangeCounter.__table__
+    queries = []
+    exact = [scope for scope in scopes if scope != FILES_SCOPE]
+    if exact:
+        queries.append(select(table.c.scope, table.c.version).where(table.c.scope.in_(exact)))
+    if FILES_SCOPE in scopes:
+        queries.append(
+            select(literal(FILES_SCOPE).label("scope"), func.sum(table.c.version).label("version"))
+            .where(or_(table.c.scope == FILES_SCOPE, table.c.scope.startswith(PROJECT_SCOPE_PREFIX)))
+        )
+    if not queries:
+        return {}
+
+    statement = queries[0] if len(queries) == 1 else union_all(*queries)
+    versions = dict.fromkeys(scopes, 0)
+    versions.update((scope, version) for scope, version in db.session.execute(statement).all() if version is not None)
+    return versions
+
+
+def _increment(session, scopes):
+    table = ChangeCounter.__table__
+    stmt = upsert_insert(table)
+    rows = [{"scope": scope, "version": 1} for scope in sorted(scopes)]
+    if stmt is not None:
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["scope"],
+                set_={"version": table.c.version + 1},
+            ),
+            rows,
+        )
+        return
+
+    # Bancos sem upsert: atualizar e criar os que faltarem
+    for row in rows:
+        result = session.execute(
+            table.update().where(table.c.scope == row["scope"]).values(version=table.c.version + 1)
+        )
+        if not result.rowcount:
+            session.execute(table.insert(), row)
+
+
+def _before_commit(session):
+    scopes = session.info.pop("version_bumps", None)
+    if scopes:
+        _increment(session, scopes)
+
+
+def _after_rollback(session):
+    session.info.pop("version_bumps", None)
+
+
+def init_change_counters(app):
+    """
+    Registra o evento que grava os contadores de versão no commit.
+    """
+    session_class = db.session.session_factory.class_
+    if not event.contains(session_class, "before_commit", _before_commit):
+        event.listen(session_class, "before_commit", _before_commit)
+        event.listen(session_class, "after_rollback", _after_rollback)
@@ -3,8 +3,10 @@ import logging
 from typing import List, Dict, Any, Optional
 from flask import current_app
 
-from google.cloud import vision
 import io
+import time
+
+from app.core.metrics import VISION_ERRORS, VISION_REQUEST_DURATION
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,10 @@ def analyze_images(image_path: str) -> List[str]:
         return ["images"]
     
     try:
+        # Importado só no primeiro uso: a biblioteca é pesada e desnecessária
+        # quando as credenciais não estão configuradas
+        from google.cloud import vision
+
         # Inicializar o cliente Vision
         client = vision.ImageAnnotatorClient()
         
@@ -50,7 +56,11 @@ def analyze_images(image_path: str) -> List[str]:
             features=features,
         )
         
-        response = client.annotate_image(request=request)
+        started = time.perf_counter()
+        try:
+            response = client.annotate_image(request=request)
+        finally:
+            VISION_REQUEST_DURATION.observe(time.perf_counter() - started)
         
         # Extrair as tags dos rótulos
         tags = []
@@ -67,6 +77,7 @@ def analyze_images(image_path: str) -> List[str]:
         return list(set(tags))
         
     except Exception as e:
+        VISION_ERRORS.inc()
         current_app.logger.error(f"Error analyzing image: {str(e)}")
         # Em caso de erro, retornar uma tag básica
         return ['images']
\ No newline at end of file
@@ -0,0 +1,11 @@
+"""
+Ponto de entrada WSGI para servidores de produção (ver gunicorn.conf.py).
+"""
+import os
+
+from app.main import create_app
+
+app = create_app()
+
+# Criar diretório de armazenamento se não existir
+os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
@@ -0,0 +1,3 @@
+"""
+Benchmarks de desempenho com corpora sintéticos (ver benchmarks/run.py).
+"""
@@ -0,0 +1,73 @@
+"""
+Compara dois resultados de benchmarks/run.py (ex.: antes e depois de uma
+mudança) e aponta regressões:
+
+    python -m benchmarks.compare base.json novo.json --threshold 10
+
+Sai com código 1 se algum cenário ficar mais lento que o limite (em %) na
+mediana ou no p95.
+"""
+import sys
+import json
+import argparse
+from typing import Any, Dict, List, Tuple
+
+METRICS = ("p50_ms", "p95_ms", "mean_ms")
+# Métricas que decidem se houve regressão
+GATED_METRICS = ("p50_ms", "p95_ms")
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> Tuple[List[List[str]], List[str]]:
+    """
+    Returns:
+        Linhas da tabela (cenário, métrica, base, novo, variação) e a lista de
+        regressões acima do limite
+    """
+    rows, regressions = [], []
+    for name, before in base.get("scenarios", {}).items():
+        after = new.get("scenarios", {}).get(name)
+        if after is None:
+            continue
+        for metric in METRICS:
+            old, current = before.get(metric), after.get(metric)
+            if not old or current is None:
+                continue
+            change = (current - old) / old * 100
+            rows.append([name, metric, f"{old:.3f}", f"{current:.3f}", f"{change:+.1f}%"])
+            if metric in GATED_METRICS and change > threshold:
+                regressions.append(f"{name} {metric}: {old:.3f} -> {current:.3f} ms ({change:+.1f}%)")
+    return rows, regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compara dois resultados de benchmark")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regressão tolerada (%%)")
+    args = parser.parse_args(argv)
+
+    base, new = load(args.base), load(args.new)
+    if base.get("params", {}).get("files") != new.get("params", {}).get("files"):
+        print("Aviso: os corpora têm tamanhos diferentes.", file=sys.stderr)
+
+    rows, regressions = compare(base, new, args.threshold)
+    header = ["cenário", "métrica", "base", "novo", "variação"]
+    widths = [max(len(str(row[i])) for row in rows + [header]) for i in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
+
+    if regressions:
+        print("\nRegressões acima de {:.0f}%:".format(args.threshold))
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
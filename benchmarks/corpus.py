@@ -0,0 +1,209 @@
+"""
+Geração de corpora sintéticos reprodutíveis: arquivos com distribuição de
+tipos e tamanhos realista, tags com popularidade em lei de potência (poucas
+tags muito usadas, cauda longa de tags raras) e conteúdos de upload de
+tamanhos variados. A mesma semente gera sempre o mesmo corpus.
+"""
+import io
+import csv
+import math
+import random
+import struct
+import zipfile
+import zlib
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import bindparam
+
+from app.db.models.file import File, file_tags
+from app.db.models.tag import Tag
+
+# Categoria -> (participação no corpus, extensões, tipo MIME, mediana e
+# dispersão do tamanho em bytes na distribuição log-normal)
+FILE_TYPES = {
+    "images": (0.35, [".jpg", ".png", ".gif"], "image/jpeg", 400_000, 1.0),
+    "documents": (0.25, [".pdf", ".docx", ".txt", ".md"], "application/pdf", 150_000, 1.2),
+    "spreadsheets": (0.10, [".xlsx", ".csv"], "text/csv", 80_000, 1.3),
+    "code": (0.10, [".py", ".js", ".json"], "text/plain", 8_000, 1.0),
+    "videos": (0.05, [".mp4", ".mov"], "video/mp4", 40_000_000, 1.1),
+    "audio": (0.05, [".mp3", ".flac"], "audio/mpeg", 5_000_000, 0.8),
+    "archives": (0.05, [".zip", ".tar"], "application/zip", 3_000_000, 1.5),
+    "outros": (0.05, [".bin", ".dat"], "application/octet-stream", 50_000, 1.5),
+}
+
+# Número de tags por arquivo e sua frequência
+TAGS_PER_FILE = [1, 2, 3, 4, 5, 6, 8]
+TAGS_PER_FILE_WEIGHTS = [10, 20, 25, 20, 12, 8, 5]
+
+SYLLABLES = [
+    "ka", "lo", "mi", "ne", "ra", "su", "to", "vi", "da", "fe", "gu", "ho", "ja", "be",
+    "co", "pi", "ta", "ze", "mar", "sol", "ver", "lin", "por", "tra", "cas", "dor",
+]
+
+INSERT_BATCH_SIZE = 5000
+
+
+def zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """Pesos cumulativos de uma distribuição de Zipf sobre `count` itens"""
+    return list(accumulate(1.0 / (rank + 1) ** exponent for rank in range(count)))
+
+
+def tag_names(count: int, rng: random.Random) -> List[str]:
+    """Nomes de tags únicos e pronunciáveis (bons para testar o autocomplete)"""
+    names = set()
+    while len(names) < count:
+        size = rng.choice((2, 2, 3, 3, 4))
+        names.add("".join(rng.choice(SYLLABLES) for _ in range(size)))
+    return sorted(names)
+
+
+def _file_row(file_id: int, rng: random.Random, now: datetime, projects: int, uploaders: int) -> Dict[str, Any]:
+    categories = list(FILE_TYPES)
+    weights = [FILE_TYPES[category][0] for category in categories]
+    category = rng.choices(categories, weights)[0]
+    _, extensions, content_type, median, sigma = FILE_TYPES[category]
+    ext = rng.choice(extensions)
+    created_at = now - timedelta(seconds=rng.randint(0, 2 * 365 * 24 * 3600))
+    return {
+        "id": file_id,
+        "filename": f"{file_id:08x}{ext}",
+        "original_filename": f"file-{file_id}{ext}",
+        "file_path": f"/benchmark/{file_id:08x}{ext}",
+        "file_type": category,
+        "file_size": max(1, int(rng.lognormvariate(math.log(median), sigma))),
+        "content_type": content_type,
+        "metadata": {"client": f"client-{rng.randint(1, 200)}", "amount": rng.randint(1, 10_000)},
+        "uploader_id": rng.randint(1, uploaders),
+        "project_id": rng.randint(1, projects),
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def generate_corpus(connection, files: int, tags: int, seed: int = 42,
+                    projects: int = 50, uploaders: int = 200) -> Dict[str, Any]:
+    """
+    Grava um corpus sintético no banco, em lotes (INSERT com executemany).
+
+    Args:
+        connection: Conexão com o banco (com transação aberta)
+        files: Número de arquivos
+        tags: Número de tags distintas
+        seed: Semente do gerador (mesma semente = mesmo corpus)
+        projects: Número de projetos entre os quais os arquivos se dividem
+        uploaders: Número de usuários que enviaram os arquivos
+
+    Returns:
+        Resumo: arquivos, tags, associações e os nomes das tags por popularidade
+    """
+    rng = random.Random(seed)
+    names = tag_names(tags, rng)
+    # A popularidade não segue a ordem alfabética
+    popularity = names[:]
+    rng.shuffle(popularity)
+    cumulative = zipf_weights(tags)
+    total_weight = cumulative[-1]
+
+    connection.execute(Tag.__table__.insert(), [
+        {"id": tag_id, "name": name, "auto_generated": tag_id % 3 == 0, "usage_count": 0}
+        for tag_id, name in enumerate(popularity, start=1)
+    ])
+
+    now = datetime.utcnow()
+    usage: Counter = Counter()
+    associations = 0
+    for start in range(1, files + 1, INSERT_BATCH_SIZE):
+        rows, links = [], []
+        for file_id in range(start, min(start + INSERT_BATCH_SIZE, files + 1)):
+            rows.append(_file_row(file_id, rng, now, projects, uploaders))
+            count = rng.choices(TAGS_PER_FILE, TAGS_PER_FILE_WEIGHTS)[0]
+            chosen = {bisect_left(cumulative, rng.random() * total_weight) + 1 for _ in range(count)}
+            links.extend({"file_id": file_id, "tag_id": tag_id} for tag_id in chosen)
+            usage.update(chosen)
+        connection.execute(File.__table__.insert(), rows)
+        connection.execute(file_tags.insert(), links)
+        associations += len(links)
+
+    table = Tag.__table__
+    connection.execute(
+        table.update().where(table.c.id == bindparam("tag_id")).values(usage_count=bindparam("count")),
+        [{"tag_id": tag_id, "count": count} for tag_id, count in usage.items()],
+    )
+    return {"files": files, "tags": tags, "associations": associations, "tags_by_popularity": popularity}
+
+
+def _png(rng: random.Random, size: int) -> bytes:
+    width = height = max(1, int(math.sqrt(size / 3)))
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    raw = b"".join(b"\x00" + rng.randbytes(width * 3) for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 1))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _csv(rng: random.Random, size: int) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id", "cliente", "valor", "data"])
+    row = 0
+    while buffer.tell() < size:
+        row += 1
+        writer.writerow([row, f"cliente-{rng.randint(1, 500)}", f"{rng.uniform(1, 9999):.2f}", "2026-10-19"])
+    return buffer.getvalue().encode("utf-8")
+
+
+def _text(rng: random.Random, size: int) -> bytes:
+    words = []
+    length = 0
+    while length < size:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4)))
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words).encode("utf-8")
+
+
+def _zip(rng: random.Random, size: int) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        written = 0
+        index = 0
+        while written < size:
+            chunk = rng.randbytes(min(64_000, size - written) or 1)
+            archive.writestr(f"dados/parte-{index}.bin", chunk)
+            written += len(chunk)
+            index += 1
+    return buffer.getvalue()
+
+
+# Conteúdos de upload: (gerador, extensão, tipo MIME, mediana do tamanho, peso)
+PAYLOAD_KINDS = [
+    (_png, ".png", "image/png", 200_000, 4),
+    (_csv, ".csv", "text/csv", 100_000, 2),
+    (_text, ".txt", "text/plain", 20_000, 2),
+    (_zip, ".zip", "application/zip", 500_000, 1),
+]
+
+
+def upload_payloads(count: int, seed: int = 42, max_size: int = 5 * 1024 * 1024
+                    ) -> Iterator[Tuple[str, str, bytes]]:
+    """
+    Gera conteúdos de upload reais (PNG, CSV, texto, ZIP) com tamanhos em
+    distribuição log-normal, de poucos KB a `max_size`.
+
+    Yields:
+        Tuplas (nome do arquivo, tipo MIME, conteúdo)
+    """
+    rng = random.Random(seed)
+    weights = [kind[4] for kind in PAYLOAD_KINDS]
+    for index in range(count):
+        generate, ext, content_type, median, _ = rng.choices(PAYLOAD_KINDS, weights)[0]
+        size = min(max_size, max(256, int(rng.lognormvariate(math.log(median), 1.0))))
+        yield f"upload-{index}{ext}", content_type, generate(rng, size)
@@ -0,0 +1,167 @@
+"""
+Executa o benchmark sobre um corpus sintético e grava os resultados em JSON:
+
+    python -m benchmarks.run --files 100000 --output benchmarks/results/base.json
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/novo.json
+
+Por padrão usa um SQLite temporário; --database aceita qualquer URL (ex.: um
+Postgres vazio dedicado). O Google Cloud Vision é substituído por um
+substituto local com latência configurável (--vision-latency).
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.engine import make_url
+
+from app.config import Config
+from app.db.database import create_schema, db
+from app.main import create_app
+from benchmarks import corpus, scenarios
+
+SCENARIOS = ["upload", "retag", "list_files", "autocomplete", "bulk_tag", "delete"]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil pelo método do posto mais próximo (valores já ordenados)"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def summarize(timings: List[float], extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Resume as durações (s) de um cenário em contagem, média e percentis (ms)"""
+    values = sorted(timings)
+    total = sum(values)
+    summary = {
+        "count": len(values),
+        "total_s": round(total, 4),
+        "mean_ms": round(total / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+        "ops_per_s": round(len(values) / total, 2) if total else 0.0,
+    }
+    if extra:
+        summary.update(extra)
+    return summary
+
+
+def git_revision() -> Dict[str, Any]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=root, capture_output=True, text=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark com corpus sintético")
+    parser.add_argument("--files", type=int, default=10_000, help="Arquivos no corpus (10k a 1M)")
+    parser.add_argument("--tags", type=int, default=None, help="Tags distintas (padrão: arquivos / 5, até 20 mil)")
+    parser.add_argument("--uploads", type=int, default=200, help="Uploads medidos")
+    parser.add_argument("--deletes", type=int, default=200, help="Exclusões medidas")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições das consultas de leitura")
+    parser.add_argument("--vision-latency", type=float, default=0.05, help="Latência simulada do Vision (s)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do corpus")
+    parser.add_argument("--database", default=None, help="URL do banco (padrão: SQLite temporário)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Cenários, separados por vírgula")
+    parser.add_argument("--output", default=None, help="Arquivo JSON de saída (padrão: benchmarks/results/)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Cenários desconhecidos: {', '.join(sorted(unknown))}")
+    tags = args.tags or max(50, min(20_000, args.files // 5))
+
+    directory = tempfile.mkdtemp(prefix="benchmark-")
+    database = args.database or f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database
+        UPLOAD_FOLDER = os.path.join(directory, "storage")
+        RATE_LIMIT_ENABLED = False
+        PROFILING_ENABLED = False
+        TEXT_EXTRACTION_ENABLED = False
+
+    app = create_app(BenchmarkConfig)
+    create_schema(app)
+    scenarios.install_fake_vision(args.vision_latency)
+    rng = random.Random(args.seed)
+
+    results: Dict[str, Any] = {
+        **git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": make_url(database).get_backend_name(),
+        "params": {key: value for key, value in vars(args).items() if key not in ("output", "database")},
+        "scenarios": {},
+    }
+
+    with app.app_context():
+        started = time.perf_counter()
+        with db.engine.begin() as connection:
+            generated = corpus.generate_corpus(connection, args.files, tags, seed=args.seed)
+        popularity = generated.pop("tags_by_popularity")
+        results["corpus"] = {**generated, "seconds": round(time.perf_counter() - started, 2)}
+        print(f"Corpus: {generated['files']} arquivos, {generated['tags']} tags, "
+              f"{generated['associations']} associações", file=sys.stderr)
+
+        for name in selected:
+            if name == "upload":
+                timings, extra = scenarios.upload(corpus.upload_payloads(args.uploads, seed=args.seed))
+                total = sum(timings)
+                extra["mb_per_s"] = round(extra["bytes"] / total / 1e6, 2) if total else 0.0
+            elif name == "retag":
+                timings, extra = scenarios.retag(batch_size=50)
+            elif name == "list_files":
+                timings, extra = scenarios.list_files(scenarios.pick_list_cases(popularity, rng), args.repeat)
+            elif name == "autocomplete":
+                prefixes = [tag[:rng.randint(1, 3)] for tag in rng.sample(popularity, min(50, len(popularity)))]
+                timings, extra = scenarios.autocomplete(prefixes, args.repeat)
+            elif name == "bulk_tag":
+                timings, extra = scenarios.bulk_tag(popularity[len(popularity) // 10:][:5])
+            else:
+                ids = rng.sample(range(1, args.files + 1), min(args.deletes, args.files))
+                timings, extra = scenarios.delete(ids)
+
+            results["scenarios"][name] = summarize(timings, extra)
+            summary = results["scenarios"][name]
+            print(f"{name}: {summary['count']} op., p50 {summary['p50_ms']} ms, "
+                  f"p95 {summary['p95_ms']} ms", file=sys.stderr)
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "results",
+        f"{(results['commit'] or 'local')[:12]}-{args.files}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Resultados gravados em {output}", file=sys.stderr)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Cenários medidos pelo benchmark. Upload e listagem passam pelas rotas no
+cliente de teste; os demais executam as mesmas etapas da rota
+correspondente, dentro de um contexto da aplicação. Cada cenário devolve a
+duração de cada operação em segundos (e, opcionalmente, totais extras).
+"""
+import io
+import json
+import time
+import random
+import hashlib
+from typing import Any, Callable, Dict, List, Tuple
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.db.database import db
+from app.db.models.file import File
+from app.db.models.file_content import FileContent
+from app.services import tag_service
+from app.services.autocomplete_service import autocomplete_tags
+from app.services.file_service import apply_file_filters, delete_file
+from app.services.retag_service import retag_files
+from app.services.tag_service import bulk_attach_tags, detach_tags, resolve_tags
+from app.services.version_service import touch_files
+
+# Projeto dos arquivos enviados pelo cenário de upload (fora do corpus)
+UPLOAD_PROJECT_ID = 1_000_000
+
+VISION_LABELS = ["pessoa", "paisagem", "documento", "animal", "veiculo", "comida", "texto", "ceu"]
+
+
+def fake_vision(latency: float) -> Callable[[str], List[str]]:
+    """
+    Substituto local do Google Cloud Vision: rótulos determinísticos pelo
+    hash do caminho, após `latency` segundos (simulando a chamada de rede).
+    """
+    def analyze_images(image_path: str) -> List[str]:
+        time.sleep(latency)
+        digest = hashlib.sha1(image_path.encode("utf-8")).digest()
+        return [VISION_LABELS[byte % len(VISION_LABELS)] for byte in digest[:3]]
+    return analyze_images
+
+
+def install_fake_vision(latency: float) -> None:
+    """Troca o cliente do Vision usado pelo extrator "vision" pelo substituto local"""
+    tag_service.analyze_images = fake_vision(latency)
+
+
+def timed(func, *args, **kwargs) -> Tuple[float, Any]:
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def request_json(response) -> Any:
+    """Corpo JSON de uma resposta do cliente de teste, falhando se a rota falhou"""
+    if response.status_code != 200:
+        raise RuntimeError(f"{response.request.method} {response.request.path}: {response.status}")
+    return response.get_json()
+
+
+def upload(payloads) -> Tuple[List[float], Dict[str, Any]]:
+    """
+    Upload por POST /api/files/upload no cliente de teste: classificação,
+    gravação, leitura de cabeçalhos, registro no banco e geração de tags.
+    """
+    client = current_app.test_client()
+    metadata = json.dumps({"projects_id": UPLOAD_PROJECT_ID, "uploader_id": 1})
+    timings = []
+    total_bytes = 0
+    for filename, content_type, data in payloads:
+        elapsed, response = timed(
+            client.post,
+            "/api/files/upload",
+            data={"file": (io.BytesIO(data), filename, content_type), "metadata": metadata},
+            content_type="multipart/form-data",
+        )
+        request_json(response)
+        timings.append(elapsed)
+        total_bytes += len(data)
+    return timings, {"bytes": total_bytes}
+
+
+def list_files(cases: List[Dict[str, Any]], repeat: int) -> Tuple[List[float], Dict[str, Any]]:
+    """
+    Listagem com filtros de tags (e combinações) por GET /api/files/ no
+    cliente de teste, incluindo a carga das tags e a serialização.
+    """
+    client = current_app.test_client()
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        for filters in cases:
+            elapsed, response = timed(client.get, "/api/files/", query_string=filters)
+            timings.append(elapsed)
+            rows += len(request_json(response))
+    return timings, {"rows": rows, "cases": len(cases)}
+
+
+def autocomplete(prefixes: List[str], repeat: int) -> Tuple[List[float], Dict[str, Any]]:
+    """Sugestões de tags por prefixo, como em GET /api/tags/autocomplete"""
+    limit = current_app.config["TAG_AUTOCOMPLETE_MAX_RESULTS"]
+    timings = []
+    for _ in range(repeat):
+        for prefix in prefixes:
+            elapsed, _ = timed(autocomplete_tags, prefix, limit)
+            timings.append(elapsed)
+    return timings, {"prefixes": len(prefixes)}
+
+
+def delete(file_ids: List[int]) -> Tuple[List[float], Dict[str, Any]]:
+    """Exclusão de arquivos, como em DELETE /api/files/<id>"""
+    timings = []
+    for file_id in file_ids:
+        started = time.perf_counter()
+        file = db.session.get(File, file_id)
+        if file is None:
+            continue
+        delete_file(file.file_path)
+        detach_tags(file.id)
+        touch_files(file.project_id)
+        FileContent.query.filter_by(file_id=file.id).delete()
+        db.session.delete(file)
+        db.session.commit()
+        timings.append(time.perf_counter() - started)
+    return timings, {}
+
+
+def retag(batch_size: int) -> Tuple[List[float], Dict[str, Any]]:
+    """Job de re-tag (flask tags retag) sobre os arquivos enviados no upload"""
+    timings = []
+    started = time.perf_counter()
+
+    def on_batch(last_id, diffs, batch_totals):
+        nonlocal started
+        now = time.perf_counter()
+        timings.append(now - started)
+        started = now
+
+    totals = retag_files({"project_id": UPLOAD_PROJECT_ID}, batch_size=batch_size, on_batch=on_batch)
+    return timings, totals
+
+
+def bulk_tag(tag_names: List[str]) -> Tuple[List[float], Dict[str, Any]]:
+    """Tags em massa por filtro (POST /api/files/tags/bulk)"""
+    timings = []
+    associations = 0
+    for index, name in enumerate(tag_names):
+        started = time.perf_counter()
+        targets = apply_file_filters(select(File.id), {"tags": [name]})
+        tag_ids = resolve_tags([f"lote-{index}"])
+        counts = bulk_attach_tags(targets, tag_ids.values())
+        db.session.commit()
+        timings.append(time.perf_counter() - started)
+        associations += sum(counts.values())
+    return timings, {"associations": associations}
+
+
+def pick_list_cases(popularity: List[str], rng: random.Random) -> List[Dict[str, Any]]:
+    """Filtros de listagem: tag popular, mediana, rara, duas tags, tag + tipo e tag + projeto"""
+    return [
+        {"tags": [popularity[0]]},
+        {"tags": [popularity[len(popularity) // 2]]},
+        {"tags": [popularity[-1]]},
+        {"tags": [popularity[0], popularity[1]]},
+        {"tags": [popularity[2]], "file_type": "images"},
+        {"tags": [popularity[rng.randrange(min(10, len(popularity) - 1), min(100, len(popularity)))]], "project_id": 1},
+    ]
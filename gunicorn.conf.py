@@ -0,0 +1,71 @@
+"""
+Configuração do gunicorn para produção:
+
+    gunicorn -c gunicorn.conf.py app.wsgi:app
+
+A aplicação é carregada uma vez no processo mestre (preload_app) e os
+workers são criados por fork, compartilhando a memória por copy-on-write.
+Cada worker descarta as conexões de banco herdadas do mestre (post_fork).
+As métricas do Prometheus de todos os workers são gravadas em
+PROMETHEUS_MULTIPROC_DIR e agregadas em /metrics.
+
+Recarga sem interrupção: com preload_app o código fica no mestre, então
+HUP apenas recria os workers. Para carregar código novo, envie USR2 (novo
+mestre) e depois TERM ao mestre antigo.
+"""
+import os
+import tempfile
+import multiprocessing
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', 5000)}")
+
+# Workers: WEB_CONCURRENCY ou 2 x CPUs + 1
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+# gthread atende vários uploads por worker enquanto outros esperam disco/rede;
+# "gevent" também pode ser usado, se instalado
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+preload_app = True
+
+# Uploads grandes podem levar mais que o padrão de 30s
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Reciclar workers periodicamente limita o crescimento de memória
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+# Heartbeat dos workers em memória, e não no disco do contêiner
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+# Modo multiprocesso do prometheus_client: precisa estar definido antes de a
+# aplicação ser carregada. Arquivos de uma execução anterior são descartados
+metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if metrics_dir:
+    os.makedirs(metrics_dir, exist_ok=True)
+    for name in os.listdir(metrics_dir):
+        if name.endswith(".db"):
+            os.remove(os.path.join(metrics_dir, name))
+else:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+
+
+def post_fork(server, worker):
+    """Descarta as conexões de banco herdadas do mestre"""
+    from app.db.database import dispose_engines
+
+    dispose_engines(worker.app.wsgi())
+
+
+def child_exit(server, worker):
+    """Descarta as métricas "ao vivo" (gauges) do worker encerrado"""
+    from app.core.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
@@ -0,0 +1,99 @@
+"""Esquema inicial
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00
+
+Bancos criados antes das migrações (via db.create_all) já têm estas
+tabelas: marque-os com "flask db stamp 0001" antes do primeiro upgrade.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'tags',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.String(length=255), nullable=True),
+        sa.Column('auto_generated', sa.Boolean(), nullable=True),
+        sa.Column('usage_count', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id', name=op.f('pk_tags')),
+        sa.UniqueConstraint('name', name=op.f('uq_tags_name')),
+    )
+    op.create_table(
+        'files',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('original_filename', sa.String(), nullable=False),
+        sa.Column('file_path', sa.String(), nullable=False),
+        sa.Column('file_type', sa.String(), nullable=False),
+        sa.Column('file_size', sa.BigInteger(), nullable=False),
+        sa.Column('content_type', sa.String(), nullable=False),
+        sa.Column('metadata', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=True),
+        sa.Column('uploader_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id', name=op.f('pk_files')),
+    )
+    op.create_index(op.f('ix_files_id'), 'files', ['id'], unique=False)
+    op.create_table(
+        'file_tags',
+        sa.Column('file_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['file_id'], ['files.id'], name=op.f('fk_file_tags_file_id_files'), ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], name=op.f('fk_file_tags_tag_id_tags'), ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('file_id', 'tag_id', name=op.f('pk_file_tags')),
+    )
+    op.create_table(
+        'file_contents',
+        sa.Column('file_id', sa.Integer(), nullable=False),
+        sa.Column('text', sa.Text(), nullable=True),
+        sa.Column('keywords', sa.JSON(), nullable=True),
+        sa.Column('pages', sa.Integer(), nullable=True),
+        sa.Column('truncated', sa.Boolean(), nullable=True),
+        sa.Column('timed_out', sa.Boolean(), nullable=True),
+        sa.Column('error', sa.String(length=255), nullable=True),
+        sa.Column('extracted_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['file_id'], ['files.id'], name=op.f('fk_file_contents_file_id_files'), ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('file_id', name=op.f('pk_file_contents')),
+    )
+    op.create_table(
+        'tag_cooccurrences',
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.Column('other_tag_id', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['other_tag_id'], ['tags.id'], name=op.f('fk_tag_cooccurrences_other_tag_id_tags'), ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], name=op.f('fk_tag_cooccurrences_tag_id_tags'), ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('tag_id', 'other_tag_id', name=op.f('pk_tag_cooccurrences')),
+    )
+    op.create_index('ix_tag_cooccurrences_tag_id_count', 'tag_cooccurrences', ['tag_id', 'count'], unique=False)
+    op.create_table(
+        'change_counters',
+        sa.Column('scope', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('scope', name=op.f('pk_change_counters')),
+    )
+
+
+def downgrade():
+    op.drop_table('change_counters')
+    op.drop_index('ix_tag_cooccurrences_tag_id_count', table_name='tag_cooccurrences')
+    op.drop_table('tag_cooccurrences')
+    op.drop_table('file_contents')
+    op.drop_table('file_tags')
+    op.drop_index(op.f('ix_files_id'), table_name='files')
+    op.drop_table('files')
+    op.drop_table('tags')
@@ -0,0 +1,61 @@
+"""Índices compostos dos caminhos quentes de listagem
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:30:00
+
+- files: (filtro, created_at) para project_id, uploader_id, file_type e
+  project_id + file_type, atendendo filtro e ordenação pelo mesmo índice
+- file_tags: (tag_id, file_id), já que a chave primária só cobre file_id -> tag_id
+- tags: usage_count, ordenação de list_tags e do autocomplete
+- Postgres: metadata passa a jsonb (bancos anteriores guardavam texto) e
+  ganha o índice GIN jsonb_path_ops usado pelos filtros de contenção
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+FILE_INDEXES = [
+    ('ix_files_created_at', ['created_at']),
+    ('ix_files_project_id_created_at', ['project_id', 'created_at']),
+    ('ix_files_project_id_file_type_created_at', ['project_id', 'file_type', 'created_at']),
+    ('ix_files_uploader_id_created_at', ['uploader_id', 'created_at']),
+    ('ix_files_file_type_created_at', ['file_type', 'created_at']),
+]
+
+
+def _metadata_type(bind):
+    for column in sa.inspect(bind).get_columns('files'):
+        if column['name'] == 'metadata':
+            return str(column['type']).lower()
+    return None
+
+
+def upgrade():
+    for name, columns in FILE_INDEXES:
+        op.create_index(name, 'files', columns, unique=False)
+    op.create_index('ix_file_tags_tag_id_file_id', 'file_tags', ['tag_id', 'file_id'], unique=False)
+    op.create_index('ix_tags_usage_count', 'tags', ['usage_count'], unique=False)
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        if _metadata_type(bind) != 'jsonb':
+            op.execute("ALTER TABLE files ALTER COLUMN metadata TYPE jsonb USING metadata::jsonb")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_files_metadata_gin ON files USING gin (metadata jsonb_path_ops)"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_files_metadata_gin")
+    op.drop_index('ix_tags_usage_count', table_name='tags')
+    op.drop_index('ix_file_tags_tag_id_file_id', table_name='file_tags')
+    for name, _ in reversed(FILE_INDEXES):
+        op.drop_index(name, table_name='files')
@@ -0,0 +1,31 @@
+"""Baldes de limite de requisições
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 10:00:00
+
+- rate_limit_buckets: estado compartilhado (entre workers e instâncias) do
+  limite de requisições por cliente e por projeto
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'rate_limit_buckets',
+        sa.Column('key', sa.String(length=200), nullable=False),
+        sa.Column('tat', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('key', name=op.f('pk_rate_limit_buckets')),
+    )
+
+
+def downgrade():
+    op.drop_table('rate_limit_buckets')
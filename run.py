@@ -9,9 +9,13 @@ load_dotenv()
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Importar a aplicação Flask
-from app.main import app
+from app.db.database import create_schema
+from app.main import create_app
 
 if __name__ == "__main__":
+    app = create_app()
+    create_schema(app)
+
     # Criar diretório de armazenamento se não existir
     storage_path = os.environ.get("STORAGE_PATH", os.path.join(os.getcwd(), "storage"))
     os.makedirs(storage_path, exist_ok=True)
@@ -19,9 +23,9 @@ if __name__ == "__main__":
     # Obter porta da variável de ambiente ou usar o padrão 5000
     port = int(os.environ.get("PORT", 5000))
     
-    # Iniciar o servidor
+    # Iniciar o servidor de desenvolvimento (em produção: gunicorn -c gunicorn.conf.py app.wsgi:app)
     app.run(
         host="0.0.0.0",
         port=port,
-        debug=os.environ.get("FLASK_DEBUG", "1") == "1"
+        debug=os.environ.get("FLASK_DEBUG", "0") == "1"
     )
\ No newline at end of file
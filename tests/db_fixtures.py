@@ -0,0 +1,63 @@
+"""
+Banco de testes com o esquema real dos modelos (as mesmas tabelas e índices
+das migrações), compartilhado pelos testes que precisam do banco.
+"""
+import os
+import tempfile
+import unittest
+
+from flask import Flask
+
+from app.config import Config
+from app.db.database import db
+from app.services import tag_service
+from app.services.usage_service import init_usage_counters
+from app.services.version_service import init_change_counters
+
+
+def create_tables(connection) -> None:
+    """Cria todas as tabelas e índices dos modelos na conexão"""
+    # Registra todos os modelos no metadata, como init_db
+    from app.db.models import (  # noqa: F401
+        change_counter, file, file_content, rate_limit_bucket, tag, tag_cooccurrence
+    )
+    db.metadata.create_all(connection)
+
+
+def file_row(file_id: int, **values):
+    """Linha completa da tabela files, com valores padrão nas colunas obrigatórias"""
+    row = {
+        "id": file_id, "filename": f"{file_id}.txt", "original_filename": f"{file_id}.txt",
+        "file_path": f"/tmp/{file_id}.txt", "file_type": "documents", "file_size": 10,
+        "content_type": "text/plain", "metadata": None, "uploader_id": 1, "project_id": 1,
+    }
+    row.update(values)
+    return row
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """
+    Aplicação mínima (sem rotas) com um banco SQLite temporário, o esquema
+    completo e os eventos de contagem de uso e de versão registrados.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config.from_object(Config)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(self.directory, 'app.db')}"
+        db.init_app(self.app)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        init_usage_counters(self.app)
+        init_change_counters(self.app)
+        # IDs de tags em cache de outro teste não valem para este banco
+        tag_service._tag_id_cache = None
+
+        with db.engine.begin() as connection:
+            create_tables(connection)
+
+    def tearDown(self):
+        db.session.remove()
+        self.app_context.pop()
+        tag_service._tag_id_cache = None
@@ -0,0 +1,132 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from flask import Flask, jsonify
+
+from app.config import Config
+from app.db.database import db
+from app.db.models.rate_limit_bucket import RateLimitBucket
+from app.services import admission_service
+from app.services.admission_service import admission_control, prune_buckets, take_token, take_tokens
+
+
+class TakeTokenTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config.from_object(Config)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(self.directory, 'app.db')}"
+        db.init_app(self.app)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        RateLimitBucket.__table__.create(db.engine)
+
+    def tearDown(self):
+        db.session.remove()
+        self.app_context.pop()
+
+    def test_burst_then_refill(self):
+        # 60/min = uma ficha por segundo, até 3 seguidas
+        results = [take_token("k", 60, 3, now=100.0) for _ in range(4)]
+        self.assertEqual(results[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(results[3], 1.0)
+
+        self.assertAlmostEqual(take_token("k", 60, 3, now=100.5), 0.5)
+        self.assertEqual(take_token("k", 60, 3, now=101.0), 0.0)
+        # Outra chave tem seu próprio balde
+        self.assertEqual(take_token("other", 60, 3, now=100.0), 0.0)
+
+    def test_idle_bucket_does_not_exceed_burst(self):
+        take_token("k", 60, 2, now=0.0)
+        results = [take_token("k", 60, 2, now=1000.0) for _ in range(3)]
+        self.assertEqual(results[:2], [0.0, 0.0])
+        self.assertGreater(results[2], 0)
+
+    def test_refused_key_does_not_debit_the_others(self):
+        self.assertEqual(take_token("project", 60, 1, now=100.0), 0.0)
+        self.assertGreater(take_tokens(["client", "project"], 60, 1, now=100.0), 0)
+        # A ficha do cliente não foi gasta pela requisição recusada
+        self.assertEqual(take_token("client", 60, 1, now=100.0), 0.0)
+
+    def test_prune_removes_only_idle_buckets(self):
+        take_token("idle", 60, 3, now=100.0)
+        take_token("busy", 60, 3, now=1000.0)
+        self.assertEqual(prune_buckets(now=500.0), 1)
+        keys = [row.key for row in db.session.query(RateLimitBucket).all()]
+        self.assertEqual(keys, ["busy"])
+
+
+class AdmissionControlTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config.from_object(Config)
+        self.app.config.update(
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(self.directory, 'app.db')}",
+            RATE_LIMIT=60, RATE_LIMIT_BURST=2, MAX_CONCURRENT_UPLOADS_PER_WORKER=1,
+        )
+        db.init_app(self.app)
+        with self.app.app_context():
+            RateLimitBucket.__table__.create(db.engine)
+        admission_service._reset_slots()
+
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+        @self.app.route("/upload", methods=["POST"])
+        @admission_control("upload", "MAX_CONCURRENT_UPLOADS_PER_WORKER")
+        def upload():
+            self.entered.set()
+            self.release.wait(5)
+            return jsonify({"ok": True})
+
+        self.client = self.app.test_client()
+
+    def test_rate_limit_returns_429_with_retry_after(self):
+        self.release.set()
+        statuses = [self.client.post("/upload?project_id=1").status_code for _ in range(2)]
+        self.assertEqual(statuses, [200, 200])
+
+        response = self.client.post("/upload?project_id=1")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response.headers["Retry-After"]), 1)
+
+    def test_project_from_upload_metadata(self):
+        self.release.set()
+
+        def upload(address, project_id=None):
+            data = {"metadata": json.dumps({"projects_id": project_id})} if project_id else {}
+            return self.client.post(
+                "/upload", data=data, content_type="multipart/form-data",
+                environ_overrides={"REMOTE_ADDR": address},
+            ).status_code
+
+        self.assertEqual([upload("10.0.0.1", 7), upload("10.0.0.1", 7)], [200, 200])
+        # Outro cliente, mesmo projeto: recusado pelo balde do projeto
+        self.assertEqual(upload("10.0.0.2", 7), 429)
+        # ... sem consumir as fichas do cliente
+        self.assertEqual([upload("10.0.0.2"), upload("10.0.0.2"), upload("10.0.0.2")], [200, 200, 429])
+
+    def test_concurrency_cap_sheds_load_with_503(self):
+        self.app.config["RATE_LIMIT_ENABLED"] = False
+        results = []
+        thread = threading.Thread(target=lambda: results.append(self.client.post("/upload").status_code))
+        thread.start()
+        self.assertTrue(self.entered.wait(5))
+
+        response = self.app.test_client().post("/upload")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "5")
+
+        self.release.set()
+        thread.join()
+        self.assertEqual(results, [200])
+        # A vaga é devolvida ao final da requisição
+        self.assertEqual(self.client.post("/upload").status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
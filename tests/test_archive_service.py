@@ -0,0 +1,192 @@
+import gzip
+import io
+import lzma
+import os
+import struct
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from app.services.archive_service import archive_tags, read_archive_manifest
+from app.services.classification_service import build_extension_map
+
+CATEGORIES = build_extension_map({
+    "images": [".jpg", ".png"],
+    "documents": [".pdf", ".txt"],
+    "code": [".py"],
+    "archives": [".zip"],
+})
+
+
+def number(value):
+    # Números do cabeçalho 7z (até 14 bits bastam aqui)
+    if value < 0x80:
+        return bytes([value])
+    return bytes([0x80 | (value >> 8), value & 0xFF])
+
+
+def sevenzip(files, encode_header=False):
+    """Monta um 7z mínimo com uma pasta "copy" e os arquivos informados"""
+    payload = b"".join(content for _, content in files if content)
+    non_empty = [content for _, content in files if content]
+    empty_bits = 0
+    for index, (_, content) in enumerate(files):
+        if not content:
+            empty_bits |= 0x80 >> index
+    names = b"\x00" + b"".join(name.encode("utf-16-le") + b"\x00\x00" for name, _ in files)
+
+    header = (
+        b"\x01\x04"
+        + b"\x06\x00\x01\x09" + number(len(payload)) + b"\x00"
+        + b"\x07\x0b\x01\x00\x01\x01\x00\x0c" + number(len(payload)) + b"\x00"
+        + b"\x08\x0d" + number(len(non_empty)) + b"\x09"
+        + b"".join(number(len(content)) for content in non_empty[:-1]) + b"\x00"
+        + b"\x00"
+        + b"\x05" + number(len(files))
+        + b"\x0e\x01" + bytes([empty_bits])
+        + b"\x11" + number(len(names)) + names
+        + b"\x00\x00"
+    )
+
+    if encode_header:
+        filters = [{"id": lzma.FILTER_LZMA1, "dict_size": 1 << 16, "lc": 3, "lp": 0, "pb": 2}]
+        packed = lzma.compress(header, format=lzma.FORMAT_RAW, filters=filters)
+        properties = bytes([(2 * 5 + 0) * 9 + 3]) + struct.pack("<I", 1 << 16)
+        encoded = (
+            b"\x17"
+            + b"\x06" + number(len(payload)) + b"\x01\x09" + number(len(packed)) + b"\x00"
+            + b"\x07\x0b\x01\x00\x01\x23\x03\x01\x01\x05" + properties
+            + b"\x0c" + number(len(header)) + b"\x00"
+            + b"\x00"
+        )
+        payload += packed
+        header = encoded
+
+    start = b"7z\xbc\xaf\x27\x1c\x00\x04" + b"\x00" * 4 + struct.pack("<QQ", len(payload), len(header)) + b"\x00" * 4
+    return start + payload + header
+
+
+def iso_record(name, extent, length, is_dir):
+    record = bytearray(33 + len(name) + (1 - len(name) % 2))
+    record[0] = len(record)
+    record[2:10] = struct.pack("<I", extent) + struct.pack(">I", extent)
+    record[10:18] = struct.pack("<I", length) + struct.pack(">I", length)
+    record[25] = 2 if is_dir else 0
+    record[32] = len(name)
+    record[33:33 + len(name)] = name
+    return bytes(record)
+
+
+def iso_image():
+    sector = 2048
+    image = bytearray(sector * 22)
+    pvd = 16 * sector
+    image[pvd:pvd + 6] = b"\x01CD001"
+    image[pvd + 156:pvd + 190] = iso_record(b"\x00", 18, sector, True)
+
+    root = iso_record(b"\x00", 18, sector, True) + iso_record(b"\x01", 18, sector, True)
+    root += iso_record(b"DOCS", 19, sector, True) + iso_record(b"SETUP.PY;1", 20, 5000, False)
+    image[18 * sector:18 * sector + len(root)] = root
+    docs = iso_record(b"\x00", 19, sector, True) + iso_record(b"\x01", 18, sector, True)
+    docs += iso_record(b"A.PDF;1", 21, 700, False) + iso_record(b"B.PDF;1", 21, 300, False)
+    image[19 * sector:19 * sector + len(docs)] = docs
+    return bytes(image)
+
+
+class ArchiveServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for name in os.listdir(self.test_dir):
+            os.remove(os.path.join(self.test_dir, name))
+        os.rmdir(self.test_dir)
+
+    def path(self, name):
+        return os.path.join(self.test_dir, name)
+
+    def write(self, name, data):
+        with open(self.path(name), "wb") as f:
+            f.write(data)
+        return self.path(name)
+
+    def manifest(self, name, **kwargs):
+        return read_archive_manifest(self.path(name), name, CATEGORIES, **kwargs)
+
+    def test_zip_central_directory(self):
+        with zipfile.ZipFile(self.path("photos.zip"), "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("trip/", b"")
+            for index in range(6):
+                archive.writestr(f"trip/{index}.jpg", b"\xff" * 100)
+            archive.writestr("notes.txt", b"hello" * 10)
+
+        manifest = self.manifest("photos.zip")
+        self.assertEqual(manifest["format"], "zip")
+        self.assertEqual((manifest["files"], manifest["directories"]), (7, 1))
+        self.assertEqual(manifest["total_size"], 650)
+        self.assertEqual(manifest["dominant_type"], "images")
+        self.assertFalse(manifest["suspicious"])
+        self.assertEqual(archive_tags(manifest), ["images", "jpg"])
+
+    def test_zip_bomb_signals(self):
+        with zipfile.ZipFile(self.path("bomb.zip"), "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("zeros.txt", b"\x00" * 5_000_000)
+        manifest = self.manifest("bomb.zip", bomb_min_bytes=1_000_000)
+        self.assertIn("compression_ratio", manifest["bomb_reasons"])
+        self.assertIn("zip-bomb", archive_tags(manifest))
+
+        # Duas entradas do diretório central apontando para o mesmo conteúdo
+        with open(self.path("bomb.zip"), "rb") as f:
+            data = f.read()
+        eocd = data.rfind(b"PK\x05\x06")
+        cd_size, cd_offset = struct.unpack_from("<LL", data, eocd + 12)
+        central = data[cd_offset:cd_offset + cd_size]
+        footer = bytearray(data[eocd:])
+        struct.pack_into("<HHL", footer, 8, 2, 2, cd_size * 2)
+        self.write("overlap.zip", data[:cd_offset] + central * 2 + bytes(footer))
+        self.assertIn("overlapping_entries", self.manifest("overlap.zip")["bomb_reasons"])
+
+    def test_tar_and_gzip(self):
+        with tarfile.open(self.path("src.tar.gz"), "w:gz") as archive:
+            for name in ("a.py", "b.py", "docs/readme.txt"):
+                info = tarfile.TarInfo(name)
+                info.size = 10
+                archive.addfile(info, io.BytesIO(b"x" * 10))
+        manifest = self.manifest("src.tar.gz")
+        self.assertEqual((manifest["format"], manifest["files"], manifest["total_size"]), ("tar", 3, 30))
+        self.assertEqual(archive_tags(manifest), ["code", "documents", "py"])
+
+        self.assertTrue(self.manifest("src.tar.gz", max_entries=2)["truncated"])
+
+        self.write("report.pdf.gz", gzip.compress(b"%PDF" + b"0" * 996))
+        manifest = self.manifest("report.pdf.gz")
+        self.assertEqual((manifest["format"], manifest["total_size"], manifest["dominant_type"]), ("gzip", 1000, "documents"))
+
+    def test_7z_plain_and_encoded_headers(self):
+        files = [("a.png", b"1" * 40), ("b.png", b"2" * 60), ("empty", b"")]
+        for encode in (False, True):
+            self.write("pics.7z", sevenzip(files, encode_header=encode))
+            manifest = self.manifest("pics.7z")
+            self.assertEqual(manifest["format"], "7z")
+            self.assertEqual((manifest["files"], manifest["directories"]), (2, 1))
+            self.assertEqual(manifest["total_size"], 100)
+            self.assertEqual(manifest["types"], {"images": 2})
+
+    def test_iso_directory_tree(self):
+        self.write("disc.iso", iso_image())
+        manifest = self.manifest("disc.iso")
+        self.assertEqual(manifest["format"], "iso")
+        self.assertEqual((manifest["files"], manifest["directories"]), (3, 1))
+        self.assertEqual(manifest["total_size"], 6000)
+        self.assertEqual(manifest["types"], {"documents": 2, "code": 1})
+
+    def test_unreadable_archives(self):
+        self.write("broken.zip", b"PK\x03\x04" + b"\x00" * 100)
+        self.assertIsNone(self.manifest("broken.zip"))
+        self.write("plain.rar", b"Rar!\x1a\x07\x00")
+        self.assertIsNone(self.manifest("plain.rar"))
+
+
+if __name__ == "__main__":
+    unittest.main()
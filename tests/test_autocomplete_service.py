@@ -0,0 +1,95 @@
+import random
+import time
+import unittest
+
+from app.services.autocomplete_service import TagTrie
+
+
+class TagTrieTestCase(unittest.TestCase):
+    def setUp(self):
+        self.trie = TagTrie(top_k=3)
+        self.trie.add(1, "python", 50)
+        self.trie.add(2, "pdf", 80)
+        self.trie.add(3, "photo", 10)
+        self.trie.add(4, "php", 30)
+        self.trie.add(5, "video", 70)
+
+    def names(self, prefix, limit=10):
+        return [tag["name"] for tag in self.trie.search(prefix, limit)]
+
+    def test_search_orders_by_usage(self):
+        self.assertEqual(self.names("p"), ["pdf", "python", "php"])
+        self.assertEqual(self.names("ph"), ["php", "photo"])
+        self.assertEqual(self.names("P", limit=1), ["pdf"])
+        self.assertEqual(self.names("x"), [])
+
+    def test_remove_refills_from_subtree(self):
+        self.trie.remove(2)
+        self.assertEqual(self.names("p"), ["python", "php", "photo"])
+        self.assertNotIn(2, self.trie)
+        self.assertEqual(self.names("pd"), [])
+
+    def test_rename(self):
+        self.trie.rename(5, "photography")
+        self.assertEqual(self.names("ph"), ["photography", "php", "photo"])
+        self.assertEqual(self.names("v"), [])
+
+    def test_update_usage(self):
+        self.trie.update_usage(3, 100)
+        self.assertEqual(self.names("p"), ["photo", "pdf", "python"])
+
+        # Ao diminuir, uma tag fora da lista deve voltar a aparecer
+        self.trie.update_usage(3, 1)
+        self.assertEqual(self.names("p"), ["pdf", "python", "php"])
+
+    def test_updates_match_full_recalculation(self):
+        rng = random.Random(7)
+        trie = TagTrie(top_k=5)
+        usage = {}
+        for tag_id in range(300):
+            usage[tag_id] = rng.randrange(50)
+            trie.add(tag_id, f"t{rng.choice('ab')}{rng.choice('abc')}{tag_id}", usage[tag_id])
+
+        for _ in range(2000):
+            tag_id = rng.choice(list(usage))
+            if rng.random() < 0.05:
+                trie.remove(tag_id)
+                del usage[tag_id]
+                continue
+            usage[tag_id] = max(usage[tag_id] + rng.choice([-5, -1, 1, 5]), 0)
+            trie.update_usage(tag_id, usage[tag_id])
+
+        for prefix in ("", "t", "ta", "tb", "tac"):
+            names = {tag_id: trie._tags[tag_id][0] for tag_id in usage}
+            expected = sorted(
+                (tag_id for tag_id in usage if names[tag_id].startswith(prefix)),
+                key=lambda tag_id: (-usage[tag_id], names[tag_id]),
+            )[:5]
+            self.assertEqual([tag["id"] for tag in trie.search(prefix)], expected, prefix)
+
+    def test_usage_updates_are_fast(self):
+        trie = TagTrie(top_k=20)
+        for i in range(20000):
+            trie.add(i, f"tag{i}", 1000 - i % 97)
+
+        # Tags da lista da raiz perdendo uso: recálculo a cada atualização
+        start = time.perf_counter()
+        for i in range(200):
+            trie.update_usage(i * 97, 0)
+        elapsed = (time.perf_counter() - start) / 200
+        self.assertLess(elapsed, 0.002)
+
+    def test_search_is_fast(self):
+        trie = TagTrie(top_k=20)
+        for i in range(20000):
+            trie.add(i, f"tag{i}", i % 97)
+
+        start = time.perf_counter()
+        for _ in range(100):
+            trie.search("tag1", 10)
+        elapsed = (time.perf_counter() - start) / 100
+        self.assertLess(elapsed, 0.001)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from sqlalchemy import create_engine, func, select
+
+from app.db.models.file import file_tags
+from app.db.models.tag import Tag
+from app.services.classification_service import looks_like_text, match_signature
+from benchmarks.compare import compare
+from benchmarks.corpus import generate_corpus, upload_payloads
+from benchmarks.run import percentile, summarize
+from db_fixtures import create_tables
+
+
+class CorpusTestCase(unittest.TestCase):
+    def generate(self, seed):
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            create_tables(connection)
+            summary = generate_corpus(connection, files=2000, tags=300, seed=seed)
+            links = connection.execute(
+                select(file_tags.c.file_id, file_tags.c.tag_id).order_by(file_tags.c.file_id, file_tags.c.tag_id)
+            ).all()
+            usage = dict(connection.execute(select(Tag.__table__.c.name, Tag.__table__.c.usage_count)).all())
+            tag_count = connection.execute(select(func.count()).select_from(Tag.__table__)).scalar()
+        return summary, links, usage, tag_count
+
+    def test_corpus_is_reproducible_and_skewed(self):
+        summary, links, usage, tags = self.generate(seed=7)
+        self.assertEqual(tags, 300)
+        self.assertEqual(len(links), summary["associations"])
+        self.assertEqual(sum(usage.values()), summary["associations"])
+
+        popularity = summary["tags_by_popularity"]
+        # Lei de potência: a tag mais popular aparece muito mais que a mediana
+        self.assertGreater(usage[popularity[0]], 10 * max(1, usage[popularity[150]]))
+
+        self.assertEqual(self.generate(seed=7)[1], links)
+        self.assertNotEqual(self.generate(seed=8)[1], links)
+
+    def test_upload_payloads_are_real_files(self):
+        payloads = list(upload_payloads(20, seed=1, max_size=200_000))
+        self.assertEqual(len(payloads), 20)
+        for filename, content_type, data in payloads:
+            self.assertLessEqual(len(data), 300_000)
+            head = data[:4096]
+            if content_type in ("image/png", "application/zip"):
+                self.assertEqual(match_signature(head)[0], content_type, filename)
+            else:
+                self.assertTrue(looks_like_text(head), filename)
+
+
+class ResultsTestCase(unittest.TestCase):
+    def test_summary_percentiles(self):
+        timings = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(percentile(timings, 0.5), 0.05)
+        self.assertEqual(percentile(timings, 0.95), 0.095)
+        summary = summarize(timings, {"rows": 3})
+        self.assertEqual((summary["count"], summary["p99_ms"], summary["rows"]), (100, 99.0, 3))
+
+    def test_compare_flags_regressions(self):
+        base = {"scenarios": {"list_files": {"p50_ms": 10.0, "p95_ms": 20.0, "mean_ms": 12.0}}}
+        new = {"scenarios": {"list_files": {"p50_ms": 10.5, "p95_ms": 30.0, "mean_ms": 13.0}}}
+        rows, regressions = compare(base, new, threshold=10)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("p95_ms", regressions[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import io
+import unittest
+
+from flask import Flask
+
+from app.config import Config
+from app.services.classification_service import (
+    build_extension_map, category_for_mime, classify_content, match_signature, read_head
+)
+
+
+class ClassificationServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object(Config)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def test_extension_map_keeps_first_category(self):
+        categories = build_extension_map(Config.ALLOWED_EXTENSIONS)
+        self.assertEqual(categories[".jpg"], "images")
+        self.assertEqual(categories[".json"], "code")
+
+    def test_category_for_real_mime_types(self):
+        self.assertEqual(category_for_mime("image/png"), "images")
+        self.assertEqual(category_for_mime("text/csv; charset=utf-8"), "spreadsheets")
+        self.assertEqual(
+            category_for_mime("application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+            "documents",
+        )
+        self.assertIsNone(category_for_mime("application/octet-stream"))
+
+    def test_signatures(self):
+        self.assertEqual(match_signature(b"\x89PNG\r\n\x1a\n...."), ("image/png", "images"))
+        self.assertEqual(match_signature(b"RIFF\x00\x00\x00\x00WAVEfmt "), ("audio/wav", "audio"))
+        self.assertEqual(match_signature(b"\x00\x00\x00\x18ftypqt  "), ("video/quicktime", "videos"))
+        tar = b"\x00" * 257 + b"ustar\x0000"
+        self.assertEqual(match_signature(tar), ("application/x-tar", "archives"))
+        self.assertIsNone(match_signature(b"plain text"))
+
+    def test_content_wins_over_wrong_extension(self):
+        result = classify_content("photo.pdf", b"\xff\xd8\xff\xe0\x00\x10JFIF", "application/pdf")
+        self.assertEqual(result["category"], "images")
+        self.assertEqual(result["mime_type"], "image/jpeg")
+        self.assertLess(result["confidence"], 1.0)
+
+    def test_container_uses_extension(self):
+        result = classify_content("report.docx", b"PK\x03\x04\x14\x00", "application/octet-stream")
+        self.assertEqual(result["category"], "documents")
+        self.assertTrue(result["mime_type"].endswith("wordprocessingml.document"))
+
+    def test_text_formats_fall_back_to_extension(self):
+        result = classify_content("script.py", b"import os\nprint('ok')\n")
+        self.assertEqual(result["category"], "code")
+        self.assertEqual(result["mime_type"], "text/plain")
+        self.assertEqual(result["source"], "extension")
+
+        unknown = classify_content("blob.xyz", b"\x00\x01\x02")
+        self.assertEqual(unknown["category"], "outros")
+        self.assertEqual(unknown["confidence"], 0.0)
+
+    def test_short_signatures_do_not_override_text_extensions(self):
+        csv = classify_content("data.csv", b"BMI,weight,height\n22.5,70,1.76\n", "text/csv")
+        self.assertEqual(csv["category"], "spreadsheets")
+        self.assertEqual(csv["source"], "extension")
+        notes = classify_content("notes.txt", b"BM corp - ata da reuni\xc3\xa3o\n")
+        self.assertEqual(notes["category"], "documents")
+        script = classify_content("x.py", b"ID3 = 5\nprint(ID3)\n")
+        self.assertEqual(script["category"], "code")
+        self.assertEqual(classify_content("BM.log", b"BM\n")["source"], "text")
+
+    def test_short_signatures_still_match_binary_content(self):
+        bmp = b"BM\x36\x00\x0c\x00\x00\x00\x00\x00\x36\x00\x00\x00\x28\x00"
+        self.assertEqual(classify_content("image.txt", bmp)["category"], "images")
+        self.assertEqual(classify_content("image.bmp", b"BM corp")["category"], "images")
+        mp3 = b"ID3\x04\x00\x00\x00\x00\x00\x23TSSE"
+        self.assertEqual(classify_content("song.txt", mp3)["mime_type"], "audio/mpeg")
+        self.assertEqual(classify_content("frame", b"\xff\xfb\x90\x64\x00")["category"], "audio")
+
+    def test_read_head_rewinds_stream(self):
+        stream = io.BytesIO(b"%PDF-1.7 rest of the file")
+        self.assertEqual(read_head(stream, 8), b"%PDF-1.7")
+        self.assertEqual(stream.read(), b"%PDF-1.7 rest of the file")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from sqlalchemy import select
+
+from app.core.query_counter import count_queries
+from app.db.database import db
+from app.db.models.file import file_tags
+from app.db.models.tag import Tag
+from app.db.models.tag_cooccurrence import TagCooccurrence
+from app.services.cooccurrence_service import record_bulk_change, record_tags_added, record_tags_removed
+from db_fixtures import DatabaseTestCase
+
+
+class CooccurrenceServiceTestCase(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        with db.engine.begin() as connection:
+            connection.execute(Tag.__table__.insert(), [
+                {"id": tag_id, "name": f"tag-{tag_id}"} for tag_id in range(1, 5)
+            ])
+            # Par sem relação com as alterações abaixo, que não pode ser tocado
+            connection.execute(TagCooccurrence.__table__.insert(), [
+                {"tag_id": 3, "other_tag_id": 4, "count": 0},
+            ])
+
+    def pairs(self):
+        table = TagCooccurrence.__table__
+        return dict(((a, b), count) for a, b, count in db.session.execute(
+            select(table.c.tag_id, table.c.other_tag_id, table.c.count)
+        ).all())
+
+    def test_removal_deletes_only_decremented_pairs(self):
+        db.session.execute(file_tags.insert(), [{"file_id": 1, "tag_id": 1}, {"file_id": 1, "tag_id": 2}])
+        record_tags_added(1, [1, 2])
+        self.assertEqual(self.pairs()[(1, 2)], 1)
+
+        db.session.execute(file_tags.delete().where(file_tags.c.tag_id == 2))
+        with count_queries(db.engine) as queries:
+            record_tags_removed(1, [2])
+        self.assertEqual(self.pairs(), {(3, 4): 0})
+        delete = [s["sql"] for s in queries.statements if s["sql"].startswith("DELETE")]
+        self.assertEqual(len(delete), 1)
+        self.assertIn("IN", delete[0])
+
+    def test_bulk_removal_deletes_only_decremented_pairs(self):
+        db.session.execute(file_tags.insert(), [
+            {"file_id": file_id, "tag_id": tag_id} for file_id in (1, 2) for tag_id in (1, 2)
+        ])
+        db.session.execute(TagCooccurrence.__table__.insert(), [
+            {"tag_id": 1, "other_tag_id": 2, "count": 2}, {"tag_id": 2, "other_tag_id": 1, "count": 2},
+        ])
+
+        changed = select(file_tags.c.file_id, file_tags.c.tag_id).where(file_tags.c.tag_id == 2)
+        others = select(file_tags.c.file_id, file_tags.c.tag_id).where(file_tags.c.tag_id != 2)
+        record_bulk_change(changed, others, -1)
+        self.assertEqual(self.pairs(), {(3, 4): 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
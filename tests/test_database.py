@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+from flask import Flask
+from sqlalchemy import column, create_engine, table, text
+
+from app.db.database import (
+    configure_engines, configure_sqlite_engine, db, dispose_engines, engine_profile, read_replica,
+    sqlite_pragmas
+)
+
+
+class EngineProfileTestCase(unittest.TestCase):
+    def test_postgres_profile_uses_tuned_pool(self):
+        options = engine_profile("postgresql://user@localhost/app", {"DATABASE_POOL_SIZE": 5})
+        self.assertEqual(options["pool_size"], 5)
+        self.assertTrue(options["pool_pre_ping"])
+
+    def test_sqlite_memory_database_skips_wal(self):
+        self.assertNotIn("journal_mode", sqlite_pragmas({}, ":memory:"))
+        self.assertEqual(sqlite_pragmas({}, "/tmp/app.db")["journal_mode"], "WAL")
+
+    def test_sqlite_pragmas_applied_on_connect(self):
+        directory = tempfile.mkdtemp()
+        url = f"sqlite:///{os.path.join(directory, 'app.db')}"
+        config = {"SQLITE_BUSY_TIMEOUT_MS": 2500, "SQLITE_MMAP_SIZE": 1 << 20}
+        engine = create_engine(url, **engine_profile(url, config))
+        configure_sqlite_engine(engine, config)
+
+        with engine.connect() as connection:
+            pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            self.assertEqual(pragma("journal_mode"), "wal")
+            self.assertEqual(pragma("synchronous"), 1)
+            self.assertEqual(pragma("busy_timeout"), 2500)
+        engine.dispose()
+
+
+class ReadReplicaTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(directory, 'primary.db')}"
+        self.app.config["DATABASE_REPLICA_URL"] = f"sqlite:///{os.path.join(directory, 'replica.db')}"
+        configure_engines(self.app)
+        db.init_app(self.app)
+
+        with self.app.app_context():
+            for name, engine in db.engines.items():
+                with engine.begin() as connection:
+                    connection.exec_driver_sql("CREATE TABLE origin (name VARCHAR)")
+                    connection.exec_driver_sql(f"INSERT INTO origin VALUES ('{name or 'primary'}')")
+
+    def origin(self):
+        return db.session.execute(text("SELECT name FROM origin")).scalar()
+
+    def test_reads_use_primary_by_default(self):
+        with self.app.app_context():
+            self.assertEqual(self.origin(), "primary")
+
+    def test_marked_views_read_from_replica(self):
+        with self.app.app_context():
+            self.assertEqual(read_replica(self.origin)(), "replica")
+            # A marcação vale apenas durante a rota
+            db.session.rollback()
+            self.assertEqual(self.origin(), "primary")
+
+    def test_writes_go_to_primary(self):
+        @read_replica
+        def write():
+            db.session.execute(table("origin", column("name")).insert().values(name="written"))
+            db.session.commit()
+
+        with self.app.app_context():
+            write()
+            names = db.session.execute(text("SELECT name FROM origin")).scalars().all()
+            self.assertIn("written", names)
+
+    def test_dispose_engines_replaces_pools(self):
+        with self.app.app_context():
+            pools = {name: engine.pool for name, engine in db.engines.items()}
+        dispose_engines(self.app)
+        with self.app.app_context():
+            for name, engine in db.engines.items():
+                self.assertIsNot(engine.pool, pools[name])
+            self.assertEqual(self.origin(), "primary")
+
+
+if __name__ == "__main__":
+    unittest.main()
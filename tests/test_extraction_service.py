@@ -0,0 +1,159 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+import xml.etree.ElementTree as ET
+from unittest.mock import patch
+
+from app.services.extraction_service import extract_text, extract_keywords, iter_document_text
+
+
+def pdf_bytes(words):
+    """PDF mínimo de uma página, com um operador de texto por palavra"""
+    content = b"BT /F1 12 Tf 72 720 Td " + b" ".join(b"(palavra) Tj" for _ in range(words)) + b" ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R"
+        b" /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return data
+
+
+class ExtractionServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, name, content, mode="w"):
+        path = os.path.join(self.test_dir, name)
+        with open(path, mode) as f:
+            f.write(content)
+        return path
+
+    def _write_zip(self, name, entries):
+        path = os.path.join(self.test_dir, name)
+        with zipfile.ZipFile(path, "w") as archive:
+            for entry_name, data in entries.items():
+                archive.writestr(entry_name, data)
+        return path
+
+    def test_extract_txt(self):
+        path = self._write("notes.md", "# Relatório\nContrato assinado com o cliente.")
+        result = extract_text(path)
+        self.assertIn("Contrato assinado", result["text"])
+        self.assertFalse(result["truncated"])
+
+    def test_extract_docx(self):
+        document = (
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            '<w:body><w:p><w:r><w:t>Proposta </w:t></w:r><w:r><w:t>comercial</w:t></w:r></w:p>'
+            '<w:p><w:r><w:t>Segundo parágrafo</w:t></w:r></w:p></w:body></w:document>'
+        )
+        path = self._write_zip("proposta.docx", {"word/document.xml": document})
+        self.assertEqual(list(iter_document_text(path)), ["Proposta comercial\n", "Segundo parágrafo\n"])
+
+    def test_extract_odt(self):
+        content = (
+            '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+            'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0">'
+            '<office:body><office:text><text:h>Título</text:h><text:p>Corpo do texto</text:p>'
+            '</office:text></office:body></office:document-content>'
+        )
+        path = self._write_zip("doc.odt", {"content.xml": content})
+        self.assertEqual(extract_text(path)["text"], "Título\nCorpo do texto\n")
+
+    def test_extract_epub_in_spine_order(self):
+        container = (
+            '<container xmlns="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles>'
+            '<rootfile full-path="OEBPS/content.opf"/></rootfiles></container>'
+        )
+        opf = (
+            '<package xmlns="http://www.idpf.org/2007/opf"><manifest>'
+            '<item id="c1" href="one.xhtml"/><item id="c2" href="two.xhtml"/></manifest>'
+            '<spine><itemref idref="c2"/><itemref idref="c1"/></spine></package>'
+        )
+        chapter = '<html xmlns="http://www.w3.org/1999/xhtml"><body><p>{}</p></body></html>'
+        path = self._write_zip("book.epub", {
+            "META-INF/container.xml": container,
+            "OEBPS/content.opf": opf,
+            "OEBPS/one.xhtml": chapter.format("Primeiro"),
+            "OEBPS/two.xhtml": chapter.format("Segundo"),
+        })
+        self.assertEqual(extract_text(path)["text"], "Segundo\nPrimeiro\n")
+
+    def test_extract_rtf(self):
+        rtf = r"{\rtf1\ansi{\fonttbl{\f0 Arial;}}{\*\generator Teste;}\f0 Ol\'e1 mundo\par Segunda linha}"
+        path = self._write("doc.rtf", rtf)
+        self.assertEqual(extract_text(path)["text"], "Olá mundo\nSegunda linha")
+
+    def test_byte_budget_truncates(self):
+        path = self._write("big.txt", "palavra " * 100000)
+        result = extract_text(path, max_bytes=1000)
+        self.assertTrue(result["truncated"])
+        self.assertEqual(len(result["text"].encode("utf-8")), 1000)
+
+    def test_time_budget_stops(self):
+        path = self._write("big.txt", "palavra " * 100000)
+        result = extract_text(path, max_seconds=0)
+        self.assertTrue(result["timed_out"])
+        self.assertEqual(result["pages"], 1)
+
+    def test_time_budget_stops_inside_a_pdf_page(self):
+        path = self._write("big.pdf", pdf_bytes(50), "wb")
+        self.assertIn("palavra", extract_text(path)["text"])
+
+        # O relógio só avança depois do primeiro operador da página
+        clock = iter([0.0, 0.0, 0.0] + [100.0] * 1000)
+        with patch("app.services.extraction_service.time.monotonic", side_effect=lambda: next(clock)):
+            result = extract_text(path, max_seconds=10)
+        self.assertTrue(result["timed_out"])
+        self.assertEqual((result["pages"], result["text"]), (0, ""))
+
+    def test_xml_blocks_are_detached_once_read(self):
+        paragraphs = "".join(f"<w:p><w:r><w:t>Parágrafo {index}</w:t></w:r></w:p>" for index in range(100))
+        document = (
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{paragraphs}<w:sectPr/></w:body></w:document>'
+        )
+        path = self._write_zip("longo.docx", {"word/document.xml": document})
+
+        parsers = []
+        iterparse = ET.iterparse
+
+        def recording_iterparse(*args, **kwargs):
+            parsers.append(iterparse(*args, **kwargs))
+            return parsers[-1]
+
+        with patch("app.services.extraction_service.ET.iterparse", recording_iterparse):
+            blocks = list(iter_document_text(path))
+        self.assertEqual(len(blocks), 100)
+        # Nenhum elemento processado (nem vazio) continua preso à raiz
+        root = parsers[0].root
+        self.assertEqual(list(root.iter()), [root])
+
+    def test_unsupported_extension(self):
+        with self.assertRaises(ValueError):
+            extract_text("arquivo.xyz")
+
+    def test_extract_keywords(self):
+        text = "Contrato de prestação. O contrato e a fatura. Fatura do contrato para o cliente."
+        self.assertEqual(extract_keywords(text, limit=2), ["contrato", "fatura"])
+
+
+if __name__ == '__main__':
+    unittest.main()
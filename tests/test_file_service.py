@@ -7,6 +7,7 @@ from app import create_app
 from app.config import Config
 from app.db.database import db
 from app.db.models.file import File
+from app.services import classification_service
 from app.services.file_service import get_file_type, save_file, delete_file, detect_mime_type
 
 
@@ -57,12 +58,13 @@ class FileServiceTestCase(unittest.TestCase):
         # Testar arquivo desconhecido
         self.assertEqual(get_file_type('unknown.xyz'), 'outros')
 
-    @patch('app.services.file_service.magic.Magic')
+    @patch('magic.Magic')
     def test_detect_mime_type(self, mock_magic):
         # Configurar o mock
         magic_instance = MagicMock()
         magic_instance.from_file.return_value = 'image/jpeg'
         mock_magic.return_value = magic_instance
+        classification_service._local.magic = None
         
         # Testar a detecção do tipo MIME
         mime_type = detect_mime_type('test_file.jpg')
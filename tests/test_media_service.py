@@ -0,0 +1,137 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from app.services.media_service import media_tags, read_media_metadata
+
+
+def mp4_box(kind, payload):
+    return struct.pack(">I", 8 + len(payload)) + kind + payload
+
+
+def ebml(element_id, payload):
+    size = len(payload)
+    return element_id + bytes([0x80 | size]) + payload if size < 127 else (
+        element_id + bytes([0x40 | (size >> 8), size & 0xFF]) + payload
+    )
+
+
+class MediaServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for name in os.listdir(self.test_dir):
+            os.remove(os.path.join(self.test_dir, name))
+        os.rmdir(self.test_dir)
+
+    def write(self, name, data):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_jpeg_exif_and_dimensions(self):
+        make = b"Canon\x00"
+        # TIFF little-endian: IFD0 com Make (ASCII, fora da entrada) e ponteiro GPS
+        ifd = struct.pack("<H", 2)
+        ifd += struct.pack("<HHII", 0x010F, 2, len(make), 8 + 2 + 2 * 12 + 4)
+        ifd += struct.pack("<HHII", 0x8825, 4, 1, 0)
+        tiff = b"II*\x00" + struct.pack("<I", 8) + ifd + b"\x00" * 4 + make
+        app1 = b"Exif\x00\x00" + tiff
+        sof = b"\x08" + struct.pack(">HH", 3000, 4000) + b"\x03"
+        data = (
+            b"\xff\xd8"
+            + b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1
+            + b"\xff\xc0" + struct.pack(">H", len(sof) + 2) + sof
+            + b"\xff\xda\x00\x02" + b"\x00" * 1024
+        )
+        media = read_media_metadata(self.write("photo.jpg", data))
+        self.assertEqual(media["width"], 4000)
+        self.assertEqual(media["height"], 3000)
+        self.assertEqual(media["make"], "Canon")
+        self.assertEqual(media_tags(media, "images"), ["canon", "geotagged"])
+
+    def test_mp3_id3_and_vbr_duration(self):
+        def frame(frame_id, text):
+            payload = b"\x03" + text.encode("utf-8")
+            return frame_id + struct.pack(">I", len(payload)) + b"\x00\x00" + payload
+
+        frames = frame(b"TPE1", "Some Artist") + frame(b"TCON", "Jazz")
+        size = len(frames)
+        syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+        id3 = b"ID3\x03\x00\x00" + syncsafe + frames
+        # MPEG-1 camada III, 128 kbps, 44,1 kHz, estéreo + cabeçalho Xing
+        mpeg = b"\xff\xfb\x90\x00" + b"\x00" * 32 + b"Xing" + struct.pack(">II", 1, 30000)
+        media = read_media_metadata(self.write("song.mp3", id3 + mpeg + b"\x00" * 512))
+        self.assertEqual(media["artist"], "Some Artist")
+        self.assertEqual(media["sample_rate"], 44100)
+        self.assertAlmostEqual(media["duration"], 30000 * 1152 / 44100, places=1)
+        self.assertEqual(media_tags(media, "audio"), ["longform", "some artist", "jazz"])
+
+    def test_flac_streaminfo_and_comments(self):
+        value = (44100 << 44) | (1 << 41) | (15 << 36) | (44100 * 90)
+        streaminfo = b"\x00" * 10 + value.to_bytes(8, "big") + b"\x00" * 16
+        comments = struct.pack("<I", 3) + b"lib" + struct.pack("<I", 1)
+        comment = b"ARTIST=Band"
+        comments += struct.pack("<I", len(comment)) + comment
+        data = (
+            b"fLaC"
+            + bytes([0]) + len(streaminfo).to_bytes(3, "big") + streaminfo
+            + bytes([0x84]) + len(comments).to_bytes(3, "big") + comments
+        )
+        media = read_media_metadata(self.write("track.flac", data))
+        self.assertEqual(media["duration"], 90)
+        self.assertEqual(media["channels"], 2)
+        self.assertEqual(media["artist"], "Band")
+
+    def test_mp4_reads_moov_after_large_mdat(self):
+        mvhd = mp4_box(b"mvhd", b"\x00" * 12 + struct.pack(">II", 600, 600 * 700) + b"\x00" * 80)
+        tkhd = mp4_box(b"tkhd", b"\x00" * 76 + struct.pack(">II", 3840 << 16, 2160 << 16))
+        hdlr = mp4_box(b"hdlr", b"\x00" * 8 + b"vide" + b"\x00" * 12)
+        moov = mp4_box(b"moov", mvhd + mp4_box(b"trak", tkhd + mp4_box(b"mdia", hdlr)))
+        data = mp4_box(b"ftyp", b"isom\x00\x00\x00\x00") + mp4_box(b"mdat", b"\x00" * 4_000_000) + moov
+
+        # O conteúdo (mdat) é pulado: o limite de bytes lidos é bem menor que o arquivo
+        media = read_media_metadata(self.write("movie.mp4", data), max_bytes=64 * 1024)
+        self.assertEqual((media["width"], media["height"]), (3840, 2160))
+        self.assertEqual(media["duration"], 700)
+        self.assertEqual(media_tags(media, "videos"), ["4k", "longform"])
+
+    def test_mp4_deeply_nested_boxes(self):
+        box = mp4_box(b"tkhd", b"\x00" * 76 + struct.pack(">II", 1920 << 16, 1080 << 16))
+        for _ in range(1200):
+            box = mp4_box(b"moov", box)
+        data = mp4_box(b"ftyp", b"isom\x00\x00\x00\x00") + box
+
+        # O aninhamento é cortado em poucos níveis, sem RecursionError
+        media = read_media_metadata(self.write("nested.mp4", data))
+        self.assertEqual(media, {"format": "mp4"})
+
+    def test_mkv_info_and_tracks(self):
+        info = ebml(b"\x2a\xd7\xb1", (1_000_000).to_bytes(3, "big")) + ebml(b"\x44\x89", struct.pack(">d", 95000.0))
+        video = ebml(b"\xb0", (1280).to_bytes(2, "big")) + ebml(b"\xba", (720).to_bytes(2, "big"))
+        tracks = ebml(b"\xae", ebml(b"\x83", b"\x01") + ebml(b"\xe0", video))
+        segment = ebml(b"\x15\x49\xa9\x66", info) + ebml(b"\x16\x54\xae\x6b", tracks)
+        data = ebml(b"\x1a\x45\xdf\xa3", ebml(b"\x42\x82", b"matroska")) + ebml(b"\x18\x53\x80\x67", segment)
+        media = read_media_metadata(self.write("clip.mkv", data))
+        self.assertEqual(media["format"], "mkv")
+        self.assertEqual((media["width"], media["height"]), (1280, 720))
+        self.assertEqual(media["duration"], 95)
+        self.assertEqual(media_tags(media, "videos"), ["hd"])
+
+    def test_wav_and_unknown(self):
+        fmt = struct.pack("<HHIIHH", 1, 2, 8000, 32000, 4, 16)
+        data = (
+            b"RIFF" + struct.pack("<I", 36 + 64000) + b"WAVE"
+            + b"fmt " + struct.pack("<I", 16) + fmt
+            + b"data" + struct.pack("<I", 64000) + b"\x00" * 64000
+        )
+        media = read_media_metadata(self.write("voice.wav", data))
+        self.assertEqual(media["duration"], 2)
+        self.assertIsNone(read_media_metadata(self.write("notes.bin", b"\x00\x01\x02\x03" * 8)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+from sqlalchemy import create_engine, select
+from werkzeug.datastructures import MultiDict
+
+from app.db.models.file import File
+from app.services.metadata_service import (
+    apply_metadata_filters, ensure_metadata_indexes, parse_indexed_keys, parse_metadata_filters
+)
+from db_fixtures import create_tables, file_row
+
+
+class MetadataServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        self.connection = self.engine.connect()
+        create_tables(self.connection)
+        self.connection.execute(File.__table__.insert(), [
+            file_row(1, metadata={"client": "Acme", "amount": 150, "invoice_month": "2026-09"}),
+            file_row(2, metadata={"client": "Other", "amount": "abc"}),
+            file_row(3, metadata={
+                "client": 42, "amount": 50, "spreadsheet": {"columns": ["cliente", "valor"], "row_count": 1200},
+            }),
+        ])
+        ensure_metadata_indexes(self.connection, parse_indexed_keys("client,amount:number"))
+
+    def tearDown(self):
+        self.connection.close()
+
+    def query(self, args):
+        filters = parse_metadata_filters(MultiDict(args))
+        return apply_metadata_filters(select(File.__table__.c.id), filters, "sqlite")
+
+    def ids(self, args):
+        return [row[0] for row in self.connection.execute(self.query(args))]
+
+    def plan(self, args):
+        compiled = self.query(args).compile(self.engine, compile_kwargs={"literal_binds": True})
+        rows = self.connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")
+        return " ".join(row[-1] for row in rows)
+
+    def test_parse_indexed_keys(self):
+        self.assertEqual(
+            parse_indexed_keys("client, amount:number,,bad-key"),
+            {"client": "text", "amount": "number"},
+        )
+
+    def test_parse_metadata_filters(self):
+        filters = parse_metadata_filters(MultiDict([
+            ("meta.client", "Acme"), ("meta.amount__gte", "100"), ("project_id", "1"),
+        ]))
+        self.assertEqual(filters, [("client", "eq", "Acme"), ("amount", "gte", 100)])
+
+        with self.assertRaises(ValueError):
+            parse_metadata_filters(MultiDict([("meta.amount__between", "1")]))
+        with self.assertRaises(ValueError):
+            parse_metadata_filters(MultiDict([("meta.amount__gt", "abc")]))
+        with self.assertRaises(ValueError):
+            parse_metadata_filters(MultiDict([("meta.$.x", "1")]))
+
+    def test_equality(self):
+        self.assertEqual(self.ids([("meta.client", "Acme")]), [1])
+        self.assertEqual(self.ids([("meta.client", "42")]), [3])
+        self.assertEqual(self.ids([("meta.invoice_month", "2026-09")]), [1])
+
+    def test_numeric_range_ignores_non_numeric_values(self):
+        self.assertEqual(self.ids([("meta.amount__gte", "100")]), [1])
+        self.assertEqual(self.ids([("meta.amount__gt", "10"), ("meta.amount__lt", "100")]), [3])
+
+    def test_nested_paths_match_lists_and_scalars(self):
+        self.assertEqual(self.ids([("meta.spreadsheet.columns", "valor")]), [3])
+        self.assertEqual(self.ids([("meta.spreadsheet.columns", "outra")]), [])
+        self.assertEqual(self.ids([("meta.spreadsheet.row_count", "1200")]), [3])
+        self.assertEqual(self.ids([("meta.spreadsheet.row_count__gte", "1000")]), [3])
+        with self.assertRaises(ValueError):
+            parse_metadata_filters(MultiDict([("meta.a.b.c.d.e", "1")]))
+
+    def test_declared_keys_use_index(self):
+        self.assertIn("ix_files_meta_client", self.plan([("meta.client", "Acme")]))
+        self.assertIn("ix_files_meta_amount", self.plan([("meta.amount__gte", "100")]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from flask import Flask, jsonify
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.core.cache import TTLCache
+from app.core.metrics import init_metrics
+from app.services.storage_service import open_file
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class RequestMetricsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        self.app = Flask(__name__)
+        init_metrics(self.app)
+
+        @self.app.route("/items/<int:item_id>", methods=["GET", "POST"])
+        def item(item_id):
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1")).all()
+                connection.execute(text("SELECT 2")).all()
+            return jsonify({"id": item_id})
+
+        self.client = self.app.test_client()
+
+    def test_route_latency_sizes_and_query_counts(self):
+        route = "/items/<int:item_id>"
+        before = sample("http_request_duration_seconds_count", method="POST", route=route, status="200")
+        queries = sample("db_queries_per_request_sum", route=route)
+        request_bytes = sample("http_request_size_bytes_sum", route=route)
+
+        self.client.post("/items/1", data=b"x" * 100)
+        self.client.post("/items/2", data=b"x" * 100)
+
+        self.assertEqual(
+            sample("http_request_duration_seconds_count", method="POST", route=route, status="200"), before + 2
+        )
+        self.assertEqual(sample("db_queries_per_request_sum", route=route), queries + 4)
+        self.assertEqual(sample("http_request_size_bytes_sum", route=route), request_bytes + 200)
+        self.assertGreater(sample("http_response_size_bytes_count", route=route), 0)
+
+    def test_metrics_endpoint_uses_route_patterns(self):
+        self.client.get("/items/7")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        body = response.get_data(as_text=True)
+        self.assertIn('route="/items/<int:item_id>"', body)
+        self.assertNotIn('route="/items/7"', body)
+        self.assertIn("db_query_duration_seconds_bucket", body)
+
+
+class ComponentMetricsTestCase(unittest.TestCase):
+    def test_named_cache_counts_hits_and_misses(self):
+        hits = sample("cache_requests_total", cache="test", result="hit")
+        misses = sample("cache_requests_total", cache="test", result="miss")
+        cache = TTLCache(maxsize=10, name="test")
+        cache.get("a")
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(sample("cache_requests_total", cache="test", result="hit"), hits + 1)
+        self.assertEqual(sample("cache_requests_total", cache="test", result="miss"), misses + 1)
+
+    def test_open_file_counts_bytes_read(self):
+        path = os.path.join(tempfile.mkdtemp(), "data.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("a" * 5000)
+        before = sample("storage_bytes_total", operation="read")
+        with open_file(path, "r", encoding="utf-8") as f:
+            self.assertEqual(len(f.read()), 5000)
+        self.assertEqual(sample("storage_bytes_total", operation="read"), before + 5000)
+
+
+class MultiprocessMetricsTestCase(unittest.TestCase):
+    def test_values_from_all_workers_are_aggregated(self):
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": tempfile.mkdtemp()}
+        for _ in range(2):
+            subprocess.run(
+                [sys.executable, "-c", "from app.core.metrics import record_storage; record_storage('write', 10)"],
+                cwd=ROOT, env=env, check=True,
+            )
+        output = subprocess.run(
+            [sys.executable, "-c",
+             "from prometheus_client import generate_latest\n"
+             "from app.core.metrics import metrics_registry\n"
+             "print(generate_latest(metrics_registry()).decode())"],
+            cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        self.assertIn('storage_bytes_total{operation="write"} 20.0', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from flask_migrate import check, downgrade, upgrade
+from sqlalchemy import inspect
+
+from app.config import Config
+from app.db.database import db
+from app.main import create_app
+
+
+class MigrationsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        database = f"sqlite:///{os.path.join(self.directory, 'app.db')}"
+
+        class TestConfig(Config):
+            SQLALCHEMY_DATABASE_URI = database
+
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.app_context.pop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_upgrade_matches_models(self):
+        upgrade()
+        # Falha (SystemExit) se o autogenerate encontrar diferenças com os modelos
+        check()
+        tables = set(inspect(db.engine).get_table_names())
+        self.assertTrue(set(db.metadata.tables) <= tables)
+
+    def test_files_reference_no_external_tables(self):
+        upgrade()
+        self.assertEqual(inspect(db.engine).get_foreign_keys("files"), [])
+        downgrade(revision="base")
+        self.assertEqual(inspect(db.engine).get_table_names(), ["alembic_version"])
+
+
+if __name__ == '__main__':
+    unittest.main()
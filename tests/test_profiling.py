@@ -0,0 +1,81 @@
+import json
+import os
+import pstats
+import tempfile
+import time
+import unittest
+
+from flask import Flask, jsonify
+from sqlalchemy import create_engine, text
+
+from app.core.profiling import PROFILE_ID_HEADER, init_profiling
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+class ProfilingTestCase(unittest.TestCase):
+    def create_app(self, **config):
+        self.directory = tempfile.mkdtemp()
+        engine = create_engine("sqlite://")
+        app = Flask(__name__)
+        app.config.update(
+            PROFILING_ENABLED=True, PROFILING_TOKEN="secret", PROFILING_SAMPLE_RATE=0.0,
+            PROFILING_INTERVAL_SECONDS=0.001, PROFILING_DIR=self.directory,
+        )
+        app.config.update(config)
+        init_profiling(app)
+
+        @app.route("/slow")
+        def slow():
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 42")).all()
+            busy_loop(0.05)
+            return jsonify({"ok": True})
+
+        return app, app.test_client()
+
+    def test_header_writes_folded_stacks_and_sql(self):
+        _, client = self.create_app()
+        response = client.get("/slow", headers={"X-Profile": "secret"})
+        profile_id = response.headers[PROFILE_ID_HEADER]
+
+        with open(os.path.join(self.directory, f"{profile_id}.folded"), encoding="utf-8") as f:
+            folded = f.read()
+        self.assertIn("busy_loop (test_profiling.py:", folded)
+        stack, count = folded.splitlines()[0].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+
+        with open(os.path.join(self.directory, f"{profile_id}.json"), encoding="utf-8") as f:
+            summary = json.load(f)
+        self.assertEqual(summary["route"], "/slow")
+        self.assertEqual(summary["reason"], "header")
+        self.assertEqual([item["statement"] for item in summary["sql"]], ["SELECT 42"])
+
+    def test_requests_without_token_are_not_profiled(self):
+        _, client = self.create_app()
+        response = client.get("/slow", headers={"X-Profile": "wrong"})
+        self.assertNotIn(PROFILE_ID_HEADER, response.headers)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_sampling_rate_and_cprofile_mode(self):
+        _, client = self.create_app(PROFILING_SAMPLE_RATE=1.0, PROFILING_MODE="cprofile")
+        profile_id = client.get("/slow").headers[PROFILE_ID_HEADER]
+        stats = pstats.Stats(os.path.join(self.directory, f"{profile_id}.prof"))
+        self.assertTrue(any(name == "busy_loop" for _, _, name in stats.stats))
+
+    def test_disabled_registers_no_hooks(self):
+        app = Flask(__name__)
+        app.config["PROFILING_ENABLED"] = False
+        init_profiling(app)
+        self.assertEqual(dict(app.before_request_funcs), {})
+        self.assertEqual(dict(app.after_request_funcs), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
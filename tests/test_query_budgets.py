@@ -0,0 +1,182 @@
+import io
+import os
+import json
+import tempfile
+import threading
+import unittest
+
+from sqlalchemy import create_engine, text
+
+from app.config import Config
+from app.core.query_counter import count_queries
+from app.db.database import create_schema, db
+from app.db.models.file import File, file_tags
+from app.db.models.tag import Tag
+from app.main import create_app
+from app.services import facet_service, tag_service
+from app.services.tag_service import attach_tags, resolve_tags
+from app.services.version_service import touch_files
+from db_fixtures import DatabaseTestCase, file_row
+
+# Orçamentos por chamada: número de instruções SQL e tempo total no banco.
+# As listagens incluem a leitura dos contadores de versão do ETag
+LIST_FILES_MAX_QUERIES = 3
+FILES_BY_TAG_MAX_QUERIES = 3
+# Contadores de versão (lidos uma vez, para o ETag e a chave do cache) e a
+# consulta única das facetas
+FACETS_MAX_QUERIES = 2
+ADD_TAGS_MAX_QUERIES = 9
+AUTO_TAG_MAX_QUERIES = 5
+# Upload completo num só commit: registro, tags (novas e já existentes),
+# associações, co-ocorrências, contagens de uso e contadores de versão
+UPLOAD_MAX_QUERIES = 7
+QUERY_TIME_BUDGET_MS = 250
+
+LISTED_FILES = 500
+TAGS_PER_FILE = 3
+
+
+class QueryCounterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+
+    def test_counts_statements_and_time_inside_block(self):
+        with self.engine.connect() as connection:
+            connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+            with count_queries(self.engine) as queries:
+                connection.execute(text("INSERT INTO items (id) VALUES (:id)"), [{"id": 1}, {"id": 2}])
+                connection.execute(text("SELECT id FROM items")).all()
+            connection.execute(text("SELECT 1")).all()
+
+        self.assertEqual(queries.count, 2)
+        self.assertTrue(queries.statements[0]["executemany"])
+        self.assertEqual(queries.statements[1]["sql"], "SELECT id FROM items")
+        self.assertGreater(queries.duration, 0)
+        self.assertIn("2 instruções SQL", queries.report())
+
+    def test_ignores_other_threads(self):
+        def query():
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1")).all()
+
+        with count_queries(self.engine) as queries:
+            thread = threading.Thread(target=query)
+            thread.start()
+            thread.join()
+        self.assertEqual(queries.count, 0)
+
+
+class AutoTagBudgetTestCase(DatabaseTestCase):
+    """Gravação das tags automáticas de um upload (resolver, associar e commit)"""
+
+    def setUp(self):
+        super().setUp()
+        with db.engine.begin() as connection:
+            connection.execute(File.__table__.insert(), [file_row(1), file_row(2)])
+
+    def tag_file(self, file_id):
+        with count_queries(db.engine) as queries:
+            tag_ids = resolve_tags([f"auto-{index}" for index in range(10)], auto_generated=True)
+            if attach_tags(file_id, tag_ids.values()):
+                touch_files(1)
+            db.session.commit()
+        return queries
+
+    def test_ten_new_auto_tags(self):
+        queries = self.tag_file(1)
+        self.assertLessEqual(queries.count, AUTO_TAG_MAX_QUERIES, queries.report())
+        self.assertLess(queries.duration * 1000, QUERY_TIME_BUDGET_MS, queries.report())
+
+    def test_cached_tags_skip_resolution(self):
+        self.tag_file(1)
+        queries = self.tag_file(2)
+        self.assertLessEqual(queries.count, AUTO_TAG_MAX_QUERIES - 1, queries.report())
+        self.assertNotIn("INSERT INTO tags", " ".join(s["sql"] for s in queries.statements))
+
+
+class RouteBudgetTestCase(unittest.TestCase):
+    """Orçamento de consultas das rotas que tendem a N+1"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        database = f"sqlite:///{os.path.join(self.directory, 'app.db')}"
+
+        class TestConfig(Config):
+            SQLALCHEMY_DATABASE_URI = database
+            UPLOAD_FOLDER = os.path.join(self.directory, "storage")
+            RATE_LIMIT_ENABLED = False
+            TEXT_EXTRACTION_ENABLED = False
+
+        self.app = create_app(TestConfig)
+        create_schema(self.app)
+        self.client = self.app.test_client()
+        tag_service._tag_id_cache = None
+        facet_service._facet_cache = None
+
+        with self.app.app_context(), db.engine.begin() as connection:
+            connection.execute(Tag.__table__.insert(), [
+                {"id": tag_id, "name": f"tag-{tag_id}", "usage_count": 0} for tag_id in range(1, 21)
+            ])
+            connection.execute(File.__table__.insert(), [
+                file_row(file_id) for file_id in range(1, LISTED_FILES + 1)
+            ])
+            connection.execute(file_tags.insert(), [
+                {"file_id": file_id, "tag_id": (file_id + offset) % 20 + 1}
+                for file_id in range(1, LISTED_FILES + 1)
+                for offset in range(TAGS_PER_FILE)
+            ])
+
+    def tearDown(self):
+        tag_service._tag_id_cache = None
+        facet_service._facet_cache = None
+
+    def call(self, method, url, **kwargs):
+        with self.app.app_context():
+            engine = db.engine
+        with count_queries(engine) as queries:
+            response = self.client.open(url, method=method, **kwargs)
+        self.assertLess(response.status_code, 300, response.get_data(as_text=True))
+        self.assertLess(queries.duration * 1000, QUERY_TIME_BUDGET_MS, queries.report())
+        return response, queries
+
+    def test_list_files_with_tags(self):
+        response, queries = self.call("GET", "/api/files/")
+        self.assertEqual(len(response.json), LISTED_FILES)
+        self.assertEqual(len(response.json[0]["tags"]), TAGS_PER_FILE)
+        self.assertLessEqual(queries.count, LIST_FILES_MAX_QUERIES, queries.report())
+
+    def test_files_by_tag(self):
+        response, queries = self.call("GET", "/api/tags/files/1")
+        self.assertEqual(len(response.json), LISTED_FILES * TAGS_PER_FILE // 20)
+        self.assertLessEqual(queries.count, FILES_BY_TAG_MAX_QUERIES, queries.report())
+
+    def test_facets(self):
+        response, queries = self.call("GET", "/api/files/facets?project_id=1")
+        self.assertEqual(response.json["total"], LISTED_FILES)
+        self.assertLessEqual(queries.count, FACETS_MAX_QUERIES, queries.report())
+
+        # Em cache: só os contadores de versão
+        response, queries = self.call("GET", "/api/files/facets?project_id=1&top_tags=10")
+        self.assertEqual(response.json["total"], LISTED_FILES)
+        self.assertEqual(queries.count, 1, queries.report())
+
+    def test_add_tags_to_file(self):
+        tags = [f"nova-{index}" for index in range(10)]
+        response, queries = self.call("POST", "/api/files/1/tags", json={"tags": tags})
+        self.assertEqual(sorted(response.json["added_tags"]), sorted(tags))
+        self.assertLessEqual(queries.count, ADD_TAGS_MAX_QUERIES, queries.report())
+
+    def test_upload_with_auto_tags(self):
+        metadata = json.dumps({"projects_id": 1, "uploader_id": 1, "tags": ["tag-1", "contrato"]})
+        response, queries = self.call(
+            "POST", "/api/files/upload",
+            data={"file": (io.BytesIO(b"clausula primeira\n" * 50), "contrato_aluguel.txt"), "metadata": metadata},
+            content_type="multipart/form-data",
+        )
+        self.assertIn("contrato", response.json["tags"])
+        self.assertIn("tag-1", response.json["tags"])
+        self.assertLessEqual(queries.count, UPLOAD_MAX_QUERIES, queries.report())
+
+
+if __name__ == '__main__':
+    unittest.main()
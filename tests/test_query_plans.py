@@ -0,0 +1,69 @@
+import unittest
+
+from sqlalchemy import create_engine, select
+
+from app.db.models.file import File
+from app.services.file_service import apply_file_filters
+from db_fixtures import create_tables
+
+
+class QueryPlanTestCase(unittest.TestCase):
+    """Garante que os filtros da listagem de arquivos são atendidos pelos
+    índices declarados nos modelos (os mesmos da migração 0002)."""
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        self.connection = self.engine.connect()
+        create_tables(self.connection)
+
+        # Dados suficientes para o planejador preferir os índices
+        self.connection.exec_driver_sql(
+            "INSERT INTO files (filename, original_filename, file_path, file_type, file_size, content_type, "
+            "uploader_id, project_id, created_at) "
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 2000) "
+            "SELECT i, i, i, CASE i % 3 WHEN 0 THEN 'image' WHEN 1 THEN 'document' ELSE 'code' END, "
+            "10, 'text/plain', i % 50, i % 20, datetime('2026-01-01', '+' || i || ' minutes') FROM n"
+        )
+        self.connection.exec_driver_sql("ANALYZE")
+
+    def tearDown(self):
+        self.connection.close()
+
+    def plan(self, filters):
+        query = apply_file_filters(select(File.__table__.c.id), filters)
+        query = query.order_by(File.__table__.c.created_at.desc())
+        compiled = query.compile(self.engine, compile_kwargs={"literal_binds": True})
+        rows = self.connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")
+        return " ".join(row[-1] for row in rows)
+
+    def assertIndexed(self, filters, index):
+        plan = self.plan(filters)
+        self.assertIn(index, plan)
+        self.assertNotIn("SCAN files ", plan + " ")
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_unfiltered_listing_uses_created_at(self):
+        self.assertIn("ix_files_created_at", self.plan({}))
+
+    def test_project_filter(self):
+        self.assertIndexed({"project_id": 3}, "ix_files_project_id_created_at")
+
+    def test_project_and_type_filter(self):
+        self.assertIndexed(
+            {"project_id": 3, "file_type": "image"}, "ix_files_project_id_file_type_created_at"
+        )
+
+    def test_uploader_filter(self):
+        self.assertIndexed({"uploader_id": 7}, "ix_files_uploader_id_created_at")
+
+    def test_file_type_filter(self):
+        self.assertIndexed({"file_type": "code"}, "ix_files_file_type_created_at")
+
+    def test_tag_filter_uses_association_index(self):
+        plan = self.plan({"tags": ["invoice"]})
+        self.assertIn("ix_file_tags_tag_id_file_id", plan)
+        self.assertNotIn("SCAN file_tags", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
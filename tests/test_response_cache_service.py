@@ -0,0 +1,149 @@
+import os
+import tempfile
+import unittest
+
+from flask import jsonify
+
+from app.config import Config
+from app.core.query_counter import count_queries
+from app.db.database import create_schema, db
+from app.db.models.change_counter import ChangeCounter
+from app.db.models.file import File
+from app.main import create_app
+from app.services import response_cache_service
+from app.services.response_cache_service import conditional
+from app.services.tag_service import attach_tags, resolve_tags
+from app.services.version_service import (
+    FILES_SCOPE, TAG_STATS_SCOPE, bump_versions, get_versions, project_scope, touch_files,
+)
+from db_fixtures import DatabaseTestCase, file_row
+
+
+class ConditionalResponseTestCase(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        response_cache_service._response_cache = None
+        with db.engine.begin() as connection:
+            connection.execute(File.__table__.insert(), [file_row(1)])
+
+        self.calls = 0
+
+        @self.app.route("/items")
+        @conditional(lambda: ["items"], cache=True)
+        def items():
+            self.calls += 1
+            return jsonify({"calls": self.calls})
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        response_cache_service._response_cache = None
+        super().tearDown()
+
+    def bump(self, *scopes):
+        with self.app.app_context():
+            bump_versions(*scopes)
+            db.session.commit()
+
+    def test_not_modified_reads_only_change_counters(self):
+        first = self.client.get("/items")
+        etag = first.headers["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn("no-cache", first.headers["Cache-Control"])
+
+        with self.app.app_context():
+            engine = db.engine
+        with count_queries(engine) as queries:
+            second = self.client.get("/items", headers={"If-None-Match": etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers["ETag"], etag)
+        self.assertEqual(second.get_data(), b"")
+        self.assertEqual(queries.count, 1, queries.report())
+        self.assertIn("FROM change_counters", queries.statements[0]["sql"])
+
+        self.bump("items")
+        third = self.client.get("/items", headers={"If-None-Match": etag})
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third.headers["ETag"], etag)
+
+    def test_responses_cached_per_version(self):
+        self.assertEqual(self.client.get("/items").json, {"calls": 1})
+        self.assertEqual(self.client.get("/items").json, {"calls": 1})
+        self.assertEqual(self.client.get("/items?page=2").json, {"calls": 2})
+
+        self.bump("other")
+        self.assertEqual(self.client.get("/items").json, {"calls": 1})
+        self.bump("items")
+        self.assertEqual(self.client.get("/items").json, {"calls": 3})
+
+        self.app.config["RESPONSE_CACHE_ENABLED"] = False
+        self.assertEqual(self.client.get("/items").json, {"calls": 4})
+        self.assertEqual(self.client.get("/items").json, {"calls": 5})
+
+    def test_tag_changes_bump_tag_stats_version(self):
+        with self.app.app_context():
+            tag_ids = resolve_tags(["fatura"])
+            db.session.commit()
+            self.assertEqual(get_versions([TAG_STATS_SCOPE])[TAG_STATS_SCOPE], 1)
+
+            # Contagem de uso alterada no commit
+            attach_tags(1, tag_ids.values())
+            db.session.commit()
+            self.assertEqual(get_versions([TAG_STATS_SCOPE])[TAG_STATS_SCOPE], 2)
+
+            # Tag já conhecida e já associada: nada muda
+            attach_tags(1, resolve_tags(["fatura"]).values())
+            db.session.commit()
+            self.assertEqual(get_versions([TAG_STATS_SCOPE])[TAG_STATS_SCOPE], 2)
+            db.session.remove()
+
+    def test_touch_files_bumps_only_the_project_row(self):
+        with self.app.app_context():
+            for project_id in (1, 2, 2):
+                touch_files(project_id)
+                db.session.commit()
+            touch_files()
+            db.session.commit()
+
+            # Nenhuma escrita de projeto passa pela linha geral
+            rows = dict(db.session.execute(db.select(ChangeCounter.scope, ChangeCounter.version)).all())
+            self.assertEqual(rows, {project_scope(1): 1, project_scope(2): 2, FILES_SCOPE: 1})
+
+            # A versão geral é derivada de todas, em uma consulta
+            with count_queries(db.engine) as queries:
+                versions = get_versions([FILES_SCOPE, project_scope(2), project_scope(3)])
+            self.assertEqual(versions, {FILES_SCOPE: 4, project_scope(2): 2, project_scope(3): 0})
+            self.assertEqual(queries.count, 1, queries.report())
+            db.session.remove()
+
+
+
+class TagRouteVersionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        database = f"sqlite:///{os.path.join(self.directory, 'app.db')}"
+
+        class TestConfig(Config):
+            SQLALCHEMY_DATABASE_URI = database
+            RATE_LIMIT_ENABLED = False
+
+        self.app = create_app(TestConfig)
+        create_schema(self.app)
+        self.client = self.app.test_client()
+        response_cache_service._response_cache = None
+
+    def tearDown(self):
+        response_cache_service._response_cache = None
+
+    def test_create_tag_invalidates_tag_listing(self):
+        etag = self.client.get("/api/tags/").headers["ETag"]
+
+        response = self.client.post("/api/tags/", json={"name": "fatura"})
+        self.assertEqual(response.status_code, 201)
+
+        listing = self.client.get("/api/tags/", headers={"If-None-Match": etag})
+        self.assertEqual(listing.status_code, 200)
+        self.assertEqual([tag["name"] for tag in listing.json], ["fatura"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import json
+import os
+import unittest
+
+from sqlalchemy import select
+
+from app.db.database import db
+from app.db.models.file import File, file_tags
+from app.db.models.tag import Tag
+from app.db.models.tag_cooccurrence import TagCooccurrence
+from app.cli import register_commands
+from app.services.retag_service import load_checkpoint, retag_files, save_checkpoint
+from app.services.tagger_service import register_tagger, unregister_tagger
+from app.services.version_service import get_versions, project_scope
+from db_fixtures import DatabaseTestCase, file_row
+
+
+class RetagServiceTestCase(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        with db.engine.begin() as connection:
+            connection.execute(File.__table__.insert(), [
+                file_row(1, original_filename="report.pdf", file_path="/tmp/1", file_type="testing",
+                         content_type="application/pdf", project_id=7, metadata={"tags": ["Q3"]}),
+                file_row(2, original_filename="notes.txt", file_path="/tmp/2", file_type="testing",
+                         content_type="text/plain", project_id=8),
+                file_row(3, original_filename="photo.jpg", file_path="/tmp/3", file_type="images",
+                         content_type="image/jpeg", project_id=9),
+            ])
+            connection.exec_driver_sql(
+                "INSERT INTO tags (id, name, auto_generated, usage_count) VALUES "
+                "(1, 'old-auto', 1, 2), (2, 'manual', 0, 1), (3, 'testing', 1, 2)"
+            )
+            connection.exec_driver_sql(
+                "INSERT INTO file_tags (file_id, tag_id) VALUES (1, 1), (1, 2), (1, 3), (2, 1), (2, 3)"
+            )
+
+        register_tagger("testing_retag", categories=["testing"])(lambda snapshot: ["reviewed"])
+        self.app.config["TAGGER_TIMEOUTS"] = {}
+
+    def tearDown(self):
+        unregister_tagger("testing_retag")
+        super().tearDown()
+
+    def file_tag_names(self, file_id):
+        tags = Tag.__table__
+        return sorted(db.session.execute(
+            select(tags.c.name).join(file_tags, file_tags.c.tag_id == tags.c.id)
+            .where(file_tags.c.file_id == file_id)
+        ).scalars())
+
+    def usage(self, name):
+        tags = Tag.__table__
+        return db.session.execute(select(tags.c.usage_count).where(tags.c.name == name)).scalar()
+
+    def test_dry_run_reports_diff_without_writing(self):
+        diffs = []
+        totals = retag_files(
+            {"file_type": "testing"}, batch_size=1, dry_run=True,
+            on_batch=lambda last_id, batch, totals: diffs.extend(batch),
+        )
+        self.assertEqual(totals["processed"], 2)
+        self.assertEqual(diffs[0]["file_id"], 1)
+        self.assertEqual(diffs[0]["removed"], ["old-auto"])
+        self.assertIn("q3", diffs[0]["added"])
+        self.assertIn("reviewed", diffs[0]["added"])
+        self.assertEqual(self.file_tag_names(1), ["manual", "old-auto", "testing"])
+
+    def test_retag_applies_diff_keeps_manual_tags_and_resumes(self):
+        last_ids = []
+        totals = retag_files(
+            {"file_type": "testing"}, after_id=1, batch_size=1,
+            on_batch=lambda last_id, batch, totals: last_ids.append(last_id),
+        )
+        # Retomada após o arquivo 1: só o arquivo 2 é processado
+        self.assertEqual((totals["processed"], last_ids), (1, [2]))
+        self.assertEqual(self.file_tag_names(1), ["manual", "old-auto", "testing"])
+        self.assertNotIn("old-auto", self.file_tag_names(2))
+        self.assertIn("reviewed", self.file_tag_names(2))
+        self.assertIn("testing", self.file_tag_names(2))
+
+        retag_files(batch_size=2)
+        self.assertIn("manual", self.file_tag_names(1))
+        self.assertIn("q3", self.file_tag_names(1))
+        self.assertEqual(self.usage("old-auto"), 0)
+        self.assertEqual(self.usage("reviewed"), 2)
+        self.assertEqual(self.file_tag_names(3), ["images", "jpg"])
+
+        # Uma segunda execução não encontra diferenças
+        self.assertEqual(retag_files(batch_size=2)["changed"], 0)
+
+    def test_retag_bumps_changed_projects(self):
+        retag_files({"file_type": "testing"}, after_id=1, batch_size=1)
+        versions = get_versions([project_scope(7), project_scope(8), project_scope(9)])
+        self.assertEqual(versions, {project_scope(7): 0, project_scope(8): 1, project_scope(9): 0})
+
+    def test_resumed_command_rebuilds_cooccurrences_changed_before_interruption(self):
+        register_commands(self.app)
+        path = os.path.join(self.directory, "checkpoint.json")
+        # A execução interrompida já alterou arquivos; a retomada não encontra mais nada
+        save_checkpoint(path, {"filters": [], "last_id": 3, "totals": {"processed": 3, "changed": 2}})
+
+        result = self.app.test_cli_runner().invoke(
+            args=["tags", "retag", "--workers", "0", "--checkpoint", path]
+        )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("0 foram alterado(s)", result.output)
+        self.assertFalse(os.path.exists(path))
+        count = db.session.execute(
+            select(TagCooccurrence.count).where(TagCooccurrence.tag_id == 1, TagCooccurrence.other_tag_id == 3)
+        ).scalar()
+        self.assertEqual(count, 2)
+
+    def test_checkpoint_round_trip(self):
+        path = os.path.join(self.directory, "checkpoint.json")
+        self.assertIsNone(load_checkpoint(path))
+        save_checkpoint(path, {"filters": [], "last_id": 42})
+        self.assertEqual(load_checkpoint(path)["last_id"], 42)
+        with open(path) as f:
+            self.assertEqual(json.load(f)["last_id"], 42)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import runpy
+import unittest
+from unittest import mock
+
+from app.services import task_service
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gunicorn.conf.py")
+
+
+class GunicornConfigTestCase(unittest.TestCase):
+    def test_reads_worker_settings_from_environment(self):
+        env = {"WEB_CONCURRENCY": "3", "GUNICORN_THREADS": "8", "PORT": "8080"}
+        with mock.patch.dict(os.environ, env):
+            config = runpy.run_path(CONFIG_PATH)
+        self.assertTrue(config["preload_app"])
+        self.assertEqual((config["workers"], config["threads"]), (3, 8))
+        self.assertEqual(config["bind"], "0.0.0.0:8080")
+        self.assertEqual(config["worker_class"], "gthread")
+        self.assertTrue(callable(config["post_fork"]))
+        self.assertTrue(callable(config["child_exit"]))
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requer fork")
+class ForkSafetyTestCase(unittest.TestCase):
+    def test_background_executor_is_recreated_after_fork(self):
+        sentinel = object()
+        task_service._executor = sentinel
+        try:
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                os.write(write_fd, b"1" if task_service._executor is None else b"0")
+                os._exit(0)
+            os.close(write_fd)
+            result = os.read(read_fd, 1)
+            os.close(read_fd)
+            os.waitpid(pid, 0)
+
+            self.assertEqual(result, b"1")
+            # O processo pai continua com o próprio pool
+            self.assertIs(task_service._executor, sentinel)
+        finally:
+            task_service._executor = None
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+import zipfile
+
+from app.services.spreadsheet_service import column_tags, infer_type, read_spreadsheet_schema
+
+WORKBOOK = """<?xml version="1.0" encoding="UTF-8"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+ xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="Vendas" sheetId="1" r:id="rId1"/><sheet name="Resumo" sheetId="2" r:id="rId2"/></sheets>
+</workbook>"""
+
+RELS = """<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="worksheet" Target="/xl/worksheets/sheet2.xml"/>
+</Relationships>"""
+
+SHARED_STRINGS = """<?xml version="1.0" encoding="UTF-8"?>
+<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<si><t>Cliente</t></si><si><t>Valor</t></si><si><t>Acme</t></si><si><t>Total</t></si>
+</sst>"""
+
+
+def sheet(rows, dimension=None):
+    ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    body = "".join(f'<row r="{index}">{cells}</row>' for index, cells in enumerate(rows, 1))
+    dim = f'<dimension ref="{dimension}"/>' if dimension else ""
+    return f'<worksheet xmlns="{ns}">{dim}<sheetData>{body}</sheetData></worksheet>'
+
+
+class SpreadsheetServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for name in os.listdir(self.test_dir):
+            os.remove(os.path.join(self.test_dir, name))
+        os.rmdir(self.test_dir)
+
+    def write(self, name, data, mode="w"):
+        path = os.path.join(self.test_dir, name)
+        with open(path, mode, newline="" if mode == "w" else None) as f:
+            f.write(data)
+        return path
+
+    def test_infer_type(self):
+        self.assertEqual(infer_type("42"), "integer")
+        self.assertEqual(infer_type("3,14"), "number")
+        self.assertEqual(infer_type("2026-09-01"), "date")
+        self.assertEqual(infer_type("2026-09-01T10:00:00Z"), "datetime")
+        self.assertEqual(infer_type("sim"), "boolean")
+        self.assertIsNone(infer_type("  "))
+
+    def test_small_csv_is_counted_exactly(self):
+        path = self.write("vendas.csv", 'cliente;valor;data;obs\nAcme;10;2026-01-01;"a;b"\nBeta;2.5;2026-01-02;\n')
+        schema = read_spreadsheet_schema(path, "vendas.csv")
+        self.assertEqual(schema["delimiter"], ";")
+        sheet = schema["sheets"][0]
+        self.assertEqual(sheet["row_count"], 2)
+        self.assertTrue(sheet["row_count_exact"])
+        self.assertEqual(
+            [(c["name"], c["type"]) for c in sheet["columns"]],
+            [("cliente", "text"), ("valor", "number"), ("data", "date"), ("obs", "text")],
+        )
+        self.assertEqual(schema["columns"], ["cliente", "valor", "data", "obs"])
+        self.assertEqual(column_tags(schema), ["cliente", "valor", "data", "obs"])
+
+    def test_large_tsv_is_estimated_within_budget(self):
+        line = "1\tabcdefghij\n"
+        path = self.write("big.tsv", "id\tname\n" + line * 200_000)
+        schema = read_spreadsheet_schema(path, "big.tsv", sample_rows=50, max_bytes=64 * 1024)
+        sheet = schema["sheets"][0]
+        self.assertFalse(sheet["row_count_exact"])
+        self.assertAlmostEqual(sheet["row_count"], 200_000, delta=2_000)
+        self.assertEqual([c["type"] for c in sheet["columns"]], ["integer", "text"])
+
+    def test_xlsx_sheets_headers_and_shared_strings(self):
+        rows = ['<c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c>']
+        rows += ['<c r="A{0}" t="s"><v>2</v></c><c r="B{0}"><v>{0}.5</v></c>'.format(i) for i in range(2, 12)]
+        path = os.path.join(self.test_dir, "book.xlsx")
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("xl/workbook.xml", WORKBOOK)
+            archive.writestr("xl/_rels/workbook.xml.rels", RELS)
+            archive.writestr("xl/sharedStrings.xml", SHARED_STRINGS)
+            archive.writestr("xl/worksheets/sheet1.xml", sheet(rows, "A1:B11"))
+            archive.writestr("xl/worksheets/sheet2.xml", sheet(
+                ['<c r="B1" t="inlineStr"><is><t>Total</t></is></c>', '<c r="B2"><v>100</v></c>']
+            ))
+
+        schema = read_spreadsheet_schema(path, "book.xlsx")
+        vendas, resumo = schema["sheets"]
+        self.assertEqual(vendas["name"], "Vendas")
+        self.assertEqual([(c["name"], c["type"]) for c in vendas["columns"]], [("Cliente", "text"), ("Valor", "number")])
+        self.assertEqual(vendas["row_count"], 10)
+        self.assertEqual(resumo["name"], "Resumo")
+        self.assertEqual([c["name"] for c in resumo["columns"]], ["column_1", "Total"])
+        self.assertEqual(schema["columns"], ["cliente", "valor", "column_1", "total"])
+
+    def test_unsupported_or_broken_files(self):
+        self.assertIsNone(read_spreadsheet_schema(self.write("a.ods", b"PK", "wb"), "a.ods"))
+        self.assertIsNone(read_spreadsheet_schema(self.write("b.xlsx", b"not a zip", "wb"), "b.xlsx"))
+        self.assertIsNone(read_spreadsheet_schema(self.write("c.csv", ""), "c.csv"))
+
+
+if __name__ == "__main__":
+    unittest.main()
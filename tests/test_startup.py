@@ -0,0 +1,94 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, inspect
+
+from app.config import Config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tempo máximo (ms) de "import app.wsgi", que inclui create_app(); ajustável
+# em máquinas de CI mais lentas
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 1500))
+
+# Dependências pesadas que só devem ser carregadas no primeiro uso
+LAZY_MODULES = ("google.cloud.vision", "magic")
+
+
+def import_times(module):
+    """
+    Importa o módulo em um interpretador novo com -X importtime e devolve
+    o tempo cumulativo (µs) de cada módulo importado.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, "STORAGE_PATH": tempfile.mkdtemp(), "DATABASE_URL": "sqlite://"},
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+class ImportTimeTestCase(unittest.TestCase):
+    def test_heavy_dependencies_are_not_imported_at_startup(self):
+        times = import_times("app.wsgi")
+        self.assertIn("app.wsgi", times)
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, times)
+
+    def test_import_time_budget(self):
+        elapsed_ms = import_times("app.wsgi")["app.wsgi"] / 1000
+        self.assertLess(elapsed_ms, IMPORT_TIME_BUDGET_MS)
+
+
+class CreateAppTestCase(unittest.TestCase):
+    def test_create_app_does_not_touch_the_schema(self):
+        from app.main import create_app
+
+        path = os.path.join(tempfile.mkdtemp(), "app.db")
+
+        class TestConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+            DATABASE_AUTO_CREATE = False
+
+        create_app(TestConfig)
+        tables = inspect(create_engine(f"sqlite:///{path}")).get_table_names()
+        self.assertEqual(tables, [])
+
+    def test_create_schema_command_on_empty_database(self):
+        from app.db.database import db
+        from app.main import create_app
+
+        path = os.path.join(tempfile.mkdtemp(), "app.db")
+
+        class TestConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+            METADATA_INDEXED_KEYS = "client"
+
+        app = create_app(TestConfig)
+        result = app.test_cli_runner().invoke(args=["create-schema"])
+        self.assertEqual(result.exit_code, 0, result.output)
+
+        engine = create_engine(f"sqlite:///{path}")
+        self.assertEqual(set(inspect(engine).get_table_names()), set(db.metadata.tables))
+        # Índices de expressão não aparecem no inspector do SQLite
+        with engine.connect() as connection:
+            indexes = connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars()
+            self.assertIn("ix_files_meta_client", set(indexes))
+
+        # Idempotente
+        result = app.test_cli_runner().invoke(args=["create-schema"])
+        self.assertEqual(result.exit_code, 0, result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,12 +3,20 @@ import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 
-from app import create_app
+from app.main import create_app
 from app.config import Config
-from app.db.database import db
+from app.db.database import create_schema, db
 from app.db.models.file import File
 from app.db.models.tag import Tag
-from app.services.tag_service import find_or_create_tag, generate_tags_for_file
+from sqlalchemy import select
+
+from app.db.models.file import file_tags
+from app.services import tag_service
+from app.services.version_service import TAGS_SCOPE, bump_versions
+from app.services.tag_service import (
+    find_or_create_tag, forget_tag, generate_tags_for_file, resolve_tags, get_tag_id_cache,
+    attach_tags, bulk_attach_tags, bulk_detach_tags, merge_tags, remove_tag,
+)
 
 
 class TestConfig(Config):
@@ -24,12 +32,14 @@ class TagServiceTestCase(unittest.TestCase):
         self.app = create_app(TestConfig)
         self.app_context = self.app.app_context()
         self.app_context.push()
-        db.create_all()
+        create_schema(self.app)
+        # IDs de tags em cache de outro teste não valem para este banco
+        tag_service._tag_id_cache = None
         self.client = self.app.test_client()
 
     def tearDown(self):
         db.session.remove()
-        db.drop_all()
+        db.drop_all(bind_key=None)
         self.app_context.pop()
 
     def test_find_or_create_tag(self):
@@ -60,6 +70,128 @@ class TagServiceTestCase(unittest.TestCase):
             space_tag = find_or_create_tag("  test_tag  ", "Another Description", True)
             self.assertEqual(space_tag.id, tag.id)
 
+    def test_resolve_tags(self):
+        with self.app.app_context():
+            existing = find_or_create_tag("existing")
+            db.session.commit()
+            get_tag_id_cache().clear()
+
+            # Normaliza, remove duplicatas e cria apenas as tags novas
+            resolved = resolve_tags(["  Existing ", "NEW_TAG", "new_tag", ""], auto_generated=True)
+            db.session.commit()
+            self.assertEqual(list(resolved), ["existing", "new_tag"])
+            self.assertEqual(resolved["existing"], existing.id)
+
+            new_tag = Tag.query.filter_by(name="new_tag").first()
+            self.assertEqual(resolved["new_tag"], new_tag.id)
+            self.assertTrue(new_tag.auto_generated)
+            self.assertEqual(Tag.query.count(), 2)
+
+            # Nomes conhecidos vêm do cache
+            self.assertEqual(get_tag_id_cache().get("new_tag"), new_tag.id)
+            self.assertEqual(resolve_tags(["new_tag"]), {"new_tag": new_tag.id})
+
+    def test_resolve_tags_ignores_ids_cached_before_tag_changes(self):
+        with self.app.app_context():
+            old_id = resolve_tags(["invoice", "receipt"])["invoice"]
+            db.session.commit()
+
+            # Outro processo exclui a tag e a recria: o cache deste não é avisado
+            db.session.execute(Tag.__table__.delete().where(Tag.__table__.c.id == old_id))
+            bump_versions(TAGS_SCOPE)
+            db.session.commit()
+            new_tag = find_or_create_tag("other")
+            new_tag.name = "invoice"
+            db.session.commit()
+
+            self.assertNotEqual(new_tag.id, old_id)
+            self.assertEqual(get_tag_id_cache().get("invoice"), old_id)
+            # A versão é conferida a cada TAG_CACHE_VERSION_CHECK_SECONDS
+            with patch.dict(self.app.config, {"TAG_CACHE_VERSION_CHECK_SECONDS": 0}):
+                self.assertEqual(resolve_tags(["invoice"]), {"invoice": new_tag.id})
+
+    def test_forget_tag_evicts_only_its_name(self):
+        with self.app.app_context():
+            resolved = resolve_tags(["invoice", "receipt"])
+            db.session.commit()
+
+            forget_tag(" Invoice ")
+            self.assertIsNone(get_tag_id_cache().get("invoice"))
+            self.assertEqual(get_tag_id_cache().get("receipt"), resolved["receipt"])
+
+    def test_bulk_attach_and_detach_tags(self):
+        with self.app.app_context():
+            files = []
+            for i in range(3):
+                file_obj = File(
+                    original_filename=f"report_{i}.pdf",
+                    filename=f"stored_{i}.pdf",
+                    file_path=f"/path/to/report_{i}.pdf",
+                    file_type="documents",
+                    file_size=1024,
+                    content_type="application/pdf",
+                    project_id=1,
+                    uploader_id=1,
+                )
+                db.session.add(file_obj)
+                files.append(file_obj)
+            db.session.commit()
+
+            tag_ids = resolve_tags(["client", "invoice"])
+            attach_tags(files[0].id, [tag_ids["client"]])
+            db.session.commit()
+
+            # Associações já existentes não são contadas de novo
+            counts = bulk_attach_tags(select(File.id), tag_ids.values())
+            db.session.commit()
+            self.assertEqual(counts, {tag_ids["client"]: 2, tag_ids["invoice"]: 3})
+            self.assertEqual(db.session.get(Tag, tag_ids["client"]).usage_count, 3)
+            self.assertEqual(db.session.query(file_tags).count(), 6)
+
+            targets = select(File.id).where(File.id.in_([files[0].id, files[1].id]))
+            counts = bulk_detach_tags(targets, [tag_ids["invoice"]])
+            db.session.commit()
+            self.assertEqual(counts, {tag_ids["invoice"]: 2})
+            self.assertEqual(db.session.get(Tag, tag_ids["invoice"]).usage_count, 1)
+
+    def test_merge_and_remove_tags(self):
+        with self.app.app_context():
+            files = []
+            for i in range(2):
+                file_obj = File(
+                    original_filename=f"photo_{i}.jpg",
+                    filename=f"stored_{i}.jpg",
+                    file_path=f"/path/to/photo_{i}.jpg",
+                    file_type="images",
+                    file_size=1024,
+                    content_type="image/jpeg",
+                    project_id=1,
+                    uploader_id=1,
+                )
+                db.session.add(file_obj)
+                files.append(file_obj)
+            db.session.commit()
+
+            tag_ids = resolve_tags(["beach", "praia"])
+            attach_tags(files[0].id, tag_ids.values())
+            attach_tags(files[1].id, [tag_ids["praia"]])
+            db.session.commit()
+
+            # O arquivo que já tinha as duas tags não é duplicado
+            source = db.session.get(Tag, tag_ids["praia"])
+            target = db.session.get(Tag, tag_ids["beach"])
+            self.assertEqual(merge_tags(source, target), 1)
+            db.session.commit()
+
+            self.assertIsNone(db.session.get(Tag, tag_ids["praia"]))
+            self.assertEqual(db.session.get(Tag, tag_ids["beach"]).usage_count, 2)
+            self.assertEqual(db.session.query(file_tags).count(), 2)
+
+            remove_tag(db.session.get(Tag, tag_ids["beach"]))
+            db.session.commit()
+            self.assertEqual(Tag.query.count(), 0)
+            self.assertEqual(db.session.query(file_tags).count(), 0)
+
     @patch('app.services.tag_service.analyze_images')
     def test_generate_tags_for_file(self, mock_analyze_images):
         # Configurar mock para análise de imagens
@@ -69,12 +201,14 @@ class TagServiceTestCase(unittest.TestCase):
             # Criar um arquivo de teste
             file_obj = File(
                 original_filename="test_image.jpg",
-                stored_filename="stored_test_image.jpg",
+                filename="stored_test_image.jpg",
                 file_path="/path/to/image.jpg",
                 file_type="images",
                 file_size=1024,
                 content_type="image/jpeg",
-                metadata=None
+                metadata=None,
+                project_id=1,
+                uploader_id=1
             )
             
             # Salvar no banco para obter ID
@@ -96,8 +230,7 @@ class TagServiceTestCase(unittest.TestCase):
             mock_analyze_images.assert_called_once_with(file_obj.file_path)
             
             # Testar limite de tags
-            with patch('app.services.tag_service.current_app') as mock_app:
-                mock_app.config.get.return_value = 3  # MAX_TAGS_PER_FILE
+            with patch.dict(self.app.config, {"MAX_TAGS_PER_FILE": 3}):
                 limited_tags = generate_tags_for_file(file_obj)
                 self.assertEqual(len(limited_tags), 3)
     
@@ -106,12 +239,14 @@ class TagServiceTestCase(unittest.TestCase):
             # Criar um arquivo de documento
             file_obj = File(
                 original_filename="important_report.pdf",
-                stored_filename="stored_report.pdf",
+                filename="stored_report.pdf",
                 file_path="/path/to/report.pdf",
                 file_type="documents",
                 file_size=2048,
                 content_type="application/pdf",
-                metadata=None
+                metadata=None,
+                project_id=1,
+                uploader_id=1
             )
             
             # Salvar no banco para obter ID
@@ -134,12 +269,14 @@ class TagServiceTestCase(unittest.TestCase):
             # Criar um arquivo com metadados que incluem tags
             file_obj = File(
                 original_filename="file_with_metadata.txt",
-                stored_filename="stored_metadata.txt",
+                filename="stored_metadata.txt",
                 file_path="/path/to/metadata.txt",
                 file_type="documents",
                 file_size=512,
                 content_type="text/plain",
-                metadata={"tags": ["custom_tag1", "custom_tag2"]}
+                metadata={"tags": ["custom_tag1", "custom_tag2"]},
+                project_id=1,
+                uploader_id=1
             )
             
             # Salvar no banco para obter ID
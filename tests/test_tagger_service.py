@@ -0,0 +1,111 @@
+import time
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask
+
+from app.config import Config
+from app.services.tagger_service import (
+    Tagger, rank_tags, register_tagger, run_taggers, taggers_for, unregister_tagger
+)
+
+
+class TaggerServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object(Config)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.registered = []
+
+    def tearDown(self):
+        for name in self.registered:
+            unregister_tagger(name)
+        self.app_context.pop()
+
+    def register(self, name, func, **kwargs):
+        register_tagger(name, categories=["testing"], **kwargs)(func)
+        self.registered.append(name)
+
+    def test_rank_tags_merges_and_caps(self):
+        strong = Tagger("strong", None, None, None, 2.0)
+        weak = Tagger("weak", None, None, None, 1.0)
+        ranked = rank_tags([
+            (weak, ["shared", "only_weak", "", None]),
+            (strong, ["Only_Strong", "shared"]),
+        ], limit=2)
+        self.assertEqual(ranked, ["shared", "only_strong"])
+
+    def test_taggers_for_category(self):
+        self.register("testing_only", lambda snapshot: [])
+        names = [tagger.name for tagger in taggers_for("testing")]
+        self.assertIn("testing_only", names)
+        self.assertNotIn("testing_only", [tagger.name for tagger in taggers_for("images")])
+
+    def test_slow_and_failing_taggers_are_skipped(self):
+        def slow(snapshot):
+            time.sleep(1)
+            return ["late"]
+
+        def failing(snapshot):
+            raise RuntimeError("boom")
+
+        self.register("testing_slow", slow, timeout=0.05, blocking=True)
+        self.register("testing_failing", failing)
+        self.register("testing_fast", lambda snapshot: [snapshot["original_filename"]])
+
+        started = time.monotonic()
+        results = run_taggers({"file_type": "testing", "original_filename": "report"})
+        self.assertLess(time.monotonic() - started, 0.5)
+
+        by_name = {tagger.name: tags for tagger, tags in results}
+        self.assertEqual(by_name["testing_fast"], ["report"])
+        self.assertNotIn("testing_slow", by_name)
+        self.assertNotIn("testing_failing", by_name)
+
+    def test_queued_blocking_calls_do_not_delay_cheap_taggers(self):
+        self.app.config["TAGGER_WORKERS"] = 1
+        release = threading.Event()
+        self.register("testing_stuck", lambda snapshot: release.wait(5) and ["stuck"], timeout=0.05, blocking=True)
+        self.register("testing_cheap", lambda snapshot: ["cheap"])
+        self.addCleanup(release.set)
+
+        # O pool do extrator bloqueante (uma thread) fica ocupado pela chamada anterior
+        first = self.results_of({"file_type": "testing", "original_filename": "a"})
+        self.assertEqual(first, {"testing_cheap": ["cheap"]})
+
+        started = time.monotonic()
+        second = self.results_of({"file_type": "testing", "original_filename": "b"})
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(second, {"testing_cheap": ["cheap"]})
+
+    def test_deadline_counts_from_start_not_from_queue(self):
+        self.app.config.update(TAGGER_WORKERS=1, TAGGER_TIMEOUTS={"testing_io": 0.3})
+
+        def io_bound(snapshot):
+            time.sleep(0.2)
+            return [snapshot["original_filename"]]
+
+        self.register("testing_io", io_bound, blocking=True)
+        # Duas chamadas simultâneas: a segunda espera 0,2 s na fila e roda mais 0,2 s
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [
+                pool.submit(self.results_of, {"file_type": "testing", "original_filename": name})
+                for name in ("a", "b")
+            ]
+            results = [future.result() for future in futures]
+        self.assertEqual(results, [{"testing_io": ["a"]}, {"testing_io": ["b"]}])
+
+    def results_of(self, snapshot):
+        """Resultados só dos extratores registrados por estes testes"""
+        with self.app.app_context():
+            return {
+                tagger.name: tags for tagger, tags in run_taggers(snapshot)
+                if tagger.name in self.registered
+            }
+
+
+if __name__ == "__main__":
+    unittest.main()
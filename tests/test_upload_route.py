@@ -0,0 +1,249 @@
+import io
+import os
+import json
+import shutil
+import struct
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+from app.config import Config
+from app.db.database import create_schema, db
+from app.db.models.file import File
+from app.db.models.file_content import FileContent
+from app.main import create_app
+from app.services import response_cache_service, tag_service
+
+
+def mp4_box(kind, payload):
+    return struct.pack(">I", 8 + len(payload)) + kind + payload
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\x0dIHDR" + (640).to_bytes(4, "big") + (480).to_bytes(4, "big") + b"\x08\x02\x00\x00\x00"
+
+
+class UploadRouteTestCase(unittest.TestCase):
+    """POST /api/files/upload na aplicação completa, com um banco e um armazenamento temporários"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        database = f"sqlite:///{os.path.join(self.directory, 'app.db')}"
+        storage = os.path.join(self.directory, "storage")
+
+        class TestConfig(Config):
+            SQLALCHEMY_DATABASE_URI = database
+            UPLOAD_FOLDER = storage
+            RATE_LIMIT_ENABLED = False
+            TEXT_EXTRACTION_ENABLED = False
+
+        self.config_class = TestConfig
+        self.app = create_app(TestConfig)
+        create_schema(self.app)
+        self.client = self.app.test_client()
+        tag_service._tag_id_cache = None
+        response_cache_service._response_cache = None
+
+        # Rótulos fixos no lugar do Google Cloud Vision
+        vision = patch("app.services.tag_service.analyze_images", return_value=["documento"])
+        vision.start()
+        self.addCleanup(vision.stop)
+
+    def tearDown(self):
+        tag_service._tag_id_cache = None
+        response_cache_service._response_cache = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def upload(self, filename, data, content_type="application/octet-stream", client="127.0.0.1", **metadata):
+        metadata = {"projects_id": 1, "uploader_id": 1, **metadata}
+        return self.client.post(
+            "/api/files/upload",
+            data={"file": (io.BytesIO(data), filename, content_type), "metadata": json.dumps(metadata)},
+            content_type="multipart/form-data",
+            environ_base={"REMOTE_ADDR": client},
+        )
+
+    def stored(self, file_id):
+        with self.app.app_context():
+            file = db.session.get(File, file_id)
+            return file.file_metadata, sorted(tag.name for tag in file.tags)
+
+
+class ClassificationUploadTestCase(UploadRouteTestCase):
+    def test_content_signature_overrides_extension(self):
+        response = self.upload("scan.txt", PNG)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["file_type"], "images")
+        self.assertEqual(response.json["content_type"], "image/png")
+        self.assertEqual(response.json["classification"]["source"], "signature")
+        self.assertTrue(os.path.exists(response.json["file_path"]))
+
+        metadata, tags = self.stored(response.json["id"])
+        self.assertEqual(metadata["media"], {"format": "png", "width": 640, "height": 480})
+        self.assertIn("images", tags)
+        self.assertIn("documento", tags)
+
+    def test_document_text_is_extracted_into_tags(self):
+        self.app.config["TEXT_EXTRACTION_ENABLED"] = True
+        text = "fatura fatura fatura pagamento pagamento cliente\n".encode("utf-8") * 20
+
+        # A extração roda na própria requisição em vez do pool em segundo plano
+        with patch("app.api.routes.files.submit_task", side_effect=lambda func, *args: func(*args)):
+            response = self.upload("relatorio_final.txt", text, "text/plain", tags=["Financeiro"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["file_type"], "documents")
+
+        metadata, tags = self.stored(response.json["id"])
+        self.assertEqual(metadata["tags"], ["Financeiro"])
+        for tag in ("documents", "txt", "financeiro", "relatorio", "final", "fatura", "pagamento"):
+            self.assertIn(tag, tags)
+        with self.app.app_context():
+            content = db.session.get(FileContent, response.json["id"])
+            self.assertIn("fatura", content.text)
+            self.assertEqual(content.keywords[0], "fatura")
+
+    def test_metadata_must_name_project_and_uploader(self):
+        response = self.client.post(
+            "/api/files/upload",
+            data={"file": (io.BytesIO(b"abc"), "notes.txt"), "metadata": json.dumps({"uploader_id": 1})},
+            content_type="multipart/form-data",
+        )
+        self.assertEqual(response.status_code, 400)
+        with self.app.app_context():
+            self.assertEqual(File.query.count(), 0)
+
+
+class MediaUploadTestCase(UploadRouteTestCase):
+    def test_jpeg_exif_metadata_and_tags(self):
+        make = b"Canon\x00"
+        ifd = struct.pack("<H", 2)
+        ifd += struct.pack("<HHII", 0x010F, 2, len(make), 8 + 2 + 2 * 12 + 4)
+        ifd += struct.pack("<HHII", 0x8825, 4, 1, 0)
+        app1 = b"Exif\x00\x00" + b"II*\x00" + struct.pack("<I", 8) + ifd + b"\x00" * 4 + make
+        sof = b"\x08" + struct.pack(">HH", 3000, 4000) + b"\x03"
+        data = (
+            b"\xff\xd8"
+            + b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1
+            + b"\xff\xc0" + struct.pack(">H", len(sof) + 2) + sof
+            + b"\xff\xda\x00\x02" + b"\x00" * 1024
+        )
+
+        response = self.upload("photo.jpg", data, "image/jpeg")
+        self.assertEqual(response.status_code, 200)
+        metadata, tags = self.stored(response.json["id"])
+        self.assertEqual((metadata["media"]["width"], metadata["media"]["height"]), (4000, 3000))
+        self.assertEqual(metadata["media"]["make"], "Canon")
+        for tag in ("images", "jpg", "canon", "geotagged", "documento"):
+            self.assertIn(tag, tags)
+
+    def test_mp4_video_metadata_and_tags(self):
+        mvhd = mp4_box(b"mvhd", b"\x00" * 12 + struct.pack(">II", 600, 600 * 700) + b"\x00" * 80)
+        tkhd = mp4_box(b"tkhd", b"\x00" * 76 + struct.pack(">II", 1920 << 16, 1080 << 16))
+        hdlr = mp4_box(b"hdlr", b"\x00" * 8 + b"vide" + b"\x00" * 12)
+        moov = mp4_box(b"moov", mvhd + mp4_box(b"trak", tkhd + mp4_box(b"mdia", hdlr)))
+        data = mp4_box(b"ftyp", b"isom\x00\x00\x00\x00") + mp4_box(b"mdat", b"\x00" * 4096) + moov
+
+        response = self.upload("palestra.mp4", data, "video/mp4")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["file_type"], "videos")
+        metadata, tags = self.stored(response.json["id"])
+        self.assertEqual(metadata["media"]["duration"], 700)
+        for tag in ("videos", "mp4", "palestra", "video", "hd", "longform"):
+            self.assertIn(tag, tags)
+
+
+class SpreadsheetUploadTestCase(UploadRouteTestCase):
+    def test_csv_schema_and_column_tags(self):
+        data = 'cliente;valor;data\nAcme;10;2026-01-01\nBeta;2.5;2026-01-02\n'.encode("utf-8")
+
+        response = self.upload("vendas.csv", data, "text/csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["file_type"], "spreadsheets")
+        metadata, tags = self.stored(response.json["id"])
+        schema = metadata["spreadsheet"]
+        self.assertEqual(schema["columns"], ["cliente", "valor", "data"])
+        self.assertEqual(schema["sheets"][0]["row_count"], 2)
+        for tag in ("spreadsheets", "csv", "vendas", "cliente", "valor"):
+            self.assertIn(tag, tags)
+
+
+class ArchiveUploadTestCase(UploadRouteTestCase):
+    def zip_bytes(self, entries):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, data in entries:
+                archive.writestr(name, data)
+        return buffer.getvalue()
+
+    def test_zip_manifest_and_content_tags(self):
+        data = self.zip_bytes([(f"trip/{index}.jpg", b"\xff" * 100) for index in range(6)] + [("notes.txt", b"hi")])
+
+        response = self.upload("fotos.zip", data, "application/zip")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["file_type"], "archives")
+        metadata, tags = self.stored(response.json["id"])
+        manifest = metadata["archive"]
+        self.assertEqual((manifest["format"], manifest["files"]), ("zip", 7))
+        self.assertEqual(manifest["dominant_type"], "images")
+        self.assertFalse(manifest["suspicious"])
+        for tag in ("archives", "zip", "images", "jpg"):
+            self.assertIn(tag, tags)
+
+    def test_zip_bomb_limits_come_from_config(self):
+        self.app.config["ARCHIVE_BOMB_MIN_BYTES"] = 1_000_000
+        data = self.zip_bytes([("zeros.txt", b"\x00" * 5_000_000)])
+
+        with self.assertLogs(self.app.logger, "WARNING"):
+            response = self.upload("backup.zip", data, "application/zip")
+        self.assertEqual(response.status_code, 200)
+        metadata, tags = self.stored(response.json["id"])
+        self.assertTrue(metadata["archive"]["suspicious"])
+        self.assertIn("compression_ratio", metadata["archive"]["bomb_reasons"])
+        self.assertIn("zip-bomb", tags)
+
+
+class AdmissionUploadTestCase(UploadRouteTestCase):
+    def test_project_rate_limit_refuses_before_storing(self):
+        self.app.config.update(RATE_LIMIT_ENABLED=True, RATE_LIMIT=1, RATE_LIMIT_BURST=1)
+
+        self.assertEqual(self.upload("a.txt", b"primeiro", "text/plain", client="10.0.0.1").status_code, 200)
+        # Outro cliente, mesmo projeto: o balde do projeto já está vazio
+        refused = self.upload("b.txt", b"segundo", "text/plain", client="10.0.0.2")
+        self.assertEqual(refused.status_code, 429)
+        self.assertIn("Retry-After", refused.headers)
+        # Outro projeto do segundo cliente: a ficha dele não foi gasta na recusa
+        accepted = self.upload("c.txt", b"terceiro", "text/plain", client="10.0.0.2", projects_id=2)
+        self.assertEqual(accepted.status_code, 200)
+
+        with self.app.app_context():
+            self.assertEqual(sorted(f.original_filename for f in File.query.all()), ["a.txt", "c.txt"])
+
+    def test_client_address_comes_from_trusted_proxy(self):
+        class ProxiedConfig(self.config_class):
+            PROXY_COUNT = 1
+            RATE_LIMIT_ENABLED = True
+            RATE_LIMIT = 1
+            RATE_LIMIT_BURST = 1
+
+        self.client = create_app(ProxiedConfig).test_client()
+
+        def upload(client, project):
+            return self.client.post(
+                "/api/files/upload",
+                data={
+                    "file": (io.BytesIO(b"abc"), "notes.txt", "text/plain"),
+                    "metadata": json.dumps({"projects_id": project, "uploader_id": 1}),
+                },
+                content_type="multipart/form-data",
+                environ_base={"REMOTE_ADDR": "192.168.0.10"},
+                headers={"X-Forwarded-For": client},
+            )
+
+        # Todos chegam pelo mesmo proxy, mas cada cliente tem o próprio balde
+        self.assertEqual(upload("10.0.0.1", 1).status_code, 200)
+        self.assertEqual(upload("10.0.0.2", 2).status_code, 200)
+        self.assertEqual(upload("10.0.0.1", 3).status_code, 429)
+
+
+if __name__ == '__main__':
+    unittest.main()